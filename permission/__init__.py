@@ -13,6 +13,7 @@ from permission.conf import settings
 from permission.utils.autodiscover import autodiscover as autodiscover
 
 # load shortcut functions
+from permission.utils.cache import clear_permission_cache as clear_permission_cache
 from permission.utils.logics import add_permission_logic as add_permission_logic
 from permission.utils.logics import remove_permission_logic as remove_permission_logic
 
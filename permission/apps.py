@@ -6,9 +6,60 @@ class PermissionConfig(AppConfig):
     verbose_name = "Permission"
 
     def ready(self):
+        from django.contrib.auth import get_user_model
+        from django.contrib.auth.models import Permission
+        from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save
+
         from permission.conf import settings
+        from permission.utils.cache import (
+            clear_permission_cache_on_m2m_changed,
+            invalidate_shared_permission_cache_on_m2m_changed,
+            invalidate_shared_permission_cache_on_save,
+        )
+        from permission.utils.permissions import reset_all_perms
+
+        # rebuild the preloaded perms when permissions are changed
+        post_migrate.connect(reset_all_perms, dispatch_uid="permission_reset_all_perms")
+        post_save.connect(reset_all_perms, sender=Permission, dispatch_uid="permission_reset_all_perms")
+        post_delete.connect(reset_all_perms, sender=Permission, dispatch_uid="permission_reset_all_perms")
+
+        # clear the permission cache when groups or permissions of users are changed
+        user_model = get_user_model()
+        for field_name in ("groups", "user_permissions"):
+            if hasattr(user_model, field_name):
+                m2m_changed.connect(
+                    clear_permission_cache_on_m2m_changed,
+                    sender=getattr(user_model, field_name).through,
+                    dispatch_uid=f"permission_clear_permission_cache_{field_name}",
+                )
+
+        # invalidate the shared permission decisions when the objects are changed
+        # the receivers return immediately if PERMISSION_SHARED_CACHE is not set
+        post_save.connect(
+            invalidate_shared_permission_cache_on_save,
+            dispatch_uid="permission_invalidate_shared_permission_cache",
+        )
+        post_delete.connect(
+            invalidate_shared_permission_cache_on_save,
+            dispatch_uid="permission_invalidate_shared_permission_cache",
+        )
+        m2m_changed.connect(
+            invalidate_shared_permission_cache_on_m2m_changed,
+            dispatch_uid="permission_invalidate_shared_permission_cache",
+        )
 
         if settings.PERMISSION_AUTODISCOVER_ENABLE:
             from permission.utils.autodiscover import autodiscover
 
             autodiscover()
+
+        if settings.PERMISSION_WARMUP_ON_READY:
+            from django.db import DatabaseError
+
+            from permission.utils.handlers import registry
+
+            try:
+                registry.warmup()
+            except DatabaseError:
+                # the tables are not migrated yet (e.g. on the first migrate)
+                pass
@@ -4,7 +4,7 @@ Logical permission backends module
 
 from permission.conf import settings
 from permission.utils.handlers import registry
-from permission.utils.permissions import perm_to_permission
+from permission.utils.permissions import aperm_exists, perm_exists
 
 __all__ = ("PermissionBackend",)
 
@@ -56,27 +56,105 @@ class PermissionBackend:
             ``PERMISSION_CHECK_PERMISSION_PRESENCE`` is ``True`` in ``settings``
             module.
         """
-        if settings.PERMISSION_CHECK_PERMISSION_PRESENCE:
-            # get permission instance from string permission (perm)
-            # it raise ObjectDoesNotExists when the permission is not exists
-            try:
-                perm_to_permission(perm)
-            except AttributeError:
-                # Django 1.2 internally use wrong permission string thus ignore
-                pass
-
-        # get permission handlers for this perm
-        cache_name = f"_{perm}_cache"
-        if hasattr(self, cache_name):
-            handlers = getattr(self, cache_name)
-        else:
-            handlers = [h for h in registry.get_handlers() if perm in h.get_supported_permissions()]
-            setattr(self, cache_name, handlers)
-        for handler in handlers:
+        self._check_permission_presence(perm)
+        for handler in registry.get_handlers_for_perm(perm):
             if handler.has_perm(user_obj, perm, obj=obj):
                 return True
         return False
 
+    async def ahas_perm(self, user_obj, perm, obj=None):
+        """
+        Async version of :meth:`has_perm` based on ``ahas_perm`` of
+        registered handlers.
+
+        Parameters
+        ----------
+        user_obj : django user model instance
+            A django user model instance which be checked
+        perm : string
+            `app_label.codename` formatted permission string
+        obj : None or django model instance
+            None or django model instance for object permission
+
+        Returns
+        -------
+        boolean
+            Whether the specified user have specified permission (of specified
+            object).
+
+        Raises
+        ------
+        django.core.exceptions.ObjectDoesNotExist
+            If the specified string permission does not exist and
+            ``PERMISSION_CHECK_PERMISSION_PRESENCE`` is ``True`` in ``settings``
+            module.
+        """
+        await self._acheck_permission_presence(perm)
+        for handler in await registry.aget_handlers_for_perm(perm):
+            if await handler.ahas_perm(user_obj, perm, obj=obj):
+                return True
+        return False
+
+    def has_perm_many(self, user_obj, perm, objs):
+        """
+        Check if user have permission of each object in a batch based on
+        registered handlers.
+
+        The handlers are looked up once for the whole batch and each handler
+        only check the objects which are not granted by the previous handlers.
+
+        Parameters
+        ----------
+        user_obj : django user model instance
+            A django user model instance which be checked
+        perm : string
+            `app_label.codename` formatted permission string
+        objs : iterable
+            An iterable of saved django model instances for object permission
+
+        Returns
+        -------
+        dict
+            A dictionary which map the primary key of each object to whether
+            the specified user have specified permission of the object.
+
+        Raises
+        ------
+        django.core.exceptions.ObjectDoesNotExist
+            If the specified string permission does not exist and
+            ``PERMISSION_CHECK_PERMISSION_PRESENCE`` is ``True`` in ``settings``
+            module.
+        """
+        self._check_permission_presence(perm)
+        objs = list(objs)
+        results = {obj.pk: False for obj in objs}
+        remaining = objs
+        for handler in registry.get_handlers_for_perm(perm):
+            if not remaining:
+                break
+            granted = handler.has_perm_many(user_obj, perm, remaining)
+            for obj in remaining:
+                if granted.get(obj.pk):
+                    results[obj.pk] = True
+            remaining = [obj for obj in remaining if not results[obj.pk]]
+        return results
+
+    def _check_permission_presence(self, perm):
+        if settings.PERMISSION_CHECK_PERMISSION_PRESENCE:
+            # check the perm against the preloaded perms without query
+            # it raise ObjectDoesNotExists when the permission is not exists
+            if "." not in perm:
+                # Django 1.2 internally use wrong permission string thus ignore
+                return
+            if not perm_exists(perm):
+                _raise_permission_does_not_exist(perm)
+
+    async def _acheck_permission_presence(self, perm):
+        if settings.PERMISSION_CHECK_PERMISSION_PRESENCE and "." in perm:
+            # load the perms in a thread only when they are not loaded
+            if not await aperm_exists(perm):
+                _raise_permission_does_not_exist(perm)
+
     def has_module_perms(self, user_obj, app_label):
         """
         Check if user have permission of specified app based on registered
@@ -106,14 +184,35 @@ class PermissionBackend:
             ``PERMISSION_CHECK_PERMISSION_PRESENCE`` is ``True`` in ``settings``
             module.
         """
-        # get permission handlers for this perm
-        cache_name = f"_{app_label}_cache"
-        if hasattr(self, cache_name):
-            handlers = getattr(self, cache_name)
-        else:
-            handlers = [h for h in registry.get_handlers() if app_label in h.get_supported_app_labels()]
-            setattr(self, cache_name, handlers)
-        for handler in handlers:
+        for handler in registry.get_handlers_for_app_label(app_label):
             if handler.has_module_perms(user_obj, app_label):
                 return True
         return False
+
+    async def ahas_module_perms(self, user_obj, app_label):
+        """
+        Async version of :meth:`has_module_perms` based on
+        ``ahas_module_perms`` of registered handlers.
+
+        Parameters
+        ----------
+        user_obj : django user model instance
+            A django user model instance which is checked
+        app_label : string
+            Django application name
+
+        Returns
+        -------
+        boolean
+            Whether the specified user have specified permission.
+        """
+        for handler in await registry.aget_handlers_for_app_label(app_label):
+            if await handler.ahas_module_perms(user_obj, app_label):
+                return True
+        return False
+
+
+def _raise_permission_does_not_exist(perm):
+    from django.contrib.auth.models import Permission
+
+    raise Permission.DoesNotExist(f"Permission '{perm}' does not exist.")
@@ -15,6 +15,24 @@ class PermissionConf(AppConf):
     CHECK_PERMISSION_PRESENCE = settings.DEBUG
     """Check if the specified string permission exists"""
 
+    CACHE_MAXSIZE = 1000
+    """Maximum number of permission decisions cached in a user instance (``None`` for unlimited)"""
+
+    MODULE_PERMS_CACHE_MAXSIZE = 1000
+    """Maximum number of users whose ``has_module_perms`` results are cached in a handler (``None`` for unlimited)"""
+
+    MODULE_PERMS_CACHE_TIMEOUT = None
+    """Number of seconds before a cached ``has_module_perms`` result expires (``None`` for never)"""
+
+    SHARED_CACHE = None
+    """Alias of ``CACHES`` to share permission decisions between processes (``None`` for disabled)"""
+
+    SHARED_CACHE_TIMEOUT = 300
+    """Number of seconds before a shared permission decision expires (``None`` for never)"""
+
+    FILTER_CHUNK_SIZE = 2000
+    """Number of objects fetched at once to evaluate permission logics without ``get_q`` in ``filter_queryset``"""
+
     REPLACE_BUILTIN_IF = True
     """Whether replace builtin if templatetag"""
 
@@ -42,6 +60,9 @@ class PermissionConf(AppConf):
     DEFAULT_SPL_CHANGE_PERMISSION = True
     DEFAULT_SPL_DELETE_PERMISSION = False
 
+    WARMUP_ON_READY = False
+    """Load the supported permissions of all registered handlers when the application is ready"""
+
     AUTODISCOVER_MODULE_NAME = "perms"
     AUTODISCOVER_VARIABLE_NAME = "PERMISSION_LOGICS"
     AUTODISCOVER_ENABLE = True
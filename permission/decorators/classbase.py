@@ -4,9 +4,10 @@ permission_required decorator for generic classbased view from django 1.3
 
 from functools import wraps
 
+from asgiref.sync import iscoroutinefunction, sync_to_async
 from django.core.exceptions import PermissionDenied
 
-from permission.decorators.utils import redirect_to_login
+from permission.decorators.utils import aget_user, ahas_perm, redirect_to_login
 
 
 def permission_required(perm, queryset=None, login_url=None, raise_exception=False):
@@ -40,6 +41,23 @@ def permission_required(perm, queryset=None, login_url=None, raise_exception=Fal
 
     def wrapper(cls):
         def view_wrapper(view_func):
+            if iscoroutinefunction(view_func) or getattr(cls, "view_is_async", False):
+
+                @wraps(view_func)
+                async def ainner(self, request, *args, **kwargs):
+                    # get object
+                    obj = await aget_object_from_classbased_instance(self, queryset, request, *args, **kwargs)
+
+                    user_obj = await aget_user(request)
+                    if not await ahas_perm(user_obj, perm, obj=obj):
+                        if raise_exception:
+                            raise PermissionDenied
+                        else:
+                            return redirect_to_login(request, login_url)
+                    return await view_func(self, request, *args, **kwargs)
+
+                return ainner
+
             @wraps(view_func)
             def inner(self, request, *args, **kwargs):
                 # get object
@@ -112,3 +130,36 @@ def get_object_from_classbased_instance(instance, queryset, request, *args, **kw
     else:
         obj = None
     return obj
+
+
+async def aget_object_from_classbased_instance(instance, queryset, request, *args, **kwargs):
+    """
+    Async version of :func:`get_object_from_classbased_instance`
+
+    The object is fetched with ``aget_object`` of the instance if the view
+    define it, otherwise :func:`get_object_from_classbased_instance` is
+    called in a thread.
+
+    Parameters
+    ----------
+    instance : instance
+        An instance of classbased generic view
+    queryset : instance
+        A queryset instance
+    request : instance
+        A instance of HttpRequest
+
+    Returns
+    -------
+    instance
+        An instance of model object or None
+    """
+    if not hasattr(instance, "aget_object"):
+        return await sync_to_async(get_object_from_classbased_instance)(instance, queryset, request, *args, **kwargs)
+
+    instance.request = request
+    instance.args = args
+    instance.kwargs = kwargs
+    if not queryset and hasattr(instance, "get_queryset"):
+        queryset = instance.get_queryset()
+    return await instance.aget_object(queryset)
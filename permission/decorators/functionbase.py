@@ -5,10 +5,12 @@ permission_required decorator for generic function view
 import copy
 from functools import wraps
 
+from asgiref.sync import iscoroutinefunction
 from django.core.exceptions import PermissionDenied
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 
-from permission.decorators.utils import redirect_to_login
+from permission.decorators.utils import aget_user, ahas_perm, redirect_to_login
 
 
 def permission_required(perm, queryset=None, login_url=None, raise_exception=False):
@@ -39,18 +41,36 @@ def permission_required(perm, queryset=None, login_url=None, raise_exception=Fal
     """
 
     def wrapper(view_func):
+        if iscoroutinefunction(view_func):
+
+            @wraps(view_func)
+            async def ainner(request, *args, **kwargs):
+                _kwargs = _get_view_kwargs(queryset, kwargs)
+
+                # get object from view with the async ORM interface
+                fn = _get_object_getter(_kwargs)
+                if fn.validate(request, *args, **_kwargs):
+                    obj = await fn.async_version(request, *args, **_kwargs)
+                else:
+                    # required arguments is not passed
+                    obj = None
+
+                user_obj = await aget_user(request)
+                if not await ahas_perm(user_obj, perm, obj=obj):
+                    if raise_exception:
+                        raise PermissionDenied
+                    else:
+                        return redirect_to_login(request, login_url)
+                return await view_func(request, *args, **_kwargs)
+
+            return ainner
+
         @wraps(view_func)
         def inner(request, *args, **kwargs):
-            _kwargs = copy.copy(kwargs)
-            # overwrite queryset if specified
-            if queryset:
-                _kwargs["queryset"] = queryset
+            _kwargs = _get_view_kwargs(queryset, kwargs)
 
             # get object from view
-            if "date_field" in _kwargs:
-                fn = get_object_from_date_based_view
-            else:
-                fn = get_object_from_list_detail_view
+            fn = _get_object_getter(_kwargs)
             if fn.validate(request, *args, **_kwargs):
                 obj = fn(request, *args, **_kwargs)
             else:
@@ -69,6 +89,27 @@ def permission_required(perm, queryset=None, login_url=None, raise_exception=Fal
     return wrapper
 
 
+def _get_view_kwargs(queryset, kwargs):
+    _kwargs = copy.copy(kwargs)
+    # overwrite queryset if specified
+    if queryset:
+        _kwargs["queryset"] = queryset
+    return _kwargs
+
+
+def _get_object_getter(kwargs):
+    if "date_field" in kwargs:
+        return get_object_from_date_based_view
+    return get_object_from_list_detail_view
+
+
+async def _aget_object_or_404(queryset, **kwargs):
+    try:
+        return await queryset.aget(**kwargs)
+    except queryset.model.DoesNotExist:
+        raise Http404(f"No {queryset.model._meta.object_name} matches the given query.")
+
+
 def get_object_from_list_detail_view(request, *args, **kwargs):
     """
     Get object from generic list_detail.detail view
@@ -83,17 +124,30 @@ def get_object_from_list_detail_view(request, *args, **kwargs):
     instance
         An instance of model object or None
     """
+    queryset, lookup_kwargs = _get_list_detail_lookup(kwargs)
+    return get_object_or_404(queryset, **lookup_kwargs)
+
+
+async def aget_object_from_list_detail_view(request, *args, **kwargs):
+    """
+    Async version of :func:`get_object_from_list_detail_view`
+    """
+    queryset, lookup_kwargs = _get_list_detail_lookup(kwargs)
+    return await _aget_object_or_404(queryset, **lookup_kwargs)
+
+
+def _get_list_detail_lookup(kwargs):
     queryset = kwargs["queryset"]
     object_id = kwargs.get("object_id", None)
     slug = kwargs.get("slug", None)
     slug_field = kwargs.get("slug_field", "slug")
     if object_id:
-        obj = get_object_or_404(queryset, pk=object_id)
+        lookup_kwargs = {"pk": object_id}
     elif slug and slug_field:
-        obj = get_object_or_404(queryset, **{slug_field: slug})
+        lookup_kwargs = {slug_field: slug}
     else:
         raise AttributeError("Generic detail view must be called with either an object_id or a slug/slug_field.")
-    return obj
+    return queryset, lookup_kwargs
 
 
 def _get_object_from_list_detail_view_validation(request, *args, **kwargs):
@@ -105,6 +159,7 @@ def _get_object_from_list_detail_view_validation(request, *args, **kwargs):
 
 
 get_object_from_list_detail_view.validate = _get_object_from_list_detail_view_validation
+get_object_from_list_detail_view.async_version = aget_object_from_list_detail_view
 
 
 def get_object_from_date_based_view(request, *args, **kwargs):
@@ -121,11 +176,23 @@ def get_object_from_date_based_view(request, *args, **kwargs):
     instance
         An instance of model object or None
     """
+    queryset, lookup_kwargs = _get_date_based_lookup(kwargs)
+    return get_object_or_404(queryset, **lookup_kwargs)
+
+
+async def aget_object_from_date_based_view(request, *args, **kwargs):
+    """
+    Async version of :func:`get_object_from_date_based_view`
+    """
+    queryset, lookup_kwargs = _get_date_based_lookup(kwargs)
+    return await _aget_object_or_404(queryset, **lookup_kwargs)
+
+
+def _get_date_based_lookup(kwargs):
     import datetime
     import time
 
     from django.db.models.fields import DateTimeField
-    from django.http import Http404
 
     try:
         from django.utils import timezone
@@ -172,7 +239,7 @@ def get_object_from_date_based_view(request, *args, **kwargs):
         lookup_kwargs[f"{slug_field}__exact"] = slug
     else:
         raise AttributeError("Generic detail view must be called with either an object_id or a slug/slug_field.")
-    return get_object_or_404(queryset, **lookup_kwargs)
+    return queryset, lookup_kwargs
 
 
 def _get_object_from_date_based_view_validation(request, *args, **kwargs):
@@ -186,3 +253,4 @@ def _get_object_from_date_based_view_validation(request, *args, **kwargs):
 
 
 get_object_from_date_based_view.validate = _get_object_from_date_based_view_validation
+get_object_from_date_based_view.async_version = aget_object_from_date_based_view
@@ -4,10 +4,11 @@ permission_required decorator for generic classbased/functionbased view
 
 from functools import wraps
 
+from asgiref.sync import iscoroutinefunction
 from django.core.exceptions import PermissionDenied
 from django.http import HttpRequest
 
-from permission.decorators.utils import redirect_to_login
+from permission.decorators.utils import aget_user, ahas_perm, redirect_to_login
 
 
 def permission_required(perm, queryset=None, login_url=None, raise_exception=False):
@@ -46,6 +47,41 @@ def permission_required(perm, queryset=None, login_url=None, raise_exception=Fal
     """
 
     def wrapper(view_method):
+        if iscoroutinefunction(view_method):
+
+            @wraps(view_method)
+            async def ainner(self, request=None, *args, **kwargs):
+                if isinstance(self, HttpRequest):
+                    from permission.decorators.functionbase import (
+                        permission_required as decorator,
+                    )
+
+                    # this is a functional view not classbased view.
+                    decorator = decorator(perm, queryset, login_url, raise_exception)
+                    decorator = decorator(view_method)
+                    if not request:
+                        args = list(args)
+                        args.insert(0, request)
+                    request = self
+                    return await decorator(request, *args, **kwargs)
+                else:
+                    from permission.decorators.classbase import (
+                        aget_object_from_classbased_instance,
+                    )
+
+                    # get object
+                    obj = await aget_object_from_classbased_instance(self, queryset, request, *args, **kwargs)
+
+                    user_obj = await aget_user(request)
+                    if not await ahas_perm(user_obj, perm, obj=obj):
+                        if raise_exception:
+                            raise PermissionDenied
+                        else:
+                            return redirect_to_login(request, login_url)
+                    return await view_method(self, request, *args, **kwargs)
+
+            return ainner
+
         @wraps(view_method)
         def inner(self, request=None, *args, **kwargs):
             if isinstance(self, HttpRequest):
@@ -2,12 +2,13 @@
 Decorator utility module
 """
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth import REDIRECT_FIELD_NAME
 
 from permission.compat import urlparse
 from permission.conf import settings
 
-__all__ = ["redirect_to_login"]
+__all__ = ["aget_user", "ahas_perm", "redirect_to_login"]
 
 
 def redirect_to_login(request, login_url=None, redirect_field_name=REDIRECT_FIELD_NAME):
@@ -22,3 +23,18 @@ def redirect_to_login(request, login_url=None, redirect_field_name=REDIRECT_FIEL
     from django.contrib.auth.views import redirect_to_login as auth_redirect_to_login
 
     return auth_redirect_to_login(path, login_url, redirect_field_name)
+
+
+async def aget_user(request):
+    """get the user of the request without sync database access"""
+    if hasattr(request, "auser"):
+        return await request.auser()
+    return request.user
+
+
+async def ahas_perm(user_obj, perm, obj=None):
+    """check the permission of the user on the event loop if possible"""
+    if hasattr(user_obj, "ahas_perm"):
+        # Django 5.2 or later call ahas_perm of the backends
+        return await user_obj.ahas_perm(perm, obj=obj)
+    return await sync_to_async(user_obj.has_perm)(perm, obj=obj)
@@ -1,6 +1,23 @@
+import asyncio
+import itertools
 from collections.abc import Callable
 
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+
+from permission.conf import settings
+from permission.utils.cache import (
+    LRUCache,
+    aget_shared_cache_key,
+    get_cache_key,
+    get_permission_cache,
+    get_shared_cache,
+    get_shared_cache_key,
+)
+from permission.utils.field_lookup import get_field_path_accessor
 from permission.utils.permissions import get_app_perms, get_model_perms
+from permission.utils.queryset import PermittedPrimaryKeys, get_annotated_permission
 
 
 class PermissionHandler:
@@ -17,10 +34,13 @@ class PermissionHandler:
 
     @includes.setter
     def includes(self, value):
+        from permission.utils.handlers import registry
+
         # clear cache
         if hasattr(self, "_perms_cache"):
             del self._perms_cache
         self._includes = value
+        registry.invalidate()
 
     @property
     def excludes(self):
@@ -28,10 +48,13 @@ class PermissionHandler:
 
     @excludes.setter
     def excludes(self, value):
+        from permission.utils.handlers import registry
+
         # clear cache
         if hasattr(self, "_perms_cache"):
             del self._perms_cache
         self._excludes = value
+        registry.invalidate()
 
     def __init__(self, model_or_app_label):
         """
@@ -110,6 +133,17 @@ class PermissionHandler:
             self._perms_cache = includes
         return self._perms_cache
 
+    async def aget_supported_permissions(self):
+        """
+        Async version of :meth:`get_supported_permissions`
+
+        The permissions are loaded in a thread only when they are not
+        cached yet.
+        """
+        if hasattr(self, "_perms_cache"):
+            return self._perms_cache
+        return await sync_to_async(self.get_supported_permissions)()
+
     def get_supported_app_labels(self):
         """
         Get app labels which this handler can treat.
@@ -156,6 +190,55 @@ class PermissionHandler:
             "method. Sub class must override this method."
         )
 
+    async def ahas_perm(self, user_obj, perm, obj=None):
+        """
+        Async version of :meth:`has_perm`
+
+        The default implementation call :meth:`has_perm` in a thread. Sub
+        class can override this method to check the permission natively.
+
+        Parameters
+        ----------
+        user_obj : django user model instance
+            A django user model instance which be checked
+        perm : string
+            `app_label.codename` formatted permission string
+        obj : None or django model instance
+            None or django model instance for object permission
+
+        Returns
+        -------
+        boolean
+            Whether the specified user have specified permission (of specified
+            object).
+        """
+        return await sync_to_async(self.has_perm)(user_obj, perm, obj=obj)
+
+    def has_perm_many(self, user_obj, perm, objs):
+        """
+        Check if user have permission of each object in a batch
+
+        Sub class can override this method to check the objects more
+        efficiently. The default implementation call :meth:`has_perm` for
+        each object.
+
+        Parameters
+        ----------
+        user_obj : django user model instance
+            A django user model instance which be checked
+        perm : string
+            `app_label.codename` formatted permission string
+        objs : iterable
+            An iterable of saved django model instances for object permission
+
+        Returns
+        -------
+        dict
+            A dictionary which map the primary key of each object to whether
+            the specified user have specified permission of the object.
+        """
+        return {obj.pk: self.has_perm(user_obj, perm, obj=obj) for obj in objs}
+
     def has_module_perms(self, user_obj, app_label):
         """
         Check if user have permission of specified app
@@ -172,19 +255,74 @@ class PermissionHandler:
         boolean
             Whether the specified user have any permissions of specified app
 
+        .. note::
+            The result is cached per user in this handler. The cache is
+            bounded by ``PERMISSION_MODULE_PERMS_CACHE_MAXSIZE`` and
+            ``PERMISSION_MODULE_PERMS_CACHE_TIMEOUT`` in settings and cleared
+            when the groups or permissions of the user are changed.
+            Use :func:`permission.utils.cache.clear_permission_cache` to clear
+            it manually.
         """
-        cache_name = f"_has_module_perms_{app_label}_{user_obj.pk}_cache"
-        if hasattr(self, cache_name):
-            return getattr(self, cache_name)
         if self.app_label != app_label:
-            setattr(self, cache_name, False)
+            return False
+        cache = self._get_module_perms_cache()
+        result = cache.get(user_obj.pk)
+        if result is None:
+            result = any(user_obj.has_perm(permission) for permission in self.get_supported_permissions())
+            cache.set(user_obj.pk, result)
+        return result
+
+    async def ahas_module_perms(self, user_obj, app_label):
+        """
+        Async version of :meth:`has_module_perms`
+
+        The cached result is returned without a thread hop; otherwise
+        :meth:`has_module_perms` is called in a thread.
+
+        Parameters
+        ----------
+        user_obj : django user model instance
+            A django user model instance which be checked
+        app_label : string
+            Django application name
+
+        Returns
+        -------
+        boolean
+            Whether the specified user have any permissions of specified app
+        """
+        if self.app_label != app_label:
+            return False
+        result = self._get_module_perms_cache().get(user_obj.pk)
+        if result is None:
+            result = await sync_to_async(self.has_module_perms)(user_obj, app_label)
+        return result
+
+    def clear_module_perms_cache(self, user_pk=None):
+        """
+        Clear the cache of :meth:`has_module_perms`
+
+        Parameters
+        ----------
+        user_pk : any
+            A primary key of django user model instance to clear the cache of.
+            ``None`` for clearing the cache of all users.
+        """
+        cache = getattr(self, "_module_perms_cache", None)
+        if cache is None:
+            return
+        if user_pk is None:
+            cache.clear()
         else:
-            for permission in self.get_supported_permissions():
-                if user_obj.has_perm(permission):
-                    setattr(self, cache_name, True)
-                    return True
-        setattr(self, cache_name, False)
-        return False
+            cache.delete(user_pk)
+
+    def _get_module_perms_cache(self):
+        if not hasattr(self, "_module_perms_cache"):
+            self._module_perms_cache = LRUCache(
+                maxsize=settings.PERMISSION_MODULE_PERMS_CACHE_MAXSIZE,
+                timeout=settings.PERMISSION_MODULE_PERMS_CACHE_TIMEOUT,
+            )
+        return self._module_perms_cache
 
 
 class LogicalPermissionHandler(PermissionHandler):
@@ -215,7 +353,19 @@ class LogicalPermissionHandler(PermissionHandler):
         Check if user have permission (of object) based on
         specified models's ``_permission_logics`` attribute.
 
+        If the object was annotated by
+        :func:`permission.utils.queryset.annotate_permissions` for the user,
+        the annotation is used without calling permission logics.
+
         The result will be stored in user_obj as a cache to reduce method call.
+        The cache is keyed on the model label, the primary key of the object
+        and the permission, and bounded by ``PERMISSION_CACHE_MAXSIZE`` in
+        settings. Use :func:`permission.utils.cache.clear_permission_cache`
+        to clear it.
+
+        If ``PERMISSION_SHARED_CACHE`` is set in settings, the results are
+        shared between processes through the cache of the alias as well (see
+        :func:`permission.utils.cache.get_shared_cache_key`).
 
         Parameters
         ----------
@@ -234,20 +384,343 @@ class LogicalPermissionHandler(PermissionHandler):
         """
         if perm not in self.get_supported_permissions():
             return False
+        # use the permission annotated by annotate_permissions
+        result = get_annotated_permission(user_obj, perm, obj)
+        if result is not None:
+            return result
         # use cache to reduce method call
-        CACHE_NAME = "_logical_perms_cache"
-        if not hasattr(user_obj, CACHE_NAME):
-            setattr(user_obj, CACHE_NAME, {})
-        cache = getattr(user_obj, CACHE_NAME)
-        cachekey = f"{perm} {hash(obj)}"
-        if cachekey not in cache:
-            cache[cachekey] = self._has_perm(user_obj, perm, obj)
-        return cache[cachekey]
+        cachekey = get_cache_key(perm, obj)
+        if cachekey is None:
+            return self._has_perm(user_obj, perm, obj)
+        cache = get_permission_cache(user_obj)
+        result = cache.get(cachekey)
+        if result is None:
+            result = self._has_shared_perm(user_obj, perm, obj)
+            cache.set(cachekey, result)
+        return result
+
+    async def ahas_perm(self, user_obj, perm, obj=None):
+        """
+        Async version of :meth:`has_perm`
+
+        ``ahas_perm`` of the permission logics are called. Permission logics
+        of the same ``cost`` are evaluated concurrently with
+        ``asyncio.gather`` and cheaper permission logics are evaluated first.
+        The annotations and the cache are used in the same way as
+        :meth:`has_perm`.
+
+        Parameters
+        ----------
+        user_obj : django user model instance
+            A django user model instance which be checked
+        perm : string
+            `app_label.codename` formatted permission string
+        obj : None or django model instance
+            None or django model instance for object permission
+
+        Returns
+        -------
+        boolean
+            Whether the specified user have specified permission (of specified
+            object).
+        """
+        if perm not in await self.aget_supported_permissions():
+            return False
+        result = get_annotated_permission(user_obj, perm, obj)
+        if result is not None:
+            return result
+        cachekey = get_cache_key(perm, obj)
+        if cachekey is None:
+            return await self._ahas_perm(user_obj, perm, obj)
+        cache = get_permission_cache(user_obj)
+        result = cache.get(cachekey)
+        if result is None:
+            result = await self._ahas_shared_perm(user_obj, perm, obj)
+            cache.set(cachekey, result)
+        return result
+
+    def has_perm_many(self, user_obj, perm, objs):
+        """
+        Check if user have permission of each object in a batch based on
+        specified models's ``_permission_logics`` attribute.
+
+        Each permission logic check the objects which are not granted yet in
+        a batch (see :meth:`permission.logics.base.PermissionLogic.has_perm_many`).
+        The results will be stored in user_obj as a cache thus following
+        :meth:`has_perm` calls for the objects do not call permission logics.
+
+        Parameters
+        ----------
+        user_obj : django user model instance
+            A django user model instance which be checked
+        perm : string
+            `app_label.codename` formatted permission string
+        objs : iterable
+            An iterable of saved django model instances for object permission
+
+        Returns
+        -------
+        dict
+            A dictionary which map the primary key of each object to whether
+            the specified user have specified permission of the object.
+        """
+        objs = list(objs)
+        if perm not in self.get_supported_permissions():
+            return {obj.pk: False for obj in objs}
+        cache = get_permission_cache(user_obj)
+        results = {}
+        remaining = []
+        for obj in objs:
+            result = cache.get(get_cache_key(perm, obj))
+            if result is None:
+                results[obj.pk] = False
+                remaining.append(obj)
+            else:
+                results[obj.pk] = result
+        for permission_logic in self.get_permission_logics(perm):
+            if not remaining:
+                break
+            granted = permission_logic.has_perm_many(user_obj, perm, remaining)
+            for obj in remaining:
+                if granted.get(obj.pk):
+                    results[obj.pk] = True
+            remaining = [obj for obj in remaining if not results[obj.pk]]
+        for obj in objs:
+            cachekey = get_cache_key(perm, obj)
+            if cachekey is not None:
+                cache.set(cachekey, results[obj.pk])
+        return results
+
+    def get_permission_logics(self, perm):
+        """
+        Get permission logics which can possibly grant the permission
+
+        The permission logics are picked from specified models's
+        ``_permission_logics`` attribute with ``get_grantable_permissions``
+        of each permission logic. The result is cached per permission until
+        ``_permission_logics`` is changed or the grantable permissions of a
+        permission logic are changed by ``bind``.
+
+        Parameters
+        ----------
+        perm : string
+            `app_label.codename` formatted permission string
+
+        Returns
+        -------
+        tuple
+            A tuple of permission logics in evaluation order
+        """
+        logics = tuple(getattr(self.model, "_permission_logics", ()))
+        # the grantable permissions are recomputed when the logic is bound again
+        key = (logics, tuple(x._get_grantable_permissions() for x in logics))
+        cache = getattr(self, "_permission_logics_cache", None)
+        if cache is None or cache[0] != key:
+            cache = (key, {})
+            self._permission_logics_cache = cache
+        table = cache[1]
+        if perm not in table:
+            table[perm] = tuple(x for x in logics if _can_grant(x, perm))
+        return table[perm]
+
+    def required_relations(self, perm):
+        """
+        Get relations which the permission logics traverse to check the
+        permission of an object
+
+        The relations are aggregated from ``get_required_relations`` of the
+        permission logics which can grant the permission. Single-valued
+        relations are returned for ``select_related`` and multi-valued
+        relations for ``prefetch_related``.
+
+        Parameters
+        ----------
+        perm : string
+            `app_label.codename` formatted permission string
+
+        Returns
+        -------
+        tuple
+            A tuple of two sets of '__' separated relation lookups for
+            ``select_related`` and ``prefetch_related``
+        """
+        select_related = set()
+        prefetch_related = set()
+        if perm not in self.get_supported_permissions():
+            return select_related, prefetch_related
+        for permission_logic in self.get_permission_logics(perm):
+            for lookup in permission_logic.get_required_relations():
+                if get_field_path_accessor(self.model, lookup).multi_valued:
+                    prefetch_related.add(lookup)
+                else:
+                    select_related.add(lookup)
+        return select_related, prefetch_related
+
+    def get_q(self, user_obj, perm):
+        """
+        Get a ``Q`` object which select the objects the user have permission
+        of based on specified models's ``_permission_logics`` attribute.
+
+        Parameters
+        ----------
+        user_obj : django user model instance
+            A django user model instance which be checked
+        perm : string
+            `app_label.codename` formatted permission string
+
+        Returns
+        -------
+        django.db.models.Q or None
+            The ``Q`` objects returned from ``get_q`` of each permission
+            logic OR-ed, or ``None`` if any permission logic cannot be
+            expressed as a ``Q`` object.
+        """
+        if perm not in self.get_supported_permissions():
+            return Q(pk__in=[])
+        q, fallback_logics = self._get_q(user_obj, perm)
+        if fallback_logics:
+            return None
+        return q
+
+    def _get_q(self, user_obj, perm):
+        q = Q(pk__in=[])
+        fallback_logics = []
+        for permission_logic in self.get_permission_logics(perm):
+            logic_q = permission_logic.get_q(user_obj, perm)
+            if logic_q is None:
+                fallback_logics.append(permission_logic)
+            else:
+                q |= logic_q
+        return q, fallback_logics
+
+    def _has_shared_perm(self, user_obj, perm, obj=None):
+        shared_cache = get_shared_cache()
+        if shared_cache is None:
+            return self._has_perm(user_obj, perm, obj)
+        cachekey = get_shared_cache_key(shared_cache, user_obj, perm, obj)
+        if cachekey is None:
+            return self._has_perm(user_obj, perm, obj)
+        result = shared_cache.get(cachekey)
+        if result is None:
+            result = self._has_perm(user_obj, perm, obj)
+            shared_cache.set(cachekey, result, settings.PERMISSION_SHARED_CACHE_TIMEOUT)
+        return result
+
+    async def _ahas_shared_perm(self, user_obj, perm, obj=None):
+        shared_cache = get_shared_cache()
+        if shared_cache is None:
+            return await self._ahas_perm(user_obj, perm, obj)
+        cachekey = await aget_shared_cache_key(shared_cache, user_obj, perm, obj)
+        if cachekey is None:
+            return await self._ahas_perm(user_obj, perm, obj)
+        result = await shared_cache.aget(cachekey)
+        if result is None:
+            result = await self._ahas_perm(user_obj, perm, obj)
+            await shared_cache.aset(cachekey, result, settings.PERMISSION_SHARED_CACHE_TIMEOUT)
+        return result
 
     def _has_perm(self, user_obj, perm, obj=None):
         if perm not in self.get_supported_permissions():
             return False
-        for permission_logic in getattr(self.model, "_permission_logics", set()):
+        for permission_logic in self.get_permission_logics(perm):
             if permission_logic.has_perm(user_obj, perm, obj):
                 return True
         return False
+
+    async def _ahas_perm(self, user_obj, perm, obj=None):
+        permission_logics = self.get_permission_logics(perm)
+        for _, group in itertools.groupby(permission_logics, key=lambda x: x.cost):
+            results = await asyncio.gather(*(x.ahas_perm(user_obj, perm, obj) for x in group))
+            if any(results):
+                return True
+        return False
+
+    def filter_queryset(self, user_obj, perm, queryset):
+        """
+        Filter the queryset to the objects which the user have permission of
+        based on specified models's ``_permission_logics`` attribute.
+
+        The ``Q`` objects returned from ``get_q`` of each permission logic are
+        OR-ed thus the queryset is filtered in a single SQL query.
+        Permission logics which cannot be expressed as a ``Q`` object
+        (``get_q`` returns ``None``) are evaluated with ``has_perm`` for each
+        object in the queryset instead (see
+        :class:`permission.utils.queryset.PermittedPrimaryKeys`). The objects
+        are fetched in chunks of ``PERMISSION_FILTER_CHUNK_SIZE`` in settings
+        when the returned queryset is evaluated.
+
+        Parameters
+        ----------
+        user_obj : django user model instance
+            A django user model instance which be checked
+        perm : string
+            `app_label.codename` formatted permission string
+        queryset : django queryset
+            A queryset of the model of this handler
+
+        Returns
+        -------
+        django queryset
+            A queryset which contains the objects the specified user have
+            specified permission of.
+        """
+        if perm not in self.get_supported_permissions():
+            return queryset.none()
+        q, fallback_logics = self._get_q(user_obj, perm)
+        if fallback_logics:
+            # evaluated when the queryset is evaluated
+            q |= Q(pk__in=PermittedPrimaryKeys(queryset.exclude(q), user_obj, perm, fallback_logics))
+        # use subquery to prevent duplicated rows from multi-valued relations
+        return queryset.filter(pk__in=self.model._base_manager.filter(q).values("pk"))
+
+    def users_with_perm(self, perm, obj=None):
+        """
+        Get the users who have the permission (of the object) based on
+        specified models's ``_permission_logics`` attribute.
+
+        The ``Q`` objects returned from ``get_user_q`` of each permission
+        logic are OR-ed thus the users are selected in a single SQL query.
+        Permission logics which cannot be expressed as a ``Q`` object
+        (``get_user_q`` returns ``None``) are evaluated with ``has_perm`` for
+        each user instead.
+
+        Parameters
+        ----------
+        perm : string
+            `app_label.codename` formatted permission string
+        obj : None or django model instance
+            None or django model instance for object permission
+
+        Returns
+        -------
+        django queryset
+            A queryset of the user model which contains the users who have
+            specified permission (of specified object).
+        """
+        user_model = get_user_model()
+        if perm not in self.get_supported_permissions():
+            return user_model._default_manager.none()
+        q = Q(pk__in=[])
+        fallback_logics = []
+        for permission_logic in self.get_permission_logics(perm):
+            logic_q = permission_logic.get_user_q(perm, obj)
+            if logic_q is None:
+                fallback_logics.append(permission_logic)
+            else:
+                q |= logic_q
+        if fallback_logics:
+            users = user_model._default_manager.exclude(q)
+            pks = [
+                user.pk
+                for user in users.iterator(chunk_size=settings.PERMISSION_FILTER_CHUNK_SIZE)
+                if any(logic.has_perm(user, perm, obj) for logic in fallback_logics)
+            ]
+            q |= Q(pk__in=pks)
+        # use subquery to prevent duplicated rows from multi-valued relations
+        pks = user_model._base_manager.filter(q).values("pk")
+        return user_model._default_manager.filter(pk__in=pks)
+
+
+def _can_grant(permission_logic, perm):
+    grantable_permissions = permission_logic.get_grantable_permissions()
+    return grantable_permissions is None or perm in grantable_permissions
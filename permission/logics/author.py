@@ -2,10 +2,12 @@
 Permission logic module for author based permission system
 """
 
+from django.db.models import Q
+
 from permission.compat import is_authenticated
 from permission.conf import settings
-from permission.logics.base import PermissionLogic
-from permission.utils.field_lookup import field_lookup
+from permission.logics.base import COST_SINGLE_ROW_QUERY, PermissionLogic
+from permission.utils.field_lookup import get_field_path_accessor
 
 
 class AuthorPermissionLogic(PermissionLogic):
@@ -13,6 +15,8 @@ class AuthorPermissionLogic(PermissionLogic):
     Permission logic class for author based permission system
     """
 
+    cost = COST_SINGLE_ROW_QUERY
+
     def __init__(
         self,
         field_name=None,
@@ -66,6 +70,53 @@ class AuthorPermissionLogic(PermissionLogic):
         if self.delete_permission is None:
             self.delete_permission = settings.PERMISSION_DEFAULT_APL_DELETE_PERMISSION
 
+    def bind(self, model):
+        """
+        Bind this permission logic to the model and parse ``field_name``
+        """
+        super().bind(model)
+        self._accessor = get_field_path_accessor(model, self.field_name)
+
+    def get_grantable_permissions(self):
+        """
+        Get permissions which this permission logic can possibly grant to
+        the author
+
+        Returns
+        -------
+        set or None
+            A set instance of `app_label.codename` formatted permission
+            strings, or ``None`` if :attr:`any_permission` is True.
+        """
+        if self.any_permission:
+            return None
+        perms = set()
+        if self.change_permission:
+            perms.add(self.get_full_permission_string("change"))
+        if self.delete_permission:
+            perms.add(self.get_full_permission_string("delete"))
+        return perms
+
+    def get_required_relations(self):
+        """
+        Get relations which this permission logic traverse to find the author
+
+        The last foreign key is not required while the id of the author is
+        compared without fetching the author.
+
+        Returns
+        -------
+        set
+            A set instance of '__' separated relation lookups
+        """
+        accessor = self._accessor
+        if accessor.fields is None:
+            return set()
+        field_path = accessor.field_path
+        if accessor.attname is not None:
+            field_path = field_path[:-1]
+        return {"__".join(field_path)} if field_path else set()
+
     def has_perm(self, user_obj, perm, obj=None):
         """
         Check if user have permission (of object)
@@ -102,29 +153,89 @@ class AuthorPermissionLogic(PermissionLogic):
         """
         if not is_authenticated(user_obj):
             return False
-        # construct the permission full name
-        change_permission = self.get_full_permission_string("change")
-        delete_permission = self.get_full_permission_string("delete")
-        # check if the user is authenticated
+        if not self._is_grantable(perm):
+            return False
         if obj is None:
             # object permission without obj should return True
             # Ref: https://code.djangoproject.com/wiki/RowLevelPermissions
-            if self.any_permission:
-                return True
-            if self.change_permission and perm == change_permission:
-                return True
-            if self.delete_permission and perm == delete_permission:
-                return True
+            return True
+        elif user_obj.is_active:
+            # compare the primary key without fetching the author
+            return _is_same_pk(self._accessor.get_related_pk(obj), user_obj.pk)
+        return False
+
+    async def ahas_perm(self, user_obj, perm, obj=None):
+        """
+        Async version of :meth:`has_perm`
+
+        The id of the author is fetched with the async ORM interface when it
+        is not available in the object.
+        """
+        if not is_authenticated(user_obj):
+            return False
+        if not self._is_grantable(perm):
             return False
+        if obj is None:
+            return True
         elif user_obj.is_active:
-            # get author instance
-            author = field_lookup(obj, self.field_name)
-            if author == user_obj:
-                if self.any_permission:
-                    # have any kind of permissions to the obj
-                    return True
-                if self.change_permission and perm == change_permission:
-                    return True
-                if self.delete_permission and perm == delete_permission:
-                    return True
+            return _is_same_pk(await self._accessor.aget_related_pk(obj), user_obj.pk)
         return False
+
+    def get_q(self, user_obj, perm):
+        """
+        Get a ``Q`` object which select the objects the user is the author of
+
+        If the user_obj is not authenticated or not active, or the specified
+        permission is not given to the author, the ``Q`` object select
+        nothing.
+
+        Parameters
+        ----------
+        user_obj : django user model instance
+            A django user model instance which be checked
+        perm : string
+            `app_label.codename` formatted permission string
+
+        Returns
+        -------
+        django.db.models.Q
+            A ``Q`` object like ``Q(author=user_obj)``
+        """
+        if not is_authenticated(user_obj) or not user_obj.is_active:
+            return Q(pk__in=[])
+        if not self._is_grantable(perm):
+            return Q(pk__in=[])
+        return Q(**{self.field_name: user_obj})
+
+    def get_user_q(self, perm, obj=None):
+        """
+        Get a ``Q`` object of the user model which select the users who have
+        the permission (of the object)
+
+        It selects the author of the object (e.g. ``Q(pk=obj.author_id)``).
+
+        Parameters
+        ----------
+        perm : string
+            `app_label.codename` formatted permission string
+        obj : None or django model instance
+            None or django model instance for object permission
+
+        Returns
+        -------
+        django.db.models.Q
+            A ``Q`` object of the user model
+        """
+        if not self._is_grantable(perm):
+            return Q(pk__in=[])
+        if obj is None:
+            return Q(pk__isnull=False)
+        author_pk = self._accessor.get_related_pk(obj)
+        if author_pk is None:
+            return Q(pk__in=[])
+        return Q(pk=author_pk) & self._get_active_user_q()
+
+
+def _is_same_pk(pk, user_pk):
+    # an object without author is not authored by an unsaved user
+    return pk is not None and pk == user_pk
@@ -1,8 +1,62 @@
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+
+from permission.utils.field_lookup import has_user_field
+
+COST_ATTRIBUTE = 0
+"""Cost class of permission logics which only read attributes"""
+
+COST_SINGLE_ROW_QUERY = 1
+"""Cost class of permission logics which query at most a single row"""
+
+COST_MULTI_ROW_QUERY = 2
+"""Cost class of permission logics which query multiple rows"""
+
+
 class PermissionLogic:
     """
     Abstract permission logic class
     """
 
+    cost = COST_SINGLE_ROW_QUERY
+    """
+    Cost class of this permission logic. Permission logics of a model are
+    evaluated in ascending order of the cost thus cheap logics can grant the
+    permission before expensive logics are evaluated.
+    """
+
+    def bind(self, model):
+        """
+        Bind this permission logic to the model
+
+        It is called once by :func:`permission.utils.logics.add_permission_logic`.
+        Sub class can override this method to precompute values which depend
+        on the model. Call this method again when the attributes of this
+        instance are changed after the binding.
+
+        Parameters
+        ----------
+        model : django model class
+            A django model class which will be treated by this permission
+            logic
+        """
+        self.model = model
+        # precompute the grantable permissions
+        self.__dict__.pop("_grantable_permissions", None)
+        self._get_grantable_permissions()
+
+    def _get_grantable_permissions(self):
+        if "_grantable_permissions" not in self.__dict__:
+            grantable_permissions = self.get_grantable_permissions()
+            if grantable_permissions is not None:
+                grantable_permissions = frozenset(grantable_permissions)
+            self._grantable_permissions = grantable_permissions
+        return self._grantable_permissions
+
+    def _is_grantable(self, perm):
+        grantable_permissions = self._get_grantable_permissions()
+        return grantable_permissions is None or perm in grantable_permissions
+
     def get_full_permission_string(self, perm):
         """
         Return full permission string (app_label.perm_model)
@@ -17,6 +71,39 @@ class PermissionLogic:
         model_name = self.model._meta.object_name.lower()
         return f"{app_label}.{perm}_{model_name}"
 
+    def get_grantable_permissions(self):
+        """
+        Get permissions which this permission logic can possibly grant
+
+        It is used by :class:`permission.handlers.LogicalPermissionHandler`
+        to call only the permission logics which can grant the permission.
+
+        Returns
+        -------
+        set or None
+            A set instance of `app_label.codename` formatted permission
+            strings, or ``None`` if this permission logic can grant any
+            permission.
+        """
+        return None
+
+    def get_required_relations(self):
+        """
+        Get relations which this permission logic traverse to check the
+        permission of an object
+
+        It is used by
+        :meth:`permission.handlers.LogicalPermissionHandler.required_relations`
+        to ``select_related`` or ``prefetch_related`` the relations before
+        the permissions of the objects are checked.
+
+        Returns
+        -------
+        set
+            A set instance of '__' separated relation lookups
+        """
+        return set()
+
     def has_perm(self, user_obj, perm, obj=None):
         """
         Check if user have permission (of object)
@@ -44,3 +131,116 @@ class PermissionLogic:
             "method. Sub class of `PermissionLogic` must override this "
             "method."
         )
+
+    async def ahas_perm(self, user_obj, perm, obj=None):
+        """
+        Async version of :meth:`has_perm`
+
+        The default implementation call :meth:`has_perm` in a thread thus
+        permission logics which only override :meth:`has_perm` keep working.
+        Sub class can override this method to use the async ORM interface.
+
+        Parameters
+        ----------
+        user_obj : django user model instance
+            A django user model instance which be checked
+        perm : string
+            `app_label.codename` formatted permission string
+        obj : None or django model instance
+            None or django model instance for object permission
+
+        Returns
+        -------
+        boolean
+            Whether the specified user have specified permission (of specified
+            object).
+        """
+        return await sync_to_async(self.has_perm)(user_obj, perm, obj)
+
+    def get_q(self, user_obj, perm):
+        """
+        Get a ``Q`` object which select the objects the user have permission of
+
+        It is used by
+        :meth:`permission.handlers.LogicalPermissionHandler.filter_queryset`
+        to filter a queryset in a single SQL query instead of calling
+        :meth:`has_perm` for each object.
+
+        Parameters
+        ----------
+        user_obj : django user model instance
+            A django user model instance which be checked
+        perm : string
+            `app_label.codename` formatted permission string
+
+        Returns
+        -------
+        django.db.models.Q or None
+            A ``Q`` object which select the objects the specified user have
+            specified permission of, or ``None`` if this permission logic
+            cannot be expressed as a ``Q`` object. In that case
+            :meth:`has_perm` is called for each object instead.
+        """
+        return None
+
+    def get_user_q(self, perm, obj=None):
+        """
+        Get a ``Q`` object of the user model which select the users who have
+        the permission (of the object)
+
+        It is used by
+        :meth:`permission.handlers.LogicalPermissionHandler.users_with_perm`
+        to find the users in a single SQL query instead of calling
+        :meth:`has_perm` for each user.
+
+        Parameters
+        ----------
+        perm : string
+            `app_label.codename` formatted permission string
+        obj : None or django model instance
+            None or django model instance for object permission
+
+        Returns
+        -------
+        django.db.models.Q or None
+            A ``Q`` object of the user model, or ``None`` if this permission
+            logic cannot be expressed as a ``Q`` object. In that case
+            :meth:`has_perm` is called for each user instead.
+        """
+        return None
+
+    def _get_active_user_q(self):
+        # is_active is not a field of custom user models built on AbstractBaseUser
+        if has_user_field("is_active"):
+            return Q(is_active=True)
+        return Q()
+
+    def has_perm_many(self, user_obj, perm, objs):
+        """
+        Check if user have permission of each object in a batch
+
+        The objects are checked with a single SQL query when :meth:`get_q`
+        return a ``Q`` object, otherwise :meth:`has_perm` is called for each
+        object.
+
+        Parameters
+        ----------
+        user_obj : django user model instance
+            A django user model instance which be checked
+        perm : string
+            `app_label.codename` formatted permission string
+        objs : iterable
+            An iterable of saved django model instances for object permission
+
+        Returns
+        -------
+        dict
+            A dictionary which map the primary key of each object to whether
+            the specified user have specified permission of the object.
+        """
+        objs = list(objs)
+        q = self.get_q(user_obj, perm)
+        if q is None:
+            return {obj.pk: self.has_perm(user_obj, perm, obj) for obj in objs}
+        pks = set(self.model._base_manager.filter(q, pk__in=[obj.pk for obj in objs]).values_list("pk", flat=True))
+        return {obj.pk: obj.pk in pks for obj in objs}
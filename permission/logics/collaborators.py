@@ -2,10 +2,15 @@
 Permission logic module for collaborators based permission system
 """
 
+from collections.abc import Iterable
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+
 from permission.compat import is_authenticated
 from permission.conf import settings
-from permission.logics.base import PermissionLogic
-from permission.utils.field_lookup import field_lookup
+from permission.logics.base import COST_MULTI_ROW_QUERY, PermissionLogic
+from permission.utils.field_lookup import get_field_path_accessor
 
 
 class CollaboratorsPermissionLogic(PermissionLogic):
@@ -13,6 +18,8 @@ class CollaboratorsPermissionLogic(PermissionLogic):
     Permission logic class for collaborators based permission system
     """
 
+    cost = COST_MULTI_ROW_QUERY
+
     def __init__(
         self,
         field_name=None,
@@ -68,6 +75,47 @@ class CollaboratorsPermissionLogic(PermissionLogic):
         if self.delete_permission is None:
             self.delete_permission = settings.PERMISSION_DEFAULT_CPL_DELETE_PERMISSION
 
+    def bind(self, model):
+        """
+        Bind this permission logic to the model and parse ``field_name``
+        """
+        super().bind(model)
+        self._accessor = get_field_path_accessor(model, self.field_name)
+
+    def get_grantable_permissions(self):
+        """
+        Get permissions which this permission logic can possibly grant to
+        the collaborators
+
+        Returns
+        -------
+        set or None
+            A set instance of `app_label.codename` formatted permission
+            strings, or ``None`` if :attr:`any_permission` is True.
+        """
+        if self.any_permission:
+            return None
+        perms = set()
+        if self.change_permission:
+            perms.add(self.get_full_permission_string("change"))
+        if self.delete_permission:
+            perms.add(self.get_full_permission_string("delete"))
+        return perms
+
+    def get_required_relations(self):
+        """
+        Get relations which this permission logic traverse to find the
+        collaborators
+
+        Returns
+        -------
+        set
+            A set instance of '__' separated relation lookups
+        """
+        if self._accessor.fields is None:
+            return set()
+        return {self._accessor.lookup}
+
     def has_perm(self, user_obj, perm, obj=None):
         """
         Check if user have permission (of object)
@@ -105,30 +153,145 @@ class CollaboratorsPermissionLogic(PermissionLogic):
         """
         if not is_authenticated(user_obj):
             return False
-        # construct the permission full name
-        change_permission = self.get_full_permission_string("change")
-        delete_permission = self.get_full_permission_string("delete")
+        if not self._is_grantable(perm):
+            return False
         if obj is None:
             # object permission without obj should return True
             # Ref: https://code.djangoproject.com/wiki/RowLevelPermissions
-            if self.any_permission:
-                return True
-            if self.change_permission and perm == change_permission:
-                return True
-            if self.delete_permission and perm == delete_permission:
-                return True
+            return True
+        elif user_obj.is_active:
+            return self._has_collaborator(user_obj, obj)
+        return False
+
+    async def ahas_perm(self, user_obj, perm, obj=None):
+        """
+        Async version of :meth:`has_perm`
+
+        The membership is checked with ``aexists`` of the async ORM
+        interface. Field paths which could not be resolved are looked up in
+        a thread.
+        """
+        if not is_authenticated(user_obj):
+            return False
+        if not self._is_grantable(perm):
             return False
+        if obj is None:
+            return True
         elif user_obj.is_active:
-            # get collaborator queryset
-            collaborators = field_lookup(obj, self.field_name)
-            if hasattr(collaborators, "all"):
-                collaborators = collaborators.all()
-            if user_obj in collaborators:
-                if self.any_permission:
-                    # have any kind of permissions to the obj
-                    return True
-                if self.change_permission and perm == change_permission:
-                    return True
-                if self.delete_permission and perm == delete_permission:
-                    return True
+            fields = self._accessor.fields
+            if obj.pk is None or user_obj.pk is None or fields is None or not fields[-1].is_relation:
+                return await sync_to_async(self._has_collaborator)(user_obj, obj)
+            if len(fields) == 1 and (fields[0].many_to_many or fields[0].one_to_many):
+                collaborators = getattr(obj, fields[0].name)
+                prefetched = _get_prefetched_objects(collaborators)
+                if prefetched is not None:
+                    return any(x.pk == user_obj.pk for x in prefetched)
+                return await collaborators.filter(pk=user_obj.pk).aexists()
+            # check the membership through the field path in a single query
+            queryset = obj.__class__._base_manager.filter(pk=obj.pk, **{self._accessor.lookup: user_obj.pk})
+            return await queryset.aexists()
         return False
+
+    def _has_collaborator(self, user_obj, obj):
+        # get collaborator manager
+        collaborators = self._accessor(obj)
+        return self._is_collaborator(user_obj, collaborators)
+
+    def _is_collaborator(self, user_obj, collaborators):
+        if collaborators is None:
+            return False
+        if hasattr(collaborators, "filter"):
+            # use the prefetched objects if the caller already prefetched them
+            prefetched = _get_prefetched_objects(collaborators)
+            if prefetched is not None:
+                return any(x.pk == user_obj.pk for x in prefetched)
+            # check the membership in the database instead of loading all rows
+            return collaborators.filter(pk=user_obj.pk).exists()
+        if isinstance(collaborators, Iterable):
+            # the field path fan out through multi-valued relations
+            return any(self._is_collaborator(user_obj, x) for x in collaborators)
+        pk = getattr(collaborators, "pk", None)
+        return pk is not None and pk == user_obj.pk
+
+    def get_q(self, user_obj, perm):
+        """
+        Get a ``Q`` object which select the objects the user is a collaborator
+        of
+
+        If the user_obj is not authenticated or not active, or the specified
+        permission is not given to the collaborators, the ``Q`` object select
+        nothing.
+
+        Parameters
+        ----------
+        user_obj : django user model instance
+            A django user model instance which be checked
+        perm : string
+            `app_label.codename` formatted permission string
+
+        Returns
+        -------
+        django.db.models.Q
+            A ``Q`` object like ``Q(collaborators=user_obj)``
+        """
+        if not is_authenticated(user_obj) or not user_obj.is_active:
+            return Q(pk__in=[])
+        if not self._is_grantable(perm):
+            return Q(pk__in=[])
+        return Q(**{self.field_name: user_obj})
+
+    def get_user_q(self, perm, obj=None):
+        """
+        Get a ``Q`` object of the user model which select the users who have
+        the permission (of the object)
+
+        It selects the collaborators of the object with a subquery of the
+        relation (e.g. ``Q(pk__in=obj.collaborators.values("pk"))``).
+
+        Parameters
+        ----------
+        perm : string
+            `app_label.codename` formatted permission string
+        obj : None or django model instance
+            None or django model instance for object permission
+
+        Returns
+        -------
+        django.db.models.Q
+            A ``Q`` object of the user model
+        """
+        if not self._is_grantable(perm):
+            return Q(pk__in=[])
+        if obj is None:
+            return Q(pk__isnull=False)
+        return self._get_collaborators_q(self._accessor(obj)) & self._get_active_user_q()
+
+    def _get_collaborators_q(self, collaborators):
+        if collaborators is None:
+            return Q(pk__in=[])
+        if hasattr(collaborators, "filter"):
+            return Q(pk__in=collaborators.values("pk"))
+        if isinstance(collaborators, Iterable):
+            # the field path fan out through multi-valued relations
+            q = Q(pk__in=[])
+            for x in collaborators:
+                q |= self._get_collaborators_q(x)
+            return q
+        return Q(pk=getattr(collaborators, "pk", None))
+
+
+def _get_prefetched_objects(manager):
+    prefetched = getattr(manager.instance, "_prefetched_objects_cache", None)
+    if not prefetched:
+        return None
+    return prefetched.get(_get_prefetch_cache_name(manager))
+
+
+def _get_prefetch_cache_name(manager):
+    # forward and reverse many-to-many managers
+    name = getattr(manager, "prefetch_cache_name", None)
+    if name is None and getattr(manager, "field", None) is not None:
+        # reverse foreign key managers store the objects under the accessor
+        # name of the relation
+        name = manager.field.remote_field.get_accessor_name()
+    return name
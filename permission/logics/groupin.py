@@ -2,9 +2,13 @@
 Permission logic module for group based permission system
 """
 
+from django.db.models import Q
+
 from permission.compat import is_authenticated
 from permission.conf import settings
-from permission.logics.base import PermissionLogic
+from permission.logics.base import COST_SINGLE_ROW_QUERY, PermissionLogic
+from permission.utils.cache import aget_group_names, get_group_names
+from permission.utils.field_lookup import has_user_field
 
 
 class GroupInPermissionLogic(PermissionLogic):
@@ -12,6 +16,8 @@ class GroupInPermissionLogic(PermissionLogic):
     Permission logic class for group based permission system
     """
 
+    cost = COST_SINGLE_ROW_QUERY
+
     def __init__(
         self,
         group_names,
@@ -70,6 +76,39 @@ class GroupInPermissionLogic(PermissionLogic):
         if self.delete_permission is None:
             self.delete_permission = settings.PERMISSION_DEFAULT_GIPL_DELETE_PERMISSION
 
+    def bind(self, model):
+        """
+        Bind this permission logic to the model and freeze ``group_names``
+        """
+        super().bind(model)
+        self._group_names = frozenset(self.group_names)
+
+    def _is_in_groups(self, user_obj):
+        # the group names of the user are shared by all permission logics
+        return not self._group_names.isdisjoint(get_group_names(user_obj))
+
+    def get_grantable_permissions(self):
+        """
+        Get permissions which this permission logic can possibly grant to
+        the users in the groups
+
+        Returns
+        -------
+        set or None
+            A set instance of `app_label.codename` formatted permission
+            strings, or ``None`` if :attr:`any_permission` is True.
+        """
+        if self.any_permission:
+            return None
+        perms = set()
+        if self.add_permission:
+            perms.add(self.get_full_permission_string("add"))
+        if self.change_permission:
+            perms.add(self.get_full_permission_string("change"))
+        if self.delete_permission:
+            perms.add(self.get_full_permission_string("delete"))
+        return perms
+
     def has_perm(self, user_obj, perm, obj=None):
         """
         Check if user have permission (of object)
@@ -106,29 +145,79 @@ class GroupInPermissionLogic(PermissionLogic):
         """
         if not is_authenticated(user_obj):
             return False
-        # construct the permission full name
-        add_permission = self.get_full_permission_string("add")
-        change_permission = self.get_full_permission_string("change")
-        delete_permission = self.get_full_permission_string("delete")
-        if obj is None:
-            if user_obj.groups.filter(name__in=self.group_names):
-                if self.add_permission and perm == add_permission:
-                    return True
-                if self.change_permission and perm == change_permission:
-                    return True
-                if self.delete_permission and perm == delete_permission:
-                    return True
-                return self.any_permission
+        if not self._is_grantable(perm):
             return False
-        elif user_obj.is_active:
-            if user_obj.groups.filter(name__in=self.group_names):
-                if self.any_permission:
-                    # have any kind of permissions to the obj
-                    return True
-                if self.add_permission and perm == add_permission:
-                    return True
-                if self.change_permission and perm == change_permission:
-                    return True
-                if self.delete_permission and perm == delete_permission:
-                    return True
+        if obj is None or user_obj.is_active:
+            # check if the user is in the groups
+            return self._is_in_groups(user_obj)
         return False
+
+    async def ahas_perm(self, user_obj, perm, obj=None):
+        """
+        Async version of :meth:`has_perm`
+
+        The group names of the user are loaded with the async ORM interface.
+        """
+        if not is_authenticated(user_obj):
+            return False
+        if not self._is_grantable(perm):
+            return False
+        if obj is None or user_obj.is_active:
+            group_names = await aget_group_names(user_obj)
+            return not self._group_names.isdisjoint(group_names)
+        return False
+
+    def get_q(self, user_obj, perm):
+        """
+        Get a ``Q`` object which select all objects if the user is in group specified in ``group_names``
+
+        If the user_obj is not authenticated or not active, or the specified
+        permission is not given, the ``Q`` object select nothing.
+
+        Parameters
+        ----------
+        user_obj : django user model instance
+            A django user model instance which be checked
+        perm : string
+            `app_label.codename` formatted permission string
+
+        Returns
+        -------
+        django.db.models.Q
+            A ``Q`` object which select all or nothing
+        """
+        if not is_authenticated(user_obj) or not user_obj.is_active:
+            return Q(pk__in=[])
+        if self._is_grantable(perm) and self._is_in_groups(user_obj):
+            return Q(pk__isnull=False)
+        return Q(pk__in=[])
+
+    def get_user_q(self, perm, obj=None):
+        """
+        Get a ``Q`` object of the user model which select the users who have
+        the permission (of the object)
+
+        It selects the users in the groups specified in ``group_names``.
+
+        Parameters
+        ----------
+        perm : string
+            `app_label.codename` formatted permission string
+        obj : None or django model instance
+            None or django model instance for object permission
+
+        Returns
+        -------
+        django.db.models.Q or None
+            A ``Q`` object of the user model, or ``None`` if the user model
+            does not have the ``groups`` field
+        """
+        if not self._is_grantable(perm):
+            return Q(pk__in=[])
+        if not has_user_field("groups"):
+            # the groups of custom user models are evaluated by has_perm
+            return None
+        q = Q(groups__name__in=self.group_names)
+        if obj is not None:
+            q &= self._get_active_user_q()
+        return q
@@ -2,9 +2,11 @@
 Permission logic module to  manage users' self-modifications
 """
 
+from django.db.models import Q
+
 from permission.compat import is_authenticated
 from permission.conf import settings
-from permission.logics.base import PermissionLogic
+from permission.logics.base import COST_ATTRIBUTE, PermissionLogic
 
 
 class OneselfPermissionLogic(PermissionLogic):
@@ -15,6 +17,8 @@ class OneselfPermissionLogic(PermissionLogic):
     https://github.com/lambdalisue/django-permission/pull/27
     """
 
+    cost = COST_ATTRIBUTE
+
     def __init__(self, any_permission=None, change_permission=None, delete_permission=None):
         """
         Constructor
@@ -50,6 +54,26 @@ class OneselfPermissionLogic(PermissionLogic):
         if self.delete_permission is None:
             self.delete_permission = settings.PERMISSION_DEFAULT_OSPL_DELETE_PERMISSION
 
+    def get_grantable_permissions(self):
+        """
+        Get permissions which this permission logic can possibly grant to
+        the user himself
+
+        Returns
+        -------
+        set or None
+            A set instance of `app_label.codename` formatted permission
+            strings, or ``None`` if :attr:`any_permission` is True.
+        """
+        if self.any_permission:
+            return None
+        perms = set()
+        if self.change_permission:
+            perms.add(self.get_full_permission_string("change"))
+        if self.delete_permission:
+            perms.add(self.get_full_permission_string("delete"))
+        return perms
+
     def has_perm(self, user_obj, perm, obj=None):
         """
         Check if user have permission of himself
@@ -84,28 +108,73 @@ class OneselfPermissionLogic(PermissionLogic):
         """
         if not is_authenticated(user_obj):
             return False
-        # construct the permission full name
-        change_permission = self.get_full_permission_string("change")
-        delete_permission = self.get_full_permission_string("delete")
-        # check if the user is authenticated
+        if not self._is_grantable(perm):
+            return False
         if obj is None:
             # object permission without obj should return True
             # Ref: https://code.djangoproject.com/wiki/RowLevelPermissions
-            if self.any_permission:
-                return True
-            if self.change_permission and perm == change_permission:
-                return True
-            if self.delete_permission and perm == delete_permission:
-                return True
-            return False
+            return True
         elif user_obj.is_active:
             # check if the user trying to interact with himself
-            if obj == user_obj:
-                if self.any_permission:
-                    # have any kind of permissions to himself
-                    return True
-                if self.change_permission and perm == change_permission:
-                    return True
-                if self.delete_permission and perm == delete_permission:
-                    return True
+            return obj == user_obj
         return False
+
+    async def ahas_perm(self, user_obj, perm, obj=None):
+        """
+        Async version of :meth:`has_perm`
+
+        It does not access the database thus :meth:`has_perm` is called
+        directly.
+        """
+        return self.has_perm(user_obj, perm, obj)
+
+    def get_q(self, user_obj, perm):
+        """
+        Get a ``Q`` object which select the user himself
+
+        If the user_obj is not authenticated or not active, or the specified
+        permission is not given to the user himself, the ``Q`` object select
+        nothing.
+
+        Parameters
+        ----------
+        user_obj : django user model instance
+            A django user model instance which be checked
+        perm : string
+            `app_label.codename` formatted permission string
+
+        Returns
+        -------
+        django.db.models.Q
+            A ``Q`` object like ``Q(pk=user_obj.pk)``
+        """
+        if not is_authenticated(user_obj) or not user_obj.is_active:
+            return Q(pk__in=[])
+        if not self._is_grantable(perm):
+            return Q(pk__in=[])
+        return Q(pk=user_obj.pk)
+
+    def get_user_q(self, perm, obj=None):
+        """
+        Get a ``Q`` object of the user model which select the users who have
+        the permission (of the object)
+
+        It selects the user who is the object itself.
+
+        Parameters
+        ----------
+        perm : string
+            `app_label.codename` formatted permission string
+        obj : None or django model instance
+            None or django model instance for object permission
+
+        Returns
+        -------
+        django.db.models.Q
+            A ``Q`` object of the user model
+        """
+        if not self._is_grantable(perm):
+            return Q(pk__in=[])
+        if obj is None:
+            return Q(pk__isnull=False)
+        return Q(pk=obj.pk) & self._get_active_user_q()
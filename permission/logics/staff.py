@@ -2,9 +2,12 @@
 Permission logic module for author based permission system
 """
 
+from django.db.models import Q
+
 from permission.compat import is_authenticated
 from permission.conf import settings
-from permission.logics.base import PermissionLogic
+from permission.logics.base import COST_ATTRIBUTE, PermissionLogic
+from permission.utils.field_lookup import has_user_field
 
 
 class StaffPermissionLogic(PermissionLogic):
@@ -12,6 +15,8 @@ class StaffPermissionLogic(PermissionLogic):
     Permission logic class for is_staff authority based permission system
     """
 
+    cost = COST_ATTRIBUTE
+
     def __init__(
         self,
         any_permission=None,
@@ -65,6 +70,28 @@ class StaffPermissionLogic(PermissionLogic):
         if self.delete_permission is None:
             self.delete_permission = settings.PERMISSION_DEFAULT_SPL_DELETE_PERMISSION
 
+    def get_grantable_permissions(self):
+        """
+        Get permissions which this permission logic can possibly grant to
+        the staff users
+
+        Returns
+        -------
+        set or None
+            A set instance of `app_label.codename` formatted permission
+            strings, or ``None`` if :attr:`any_permission` is True.
+        """
+        if self.any_permission:
+            return None
+        perms = set()
+        if self.add_permission:
+            perms.add(self.get_full_permission_string("add"))
+        if self.change_permission:
+            perms.add(self.get_full_permission_string("change"))
+        if self.delete_permission:
+            perms.add(self.get_full_permission_string("delete"))
+        return perms
+
     def has_perm(self, user_obj, perm, obj=None):
         """
         Check if user have permission (of object)
@@ -99,29 +126,73 @@ class StaffPermissionLogic(PermissionLogic):
         """
         if not is_authenticated(user_obj):
             return False
-        # construct the permission full name
-        add_permission = self.get_full_permission_string("add")
-        change_permission = self.get_full_permission_string("change")
-        delete_permission = self.get_full_permission_string("delete")
-        if obj is None:
-            if user_obj.is_staff:
-                if self.add_permission and perm == add_permission:
-                    return True
-                if self.change_permission and perm == change_permission:
-                    return True
-                if self.delete_permission and perm == delete_permission:
-                    return True
-                return self.any_permission
+        if not self._is_grantable(perm):
             return False
-        elif user_obj.is_active:
-            if user_obj.is_staff:
-                if self.any_permission:
-                    # have any kind of permissions to the obj
-                    return True
-                if self.add_permission and perm == add_permission:
-                    return True
-                if self.change_permission and perm == change_permission:
-                    return True
-                if self.delete_permission and perm == delete_permission:
-                    return True
+        if obj is None or user_obj.is_active:
+            # check if the user is a staff
+            return bool(user_obj.is_staff)
         return False
+
+    async def ahas_perm(self, user_obj, perm, obj=None):
+        """
+        Async version of :meth:`has_perm`
+
+        It does not access the database thus :meth:`has_perm` is called
+        directly.
+        """
+        return self.has_perm(user_obj, perm, obj)
+
+    def get_q(self, user_obj, perm):
+        """
+        Get a ``Q`` object which select all objects if the user is staff
+
+        If the user_obj is not authenticated or not active, or the specified
+        permission is not given, the ``Q`` object select nothing.
+
+        Parameters
+        ----------
+        user_obj : django user model instance
+            A django user model instance which be checked
+        perm : string
+            `app_label.codename` formatted permission string
+
+        Returns
+        -------
+        django.db.models.Q
+            A ``Q`` object which select all or nothing
+        """
+        if not is_authenticated(user_obj) or not user_obj.is_active:
+            return Q(pk__in=[])
+        if self._is_grantable(perm) and user_obj.is_staff:
+            return Q(pk__isnull=False)
+        return Q(pk__in=[])
+
+    def get_user_q(self, perm, obj=None):
+        """
+        Get a ``Q`` object of the user model which select the users who have
+        the permission (of the object)
+
+        It selects the staff users.
+
+        Parameters
+        ----------
+        perm : string
+            `app_label.codename` formatted permission string
+        obj : None or django model instance
+            None or django model instance for object permission
+
+        Returns
+        -------
+        django.db.models.Q or None
+            A ``Q`` object of the user model, or ``None`` if the user model
+            does not have the ``is_staff`` field
+        """
+        if not self._is_grantable(perm):
+            return Q(pk__in=[])
+        if not has_user_field("is_staff"):
+            # is_staff of custom user models is evaluated by has_perm
+            return None
+        q = Q(is_staff=True)
+        if obj is not None:
+            q &= self._get_active_user_q()
+        return q
@@ -0,0 +1,7 @@
+"""
+Materialized permission application
+
+Add ``permission.materialized`` to ``INSTALLED_APPS`` to store the permissions
+granted by permission logics in a table (see
+:class:`permission.materialized.handlers.MaterializedPermissionHandler`).
+"""
@@ -0,0 +1,34 @@
+from django.apps import AppConfig
+
+
+class MaterializedPermissionConfig(AppConfig):
+    name = "permission.materialized"
+    label = "permission_materialized"
+    verbose_name = "Materialized permission"
+    default_auto_field = "django.db.models.BigAutoField"
+
+    def ready(self):
+        from django.contrib.auth.models import Group
+        from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+
+        from permission.materialized.receivers import (
+            delete_grants_on_delete,
+            stash_group_users_on_delete,
+            stash_related_objects_on_delete,
+            update_grants_on_m2m_changed,
+            update_grants_on_save,
+        )
+
+        # keep the grants current when the data read by permission logics are changed
+        post_save.connect(update_grants_on_save, dispatch_uid="permission_materialized_update_grants")
+        post_delete.connect(delete_grants_on_delete, dispatch_uid="permission_materialized_delete_grants")
+        m2m_changed.connect(update_grants_on_m2m_changed, dispatch_uid="permission_materialized_update_grants")
+        pre_delete.connect(
+            stash_group_users_on_delete,
+            sender=Group,
+            dispatch_uid="permission_materialized_stash_group_users",
+        )
+        pre_delete.connect(
+            stash_related_objects_on_delete,
+            dispatch_uid="permission_materialized_stash_related_objects",
+        )
@@ -0,0 +1,404 @@
+"""
+Materialized permission handler module
+"""
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import CharField, Exists, OuterRef, Q, Value
+from django.db.models.functions import Cast
+
+from permission.conf import settings
+from permission.handlers import LogicalPermissionHandler
+from permission.materialized.models import PermissionGrant
+from permission.utils.cache import clear_permission_cache
+from permission.utils.field_lookup import get_field_path_accessor
+
+UNION_BATCH_SIZE = 100
+"""Number of objects whose users are selected in a single ``UNION ALL`` query"""
+
+
+class MaterializedPermissionHandler(LogicalPermissionHandler):
+    """
+    Permission handler class which store the object permissions granted by
+    permission logics in :class:`permission.materialized.models.PermissionGrant`
+
+    The permission of an object is checked with a single indexed lookup and
+    querysets are filtered with a single ``EXISTS`` subquery instead of
+    evaluating permission logics. The grants are rebuilt by the signal
+    receivers in :mod:`permission.materialized.receivers` when the object,
+    the user or the groups are changed.
+
+    Permissions without object are evaluated by permission logics as
+    :class:`permission.handlers.LogicalPermissionHandler` does.
+    """
+
+    def get_content_type(self):
+        """
+        Get the content type of the model of this handler
+
+        Returns
+        -------
+        django.contrib.contenttypes.models.ContentType
+            The content type (cached by django)
+        """
+        return ContentType.objects.get_for_model(self.model, for_concrete_model=False)
+
+    def get_grants(self, perm):
+        """
+        Get a queryset of the grants of the permission
+
+        Parameters
+        ----------
+        perm : string
+            `app_label.codename` formatted permission string
+
+        Returns
+        -------
+        django queryset
+            A queryset of :class:`permission.materialized.models.PermissionGrant`
+        """
+        return PermissionGrant.objects.filter(content_type=self.get_content_type(), permission=perm)
+
+    def _has_perm(self, user_obj, perm, obj=None):
+        if not _is_materialized_object(user_obj, obj):
+            return super()._has_perm(user_obj, perm, obj)
+        if perm not in self.get_supported_permissions():
+            return False
+        return self.get_grants(perm).filter(user_id=user_obj.pk, object_id=str(obj.pk)).exists()
+
+    async def _ahas_perm(self, user_obj, perm, obj=None):
+        if not _is_materialized_object(user_obj, obj):
+            return await super()._ahas_perm(user_obj, perm, obj)
+        if perm not in await self.aget_supported_permissions():
+            return False
+        # the content type is cached by django after the first call
+        content_type = await sync_to_async(self.get_content_type)()
+        grants = PermissionGrant.objects.filter(
+            user_id=user_obj.pk,
+            content_type=content_type,
+            object_id=str(obj.pk),
+            permission=perm,
+        )
+        return await grants.aexists()
+
+    def has_perm_many(self, user_obj, perm, objs):
+        """
+        Check if user have permission of each object in a batch with a single
+        SQL query on the grants
+
+        Parameters
+        ----------
+        user_obj : django user model instance
+            A django user model instance which be checked
+        perm : string
+            `app_label.codename` formatted permission string
+        objs : iterable
+            An iterable of saved django model instances for object permission
+
+        Returns
+        -------
+        dict
+            A dictionary which map the primary key of each object to whether
+            the specified user have specified permission of the object.
+        """
+        objs = list(objs)
+        if not _is_materialized(user_obj):
+            return super().has_perm_many(user_obj, perm, objs)
+        if perm not in self.get_supported_permissions():
+            return {obj.pk: False for obj in objs}
+        grants = self.get_grants(perm).filter(user_id=user_obj.pk, object_id__in=[str(obj.pk) for obj in objs])
+        granted = set(grants.values_list("object_id", flat=True))
+        return {obj.pk: str(obj.pk) in granted for obj in objs}
+
+    def filter_queryset(self, user_obj, perm, queryset):
+        """
+        Filter the queryset to the objects which the user have permission of
+        with a single ``EXISTS`` subquery on the grants
+
+        Parameters
+        ----------
+        user_obj : django user model instance
+            A django user model instance which be checked
+        perm : string
+            `app_label.codename` formatted permission string
+        queryset : django queryset
+            A queryset of the model of this handler
+
+        Returns
+        -------
+        django queryset
+            A queryset which contains the objects the specified user have
+            specified permission of.
+        """
+        if not _is_materialized(user_obj):
+            return super().filter_queryset(user_obj, perm, queryset)
+        if perm not in self.get_supported_permissions():
+            return queryset.none()
+        grants = self.get_grants(perm).filter(
+            user_id=user_obj.pk,
+            object_id=Cast(OuterRef("pk"), output_field=CharField()),
+        )
+        return queryset.filter(Exists(grants))
+
+    def users_with_perm(self, perm, obj=None):
+        """
+        Get the users who have the permission (of the object)
+
+        The users who have the permission of the object are selected from
+        the grants. Permissions without object are evaluated by permission
+        logics.
+
+        Parameters
+        ----------
+        perm : string
+            `app_label.codename` formatted permission string
+        obj : None or django model instance
+            None or django model instance for object permission
+
+        Returns
+        -------
+        django queryset
+            A queryset of the user model which contains the users who have
+            specified permission (of specified object).
+        """
+        if obj is None or obj.pk is None:
+            return super().users_with_perm(perm, obj)
+        user_model = get_user_model()
+        if perm not in self.get_supported_permissions():
+            return user_model._default_manager.none()
+        pks = self.get_grants(perm).filter(object_id=str(obj.pk)).values("user_id")
+        return user_model._default_manager.filter(pk__in=pks)
+
+    def get_materialized_permissions(self):
+        """
+        Get permissions which are stored in the grants
+
+        Returns
+        -------
+        list
+            A sorted list of `app_label.codename` formatted permission strings
+            which permission logics of the model can possibly grant
+        """
+        return sorted(x for x in self.get_supported_permissions() if self.get_permission_logics(x))
+
+    def get_related_lookups(self):
+        """
+        Get the lookups of the related models which permission logics
+        traverse to check the permissions (e.g. ``project`` of
+        ``project__author``)
+
+        The grants of the objects which refer to a related object are rebuilt
+        when the related object is changed. The related model may be the model
+        of this handler or the model of another materialized permission
+        handler. The user model is not included because the grants of users
+        are rebuilt when the users are changed.
+
+        Returns
+        -------
+        dict
+            A dictionary which map each related model to a set of lookups
+            from the model of this handler
+        """
+        logics = tuple(getattr(self.model, "_permission_logics", ()))
+        cache = getattr(self, "_related_lookups_cache", None)
+        if cache is not None and cache[0] == logics:
+            return cache[1]
+        user_model = get_user_model()
+        related_lookups = {}
+        for permission_logic in logics:
+            for lookup in permission_logic.get_required_relations():
+                fields = get_field_path_accessor(self.model, lookup).fields or ()
+                for i, field in enumerate(fields):
+                    related_model = field.related_model if field.is_relation else None
+                    if related_model is None or related_model is user_model:
+                        continue
+                    related_lookups.setdefault(related_model, set()).add("__".join(x.name for x in fields[: i + 1]))
+        self._related_lookups_cache = (logics, related_lookups)
+        return related_lookups
+
+    def get_related_objects(self, model, instances):
+        """
+        Get the objects which refer to the related objects in the lookups of
+        permission logics (see :meth:`get_related_lookups`)
+
+        Parameters
+        ----------
+        model : django model class
+            A django model class of the related objects
+        instances : iterable
+            An iterable of the related objects
+
+        Returns
+        -------
+        django queryset
+            A queryset of the model of this handler
+        """
+        lookups = self.get_related_lookups().get(model, ())
+        pks = [x.pk for x in instances if x.pk is not None]
+        if not lookups or not pks:
+            return self.model._base_manager.none()
+        q = Q(pk__in=[])
+        for lookup in lookups:
+            q |= Q(**{f"{lookup}__in": pks})
+        return self.model._base_manager.filter(pk__in=self.model._base_manager.filter(q).values("pk"))
+
+    def rebuild_grants(self, objs):
+        """
+        Rebuild the grants of the objects from permission logics
+
+        The users of each permission are found for all objects at once with
+        a single ``UNION ALL`` query of the ``get_user_q`` of permission logics
+        (split into batches of ``UNION_BATCH_SIZE`` objects). Permission
+        logics without ``get_user_q`` are evaluated with ``has_perm_many`` for
+        each user. Permissions are evaluated once for all permissions which
+        share the decisions (see :meth:`get_permission_groups`).
+
+        Parameters
+        ----------
+        objs : iterable
+            An iterable of saved django model instances of the model
+        """
+        objs = [obj for obj in objs if obj.pk is not None]
+        if not objs:
+            return
+        content_type = self.get_content_type()
+        grants = []
+        for perms in self.get_permission_groups():
+            grants.extend(
+                PermissionGrant(user_id=user_pk, content_type=content_type, object_id=object_id, permission=perm)
+                for user_pk, object_id in self._get_granted_pairs(perms[0], objs)
+                for perm in perms
+            )
+        with transaction.atomic():
+            self.delete_grants(objs)
+            # the grants might be inserted by a concurrent rebuild of the objects
+            PermissionGrant.objects.bulk_create(
+                grants, batch_size=settings.PERMISSION_FILTER_CHUNK_SIZE, ignore_conflicts=True
+            )
+
+    def rebuild_user_grants(self, user_obj):
+        """
+        Rebuild the grants of the user from permission logics
+
+        The objects of each permission are found with
+        :meth:`permission.handlers.LogicalPermissionHandler.filter_queryset`.
+
+        Parameters
+        ----------
+        user_obj : django user model instance
+            A saved django user model instance
+        """
+        if not _is_materialized(user_obj):
+            return
+        # the groups of the user might be changed
+        clear_permission_cache(user_obj)
+        content_type = self.get_content_type()
+        grants = []
+        for perms in self.get_permission_groups():
+            queryset = LogicalPermissionHandler.filter_queryset(
+                self, user_obj, perms[0], self.model._base_manager.all()
+            )
+            grants.extend(
+                PermissionGrant(user_id=user_obj.pk, content_type=content_type, object_id=str(pk), permission=perm)
+                for pk in queryset.values_list("pk", flat=True)
+                for perm in perms
+            )
+        with transaction.atomic():
+            PermissionGrant.objects.filter(user_id=user_obj.pk, content_type=content_type).delete()
+            PermissionGrant.objects.bulk_create(
+                grants, batch_size=settings.PERMISSION_FILTER_CHUNK_SIZE, ignore_conflicts=True
+            )
+
+    def get_permission_groups(self):
+        """
+        Get the materialized permissions grouped by the permission logics
+        which decide them
+
+        Permissions share the decisions only when they are granted by the
+        same permission logics and every permission logic declares the
+        permissions it can grant (``get_grantable_permissions``). Otherwise
+        the permission is evaluated on its own.
+
+        Returns
+        -------
+        list
+            A list of lists of `app_label.codename` formatted permission
+            strings
+        """
+        groups = {}
+        for perm in self.get_materialized_permissions():
+            logics = self.get_permission_logics(perm)
+            if any(x.get_grantable_permissions() is None for x in logics):
+                groups[perm] = [perm]
+            else:
+                groups.setdefault(logics, []).append(perm)
+        return list(groups.values())
+
+    def _get_granted_pairs(self, perm, objs):
+        user_model = get_user_model()
+        pairs = set()
+        querysets = []
+        fallback_objs = {}
+        for obj in objs:
+            object_id = str(obj.pk)
+            q = None
+            for permission_logic in self.get_permission_logics(perm):
+                logic_q = permission_logic.get_user_q(perm, obj)
+                if logic_q is None:
+                    fallback_objs.setdefault(permission_logic, []).append(obj)
+                else:
+                    q = logic_q if q is None else q | logic_q
+            if q is not None:
+                users = user_model._base_manager.filter(q).order_by()
+                users = users.annotate(_object_id=Value(object_id, output_field=CharField()))
+                querysets.append(users.values_list("pk", "_object_id"))
+        for i in range(0, len(querysets), UNION_BATCH_SIZE):
+            batch = querysets[i : i + UNION_BATCH_SIZE]
+            pairs.update(batch[0].union(*batch[1:], all=True) if len(batch) > 1 else batch[0])
+        if fallback_objs:
+            users = user_model._default_manager.all()
+            for user_obj in users.iterator(chunk_size=settings.PERMISSION_FILTER_CHUNK_SIZE):
+                for permission_logic, logic_objs in fallback_objs.items():
+                    results = permission_logic.has_perm_many(user_obj, perm, logic_objs)
+                    pairs.update((user_obj.pk, str(pk)) for pk, result in results.items() if result)
+        return pairs
+
+    def delete_grants(self, objs):
+        """
+        Delete the grants of the objects
+
+        Parameters
+        ----------
+        objs : iterable
+            An iterable of django model instances of the model
+        """
+        object_ids = [str(obj.pk) for obj in objs if obj.pk is not None]
+        PermissionGrant.objects.filter(content_type=self.get_content_type(), object_id__in=object_ids).delete()
+
+    def delete_stale_grants(self):
+        """
+        Delete the grants of the objects which do not exist anymore and of
+        the permissions which are not stored in the grants anymore
+
+        Returns
+        -------
+        integer
+            The number of deleted grants
+        """
+        objects = self.model._base_manager.annotate(
+            _object_id=Cast("pk", output_field=CharField()),
+        ).filter(_object_id=OuterRef("object_id"))
+        grants = PermissionGrant.objects.filter(content_type=self.get_content_type())
+        stale = grants.filter(~Exists(objects)) | grants.exclude(permission__in=self.get_materialized_permissions())
+        return stale.delete()[0]
+
+
+def _is_materialized(user_obj):
+    # anonymous users do not have the grants
+    return getattr(user_obj, "pk", None) is not None and getattr(user_obj, "_meta", None) is not None
+
+
+def _is_materialized_object(user_obj, obj):
+    return obj is not None and obj.pk is not None and _is_materialized(user_obj)
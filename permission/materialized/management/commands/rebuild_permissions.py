@@ -0,0 +1,158 @@
+"""
+Rebuild the grants of materialized permission handlers
+"""
+
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from permission.conf import settings
+from permission.materialized.handlers import MaterializedPermissionHandler
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the grants of the models with permission logics which are handled by "
+        "MaterializedPermissionHandler. The objects are split into chunks and the chunks "
+        "are rebuilt in a process pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="*",
+            metavar="app_label.ModelName",
+            help="Rebuild only the grants of the specified models.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.PERMISSION_FILTER_CHUNK_SIZE,
+            help="Number of objects rebuilt in a single task (default: PERMISSION_FILTER_CHUNK_SIZE).",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Number of worker processes. 1 rebuilds the chunks in the current process (default: 1).",
+        )
+
+    def handle(self, *args, models, chunk_size, processes, **options):
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be a positive integer.")
+        if processes < 1:
+            raise CommandError("--processes must be a positive integer.")
+        handlers = self.get_handlers(models)
+        started_at = time.monotonic()
+        total = 0
+        for handler in handlers:
+            total += self.rebuild(handler, chunk_size, processes)
+        elapsed = time.monotonic() - started_at
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt the grants of {total} objects of {len(handlers)} models in {elapsed:.1f}s "
+                f"({_throughput(total, elapsed)} objects/s)."
+            )
+        )
+
+    def get_handlers(self, labels):
+        if labels:
+            try:
+                models = [apps.get_model(label) for label in labels]
+            except (LookupError, ValueError) as e:
+                raise CommandError(str(e)) from e
+        else:
+            models = [x for x in apps.get_models() if getattr(x, "_permission_logics", None)]
+        handlers = []
+        for model in models:
+            handler = getattr(model, "_permission_handler", None)
+            if isinstance(handler, MaterializedPermissionHandler) and handler.model is model:
+                handlers.append(handler)
+            elif labels:
+                raise CommandError(f"'{model._meta.label}' is not handled by MaterializedPermissionHandler.")
+            else:
+                self.stdout.write(f"Skip {model._meta.label} (not handled by MaterializedPermissionHandler)")
+        return handlers
+
+    def rebuild(self, handler, chunk_size, processes):
+        model = handler.model
+        label = model._meta.label
+        count = model._base_manager.count()
+        pks = model._base_manager.order_by("pk").values_list("pk", flat=True).iterator(chunk_size=chunk_size)
+        tasks = ((label, chunk) for chunk in _chunks(pks, chunk_size))
+
+        started_at = time.monotonic()
+        done = 0
+        if processes == 1:
+            results = map(_rebuild_chunk, tasks)
+            done = self.report(label, results, count, started_at)
+        else:
+            # spawn the worker processes thus they do not share the database
+            # connections of this process
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(processes, mp_context=context, initializer=_initialize_worker) as executor:
+                # executor.map submit all tasks at once, keep only a few chunks in flight
+                results = _map_bounded(executor, _rebuild_chunk, tasks, processes * 2)
+                done = self.report(label, results, count, started_at)
+
+        deleted = handler.delete_stale_grants()
+        if deleted:
+            self.stdout.write(f"{label}: deleted {deleted} stale grants")
+        return done
+
+    def report(self, label, results, count, started_at):
+        done = 0
+        for result in results:
+            done += result
+            elapsed = time.monotonic() - started_at
+            self.stdout.write(f"{label}: {done}/{count} objects ({_throughput(done, elapsed)} objects/s)")
+        return done
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for x in iterable:
+        chunk.append(x)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _map_bounded(executor, fn, iterable, max_pending):
+    pending = set()
+    for x in iterable:
+        pending.add(executor.submit(fn, x))
+        if len(pending) >= max_pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
+
+
+def _throughput(count, elapsed):
+    if elapsed <= 0:
+        return "-"
+    return f"{count / elapsed:.1f}"
+
+
+def _initialize_worker():
+    import django
+
+    if not apps.ready:
+        django.setup()
+
+
+def _rebuild_chunk(task):
+    label, pks = task
+    model = apps.get_model(label)
+    objs = list(model._base_manager.filter(pk__in=pks))
+    model._permission_handler.rebuild_grants(objs)
+    return len(objs)
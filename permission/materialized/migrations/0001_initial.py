@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PermissionGrant",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("object_id", models.CharField(max_length=255, verbose_name="object id")),
+                ("permission", models.CharField(max_length=255, verbose_name="permission")),
+                (
+                    "content_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="+", to="contenttypes.contenttype"
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="+", to=settings.AUTH_USER_MODEL
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "permission grant",
+                "verbose_name_plural": "permission grants",
+                "indexes": [models.Index(fields=["content_type", "object_id"], name="permission_grant_object")],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "content_type", "permission", "object_id"), name="permission_grant_unique"
+                    )
+                ],
+            },
+        ),
+    ]
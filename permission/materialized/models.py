@@ -0,0 +1,47 @@
+"""
+Models of materialized permission application
+"""
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+
+
+class PermissionGrant(models.Model):
+    """
+    A permission of an object granted to a user by permission logics
+
+    The rows are maintained by
+    :class:`permission.materialized.handlers.MaterializedPermissionHandler`.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="+",
+        on_delete=models.CASCADE,
+    )
+    content_type = models.ForeignKey(
+        ContentType,
+        related_name="+",
+        on_delete=models.CASCADE,
+    )
+    object_id = models.CharField("object id", max_length=255)
+    permission = models.CharField("permission", max_length=255)
+
+    class Meta:
+        verbose_name = "permission grant"
+        verbose_name_plural = "permission grants"
+        constraints = [
+            # the lookups of has_perm and filter_queryset
+            models.UniqueConstraint(
+                fields=["user", "content_type", "permission", "object_id"],
+                name="permission_grant_unique",
+            ),
+        ]
+        indexes = [
+            # the lookups of users_with_perm and the maintenance of the object
+            models.Index(fields=["content_type", "object_id"], name="permission_grant_object"),
+        ]
+
+    def __str__(self):
+        return f"{self.permission} of {self.content_type_id}:{self.object_id} for {self.user_id}"
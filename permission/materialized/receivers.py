@@ -0,0 +1,217 @@
+"""
+Signal receivers which keep the grants of materialized permission handlers
+current
+"""
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+
+from permission.utils.field_lookup import has_user_field
+from permission.utils.handlers import registry
+
+STASHED_USERS_NAME = "_permission_materialized_users"
+"""Name of the attribute of the group instance to store the users before they are detached"""
+
+STASHED_RELATED_NAME = "_permission_materialized_related"
+"""Name of the attribute of the instance to store the related objects before they are detached or deleted"""
+
+
+def get_materialized_handlers():
+    """
+    Get registered materialized permission handlers
+
+    Returns
+    -------
+    list
+        A list of
+        :class:`permission.materialized.handlers.MaterializedPermissionHandler`
+        instances
+    """
+    from permission.materialized.handlers import MaterializedPermissionHandler
+
+    return [x for x in registry.get_handlers() if isinstance(x, MaterializedPermissionHandler)]
+
+
+def update_grants(model, instances):
+    """
+    Rebuild the grants which depend on the instances
+
+    Parameters
+    ----------
+    model : django model class
+        A django model class of the instances
+    instances : iterable
+        An iterable of saved django model instances. The grants of the
+        objects are rebuilt for a model of a materialized permission handler,
+        the grants of the objects which refer to the instances for a related
+        model in the lookups of permission logics (the model may be
+        materialized as well), the grants of the users for django user model,
+        and the grants of the members for django group model.
+    """
+    _update_grants(model, instances)
+
+
+def update_grants_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Rebuild the grants which depend on the saved instance
+
+    A signal receiver of ``post_save``.
+    """
+    if raw:
+        # e.g. loaddata
+        return
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        # django update the last login of the user on every login
+        return
+    update_grants(sender, [instance])
+
+
+def delete_grants_on_delete(sender, instance, **kwargs):
+    """
+    Delete the grants of the deleted object, or rebuild the grants which
+    depended on the deleted object
+
+    A signal receiver of ``post_delete``. The grants of deleted users are
+    deleted by the database cascade.
+    """
+    handler = _get_materialized_handler(sender)
+    if handler is not None:
+        handler.delete_grants([instance])
+    elif isinstance(instance, Group):
+        update_grants(get_user_model(), getattr(instance, STASHED_USERS_NAME, ()))
+    for handler, pks in getattr(instance, STASHED_RELATED_NAME, {}).items():
+        # the objects which were deleted by the cascade are not found
+        handler.rebuild_grants(handler.model._base_manager.filter(pk__in=pks))
+
+
+def stash_group_users_on_delete(sender, instance, **kwargs):
+    """
+    Store the members of the group before they are detached by the deletion
+
+    A signal receiver of ``pre_delete`` for django group model.
+    """
+    _stash_group_users(instance)
+
+
+def stash_related_objects_on_delete(sender, instance, **kwargs):
+    """
+    Store the objects which refer to the related object in the lookups of
+    permission logics before they are detached by the deletion
+
+    A signal receiver of ``pre_delete``.
+    """
+    handlers = get_materialized_handlers()
+    if not _is_related_model(sender, handlers):
+        return
+    related = {}
+    for handler in handlers:
+        pks = list(handler.get_related_objects(sender, [instance]).values_list("pk", flat=True))
+        if pks:
+            related[handler] = pks
+    setattr(instance, STASHED_RELATED_NAME, related)
+
+
+def update_grants_on_m2m_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """
+    Rebuild the grants which depend on the changed sides of the many-to-many
+    relation
+
+    A signal receiver of ``m2m_changed``. Only the grants of the sides which
+    the permission logics read are rebuilt, e.g. the grants of the article
+    for ``article.collaborators.add(user)`` or the grants of the user for
+    ``user.groups.add(group)``. Both sides are rebuilt when both models are
+    materialized or related.
+    """
+    handlers = get_materialized_handlers()
+    if not handlers:
+        return
+    instance_model = instance.__class__
+    instance_side = _is_changed_side(instance_model, model, handlers)
+    model_side = _is_changed_side(model, instance_model, handlers)
+    if not instance_side and not model_side:
+        # e.g. user.groups or group.permissions
+        user_model = get_user_model()
+        model_side = issubclass(model, user_model) and not issubclass(instance_model, user_model)
+        instance_side = not model_side
+    if action == "pre_clear" and model_side:
+        # the related objects cannot be known after the clear
+        setattr(instance, STASHED_RELATED_NAME, _get_related_pks(sender, instance, model))
+    if not action.startswith("post_"):
+        return
+    if instance_side:
+        _update_grants(instance_model, [instance], model)
+    if model_side:
+        if action == "post_clear":
+            pk_set = getattr(instance, STASHED_RELATED_NAME, ())
+        if pk_set:
+            _update_grants(model, model._base_manager.filter(pk__in=pk_set), instance_model)
+
+
+def _update_grants(model, instances, other_model=None):
+    # the grants of the model of the other side of a many-to-many relation
+    # are rebuilt from the other side
+    handlers = get_materialized_handlers()
+    if not handlers:
+        return
+    instances = list(instances)
+    handler = _get_materialized_handler(model)
+    if handler is not None:
+        handler.rebuild_grants(instances)
+    related_handlers = [x for x in handlers if x.model is not other_model and model in x.get_related_lookups()]
+    for related_handler in related_handlers:
+        related_handler.rebuild_grants(related_handler.get_related_objects(model, instances))
+    if handler is not None or _is_related_model(model, handlers):
+        return
+    user_model = get_user_model()
+    if not issubclass(model, (Group, user_model)):
+        return
+    if issubclass(model, Group):
+        if not has_user_field("groups"):
+            # custom user models without groups
+            return
+        instances = user_model._base_manager.filter(groups__in=instances).distinct()
+    for user_obj in instances:
+        for handler in handlers:
+            handler.rebuild_user_grants(user_obj)
+
+
+def _get_materialized_handler(model):
+    from permission.materialized.handlers import MaterializedPermissionHandler
+
+    handler = getattr(model, "_permission_handler", None)
+    if isinstance(handler, MaterializedPermissionHandler) and handler.model is model:
+        return handler
+    return None
+
+
+def _is_related_model(model, handlers):
+    return any(model in x.get_related_lookups() for x in handlers)
+
+
+def _is_changed_side(model, other_model, handlers):
+    # whether the permission logics read the relation from the side of the
+    # model; the relation to the model of a handler is read by the handler
+    if _get_materialized_handler(model) is not None:
+        return True
+    return any(x.model is not other_model and model in x.get_related_lookups() for x in handlers)
+
+
+def _get_related_pks(through, instance, model):
+    source = target = None
+    for field in through._meta.concrete_fields:
+        if not field.is_relation:
+            continue
+        if field.related_model is instance._meta.concrete_model:
+            source = field
+        elif field.related_model is model._meta.concrete_model:
+            target = field
+    if source is None or target is None:
+        return []
+    return list(through._base_manager.filter(**{source.attname: instance.pk}).values_list(target.attname, flat=True))
+
+
+def _stash_group_users(group):
+    if not get_materialized_handlers() or not has_user_field("groups"):
+        return
+    users = list(get_user_model()._base_manager.filter(groups=group))
+    setattr(group, STASHED_USERS_NAME, users)
@@ -1,3 +1,15 @@
 from permission.mixins.admin import RequireObjectPermissionAdminMixin
+from permission.mixins.queryset import (
+    PermissionManager,
+    PermissionQuerySet,
+    PermissionQuerySetMixin,
+    permission_manager_factory,
+)
 
-__all__ = ("RequireObjectPermissionAdminMixin",)
+__all__ = (
+    "PermissionManager",
+    "PermissionQuerySet",
+    "PermissionQuerySetMixin",
+    "RequireObjectPermissionAdminMixin",
+    "permission_manager_factory",
+)
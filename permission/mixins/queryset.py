@@ -0,0 +1,112 @@
+"""
+QuerySet mixin for filtering objects with django-permission2.
+
+The mixin adds ``for_user(user_obj, perm)`` which filters the queryset to the
+objects the user have the permission of. The filter is compiled from the
+permission logics of the model (see
+:meth:`permission.handlers.LogicalPermissionHandler.filter_queryset`) thus
+pagination and ``count()`` run in the database.
+"""
+
+from django.db import models
+
+__all__ = (
+    "PermissionManager",
+    "PermissionQuerySet",
+    "PermissionQuerySetMixin",
+    "permission_manager_factory",
+)
+
+
+class PermissionQuerySetMixin:
+    """
+    QuerySet mixin that provides ``for_user(user_obj, perm)``.
+
+    Usage::
+
+        from django.db import models
+        from permission.mixins.queryset import PermissionQuerySetMixin
+
+        class ArticleQuerySet(PermissionQuerySetMixin, models.QuerySet):
+            pass
+
+        class Article(models.Model):
+            ...
+            objects = ArticleQuerySet.as_manager()
+
+        Article.objects.for_user(request.user, "blog.change_article")
+    """
+
+    def for_user(self, user_obj, perm):
+        """
+        Filter the queryset to the objects the user have the permission of
+
+        Active superusers have all permissions thus the queryset is returned
+        as is. Otherwise the ``filter_queryset`` of the permission handler
+        registered to the model is used. Permission logics which cannot be
+        expressed as a ``Q`` object are evaluated in Python on chunks of the
+        objects when the queryset is evaluated. It scans the table and the
+        granted primary keys are written into the SQL thus implement
+        ``get_q`` in the permission logics of large tables.
+
+        Parameters
+        ----------
+        user_obj : django user model instance
+            A django user model instance which be checked
+        perm : string
+            `app_label.codename` formatted permission string
+
+        Returns
+        -------
+        django queryset
+            A queryset which contains the objects the specified user have
+            specified permission of. It is empty if no permission handler
+            which can filter the queryset is registered to the model.
+        """
+        if getattr(user_obj, "is_active", False) and getattr(user_obj, "is_superuser", False):
+            return self.all()
+        handler = getattr(self.model, "_permission_handler", None)
+        if handler is None or not hasattr(handler, "filter_queryset"):
+            return self.none()
+        return handler.filter_queryset(user_obj, perm, self.all())
+
+
+class PermissionQuerySet(PermissionQuerySetMixin, models.QuerySet):
+    """
+    QuerySet which provides ``for_user(user_obj, perm)``
+    """
+
+
+def permission_manager_factory(manager_class=models.Manager, queryset_class=models.QuerySet):
+    """
+    Create a manager class which provides ``for_user(user_obj, perm)``
+
+    Parameters
+    ----------
+    manager_class : django manager class
+        A base manager class
+    queryset_class : django queryset class
+        A base queryset class. :class:`PermissionQuerySetMixin` is mixed in
+        if it is not a subclass of the mixin.
+
+    Returns
+    -------
+    class
+        A manager class created with ``from_queryset``
+
+    Examples
+    --------
+    >>> class Article(models.Model):
+    ...     objects = permission_manager_factory()()
+    """
+    if not issubclass(queryset_class, PermissionQuerySetMixin):
+        queryset_class = type(
+            f"Permission{queryset_class.__name__}",
+            (PermissionQuerySetMixin, queryset_class),
+            {"__module__": queryset_class.__module__},
+        )
+    return manager_class.from_queryset(queryset_class)
+
+
+PermissionManager = permission_manager_factory(queryset_class=PermissionQuerySet)
+"""Manager which provides ``for_user(user_obj, perm)``"""
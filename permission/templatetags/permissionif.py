@@ -5,9 +5,10 @@ permissionif templatetag
 from django import template
 from django.template import TemplateSyntaxError
 from django.template.defaulttags import IfNode, TemplateLiteral
-from django.template.smartif import OPERATORS, IfParser, infix
+from django.template.smartif import OPERATORS, IfParser, TokenBase, infix
 
 from permission.conf import settings
+from permission.utils.cache import prefetch_permissions
 
 register = template.Library()
 
@@ -36,10 +37,63 @@ def has_operator(context, x, y):
     return user.has_perm(perm, obj)
 
 
+class HasOperator(TokenBase):
+    """
+    'has' operator of permission if
+
+    The permission is compiled when the template is parsed if it is a string
+    literal (e.g. ``user has 'blogs.change_article' of object``) thus each
+    evaluation only resolve the user (and the object) and call ``has_perm``
+    of the user. Other forms are evaluated by :func:`has_operator`.
+    """
+
+    lbp = 10
+    perm = None
+    """Compiled permission string or None"""
+    obj = None
+    """Compiled target object expression or None"""
+
+    def led(self, left, parser):
+        self.first = left
+        self.second = parser.expression(self.lbp)
+        self.compile()
+        return self
+
+    def compile(self):
+        target, obj = self.second, None
+        if getattr(target, "id", None) == "of":
+            target, obj = target.first, target.second
+        perm = _get_literal(target)
+        if perm is None:
+            return
+        self.perm = perm
+        self.obj = obj
+
+    def eval(self, context):
+        try:
+            if self.perm is None:
+                return has_operator(context, self.first, self.second)
+            user = self.first.eval(context)
+            obj = None if self.obj is None else self.obj.eval(context)
+            return user.has_perm(self.perm, obj)
+        except Exception:
+            # Templates shouldn't throw exceptions when rendering
+            return False
+
+
+def _get_literal(var):
+    # a string literal without filters, e.g. 'blogs.add_article'
+    if not isinstance(var, TemplateLiteral) or var.value.filters:
+        return None
+    if not isinstance(var.value.var, str):
+        return None
+    return str(var.value.var)
+
+
 # Add 'of' and 'has' operator to existing operators
 EXTRA_OPERATORS = {
     "of": infix(20, of_operator),
-    "has": infix(10, has_operator),
+    "has": HasOperator,
 }
 EXTRA_OPERATORS.update(OPERATORS)
 for key, op in EXTRA_OPERATORS.items():
@@ -131,6 +185,60 @@ def do_permissionif(parser, token):
 do_permissionif.Parser = TemplatePermissionIfParser
 
 
+class PrefetchPermissionsNode(template.Node):
+    def __init__(self, user, perms, objs):
+        self.user = user
+        self.perms = perms
+        self.objs = objs
+
+    def render(self, context):
+        user = self.user.resolve(context)
+        objs = self.objs.resolve(context)
+        if user is None or not objs:
+            return ""
+        perms = [x.resolve(context) for x in self.perms]
+        try:
+            prefetch_permissions(user, perms, objs)
+        except Exception:
+            # Templates shouldn't throw exceptions when rendering. The
+            # following 'has' operators check the permissions without the
+            # prefetched results
+            pass
+        return ""
+
+
+@register.tag("prefetch_permissions")
+def do_prefetch_permissions(parser, token):
+    """
+    Prefetch permissions templatetag
+
+    It checks the permissions of the user on the objects in a batch and store
+    the results in the permission decision cache of the user thus following
+    ``has`` operators on the objects do not call permission logics.
+
+    Examples
+    --------
+    ::
+
+        {% prefetch_permissions user 'blog.change_article' 'blog.delete_article' for object_list %}
+        {% for object in object_list %}
+            {% if user has 'blog.change_article' of object %}
+                <a href="...">Edit</a>
+            {% endif %}
+        {% endfor %}
+
+    """
+    bits = token.split_contents()
+    if len(bits) < 5 or bits[-2] != "for":
+        raise TemplateSyntaxError(
+            f"'{bits[0]}' tag requires the form: {{% {bits[0]} user perm [perm ...] for objects %}}"
+        )
+    user = parser.compile_filter(bits[1])
+    perms = [parser.compile_filter(x) for x in bits[2:-2]]
+    objs = parser.compile_filter(bits[-1])
+    return PrefetchPermissionsNode(user, perms, objs)
+
+
 # To replace builtin if
 def replace_builtin_if(replace=False):
     if replace:
@@ -0,0 +1,478 @@
+"""
+Permission decision cache utilities
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from permission.conf import settings
+
+__all__ = (
+    "LRUCache",
+    "aget_group_names",
+    "aget_shared_cache_key",
+    "clear_module_perms_cache",
+    "clear_permission_cache",
+    "get_cache_key",
+    "get_group_names",
+    "get_permission_cache",
+    "get_shared_cache",
+    "get_shared_cache_key",
+    "invalidate_shared_permission_cache",
+    "prefetch_permissions",
+)
+
+CACHE_NAME = "_logical_perms_cache"
+"""Name of the attribute of the user instance to store the cache"""
+
+GROUP_NAMES_CACHE_NAME = "_permission_group_names_cache"
+"""Name of the attribute of the user instance to store the group names"""
+
+SHARED_CACHE_KEY_PREFIX = "permission"
+"""Prefix of the keys stored in the shared cache"""
+
+_missing = object()
+
+
+class LRUCache:
+    """
+    A dictionary like cache which discard the least recently used entry when
+    the number of entries exceeds ``maxsize`` and expire entries after
+    ``timeout`` seconds
+    """
+
+    def __init__(self, maxsize=None, timeout=None):
+        """
+        Constructor
+
+        Parameters
+        ----------
+        maxsize : integer or None
+            The maximum number of entries. ``None`` for unlimited.
+        timeout : number or None
+            The number of seconds before an entry expires. ``None`` for never.
+        """
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._data = OrderedDict()
+        # the cache of a handler is shared between threads
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # locks cannot be pickled (e.g. a user instance stored in a cache)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        return self.get(key, _missing) is not _missing
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _missing)
+            if entry is _missing:
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires_at = None if self.timeout is None else time.monotonic() + self.timeout
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+def get_cache_key(perm, obj=None):
+    """
+    Get a cache key of the permission (of object)
+
+    Parameters
+    ----------
+    perm : string
+        `app_label.codename` formatted permission string
+    obj : None or django model instance
+        None or django model instance for object permission
+
+    Returns
+    -------
+    tuple or None
+        A ``(model label, pk, perm)`` tuple or ``None`` if the object cannot
+        be cached (e.g. unsaved instance).
+    """
+    if obj is None:
+        return (None, None, perm)
+    meta = getattr(obj, "_meta", None)
+    if meta is None or obj.pk is None:
+        return None
+    return (meta.label_lower, obj.pk, perm)
+
+
+def get_permission_cache(user_obj):
+    """
+    Get the permission decision cache of the user
+
+    The cache is stored in the user instance and bounded by
+    ``PERMISSION_CACHE_MAXSIZE`` in settings.
+
+    Parameters
+    ----------
+    user_obj : django user model instance
+        A django user model instance
+
+    Returns
+    -------
+    LRUCache
+        The permission decision cache of the user
+    """
+    cache = getattr(user_obj, CACHE_NAME, None)
+    if cache is None:
+        cache = LRUCache(maxsize=settings.PERMISSION_CACHE_MAXSIZE)
+        setattr(user_obj, CACHE_NAME, cache)
+    return cache
+
+
+def prefetch_permissions(user_obj, perms, objs):
+    """
+    Check the permissions of the user on the objects in a batch and store
+    the results in the permission decision cache of the user
+
+    The objects are checked with
+    :meth:`permission.backends.PermissionBackend.has_perm_many` thus each
+    permission logic check them with at most one SQL query. The following
+    ``user_obj.has_perm(perm, obj)`` calls on the objects use the cache.
+    Note that the cache is bounded by ``PERMISSION_CACHE_MAXSIZE`` in
+    settings.
+
+    Parameters
+    ----------
+    user_obj : django user model instance
+        A django user model instance
+    perms : iterable
+        An iterable of `app_label.codename` formatted permission strings
+    objs : iterable
+        An iterable of django model instances. Unsaved instances are ignored.
+
+    Returns
+    -------
+    dict
+        A dictionary which map each permission to a dictionary which map the
+        primary key of each object to the result.
+    """
+    from permission.backends import PermissionBackend
+
+    backend = PermissionBackend()
+    objs = [obj for obj in objs if get_cache_key(None, obj) is not None]
+    cache = get_permission_cache(user_obj)
+    results = {}
+    for perm in perms:
+        results[perm] = backend.has_perm_many(user_obj, perm, objs)
+        for obj in objs:
+            cache.set(get_cache_key(perm, obj), results[perm][obj.pk])
+    return results
+
+
+def get_shared_cache():
+    """
+    Get the shared permission decision cache
+
+    Returns
+    -------
+    django cache instance or None
+        The cache of ``PERMISSION_SHARED_CACHE`` alias in settings, or
+        ``None`` if the shared cache is disabled.
+    """
+    alias = settings.PERMISSION_SHARED_CACHE
+    if not alias:
+        return None
+    from django.core.cache import caches
+
+    return caches[alias]
+
+
+def _get_version_key(model, pk=None):
+    if model is None:
+        return f"{SHARED_CACHE_KEY_PREFIX}:version"
+    return f"{SHARED_CACHE_KEY_PREFIX}:version:{model._meta.label_lower}:{pk}"
+
+
+def _get_shared_cache_key_parts(user_obj, perm, obj):
+    if getattr(user_obj, "_meta", None) is None or user_obj.pk is None:
+        # anonymous user
+        return None
+    instances = [(user_obj.__class__, user_obj.pk)]
+    if obj is not None:
+        if getattr(obj, "_meta", None) is None or obj.pk is None:
+            return None
+        instances.append((obj.__class__, obj.pk))
+    version_keys = [_get_version_key(None)] + [_get_version_key(model, pk) for model, pk in instances]
+    key_parts = [SHARED_CACHE_KEY_PREFIX, perm] + [f"{model._meta.label_lower}:{pk}" for model, pk in instances]
+    return version_keys, key_parts
+
+
+def _create_version():
+    # a random version never collide with the versions evicted from the cache
+    return uuid.uuid4().hex
+
+
+def get_shared_cache_key(cache, user_obj, perm, obj=None):
+    """
+    Get a key of the permission decision (of object) in the shared cache
+
+    The key contains the versions of the user and the object thus the
+    decisions are invalidated by :func:`invalidate_shared_permission_cache`
+    without deleting them. The versions are loaded in a single round trip.
+
+    Parameters
+    ----------
+    cache : django cache instance
+        The shared cache returned from :func:`get_shared_cache`
+    user_obj : django user model instance
+        A django user model instance
+    perm : string
+        `app_label.codename` formatted permission string
+    obj : None or django model instance
+        None or django model instance for object permission
+
+    Returns
+    -------
+    string or None
+        A key of the shared cache or ``None`` if the decision cannot be
+        shared (e.g. anonymous user or unsaved instance).
+    """
+    parts = _get_shared_cache_key_parts(user_obj, perm, obj)
+    if parts is None:
+        return None
+    version_keys, key_parts = parts
+    versions = cache.get_many(version_keys)
+    for version_key in version_keys:
+        if version_key not in versions:
+            version = _create_version()
+            if not cache.add(version_key, version, timeout=None):
+                # the other process created the version
+                version = cache.get(version_key, version)
+            versions[version_key] = version
+    return ":".join(key_parts + [versions[x] for x in version_keys])
+
+
+async def aget_shared_cache_key(cache, user_obj, perm, obj=None):
+    """
+    Async version of :func:`get_shared_cache_key`
+    """
+    parts = _get_shared_cache_key_parts(user_obj, perm, obj)
+    if parts is None:
+        return None
+    version_keys, key_parts = parts
+    versions = await cache.aget_many(version_keys)
+    for version_key in version_keys:
+        if version_key not in versions:
+            version = _create_version()
+            if not await cache.aadd(version_key, version, timeout=None):
+                version = await cache.aget(version_key, version)
+            versions[version_key] = version
+    return ":".join(key_parts + [versions[x] for x in version_keys])
+
+
+def invalidate_shared_permission_cache(instance=None):
+    """
+    Invalidate the permission decisions in the shared cache
+
+    It does nothing when the shared cache is disabled.
+
+    Parameters
+    ----------
+    instance : None or django model instance
+        A django model instance (a user or an object) to invalidate the
+        decisions of. ``None`` for invalidating all decisions.
+    """
+    cache = get_shared_cache()
+    if cache is None:
+        return
+    if instance is None:
+        cache.set(_get_version_key(None), _create_version(), timeout=None)
+    else:
+        _invalidate_shared_permission_cache(cache, instance.__class__, [instance.pk])
+
+
+def _invalidate_shared_permission_cache(cache, model, pks):
+    cache.set_many({_get_version_key(model, pk): _create_version() for pk in pks}, timeout=None)
+
+
+def get_group_names(user_obj):
+    """
+    Get the names of the groups the user belongs to
+
+    The names are loaded in a single query and stored in the user instance
+    until :func:`clear_permission_cache` is called (e.g. when the groups of
+    the user are changed).
+
+    Parameters
+    ----------
+    user_obj : django user model instance
+        A django user model instance
+
+    Returns
+    -------
+    frozenset
+        A frozenset of group names
+    """
+    group_names = getattr(user_obj, GROUP_NAMES_CACHE_NAME, None)
+    if group_names is None:
+        group_names = frozenset(user_obj.groups.values_list("name", flat=True))
+        setattr(user_obj, GROUP_NAMES_CACHE_NAME, group_names)
+    return group_names
+
+
+async def aget_group_names(user_obj):
+    """
+    Async version of :func:`get_group_names`
+
+    The names are loaded with the async ORM interface when they are not
+    stored in the user instance yet.
+
+    Parameters
+    ----------
+    user_obj : django user model instance
+        A django user model instance
+
+    Returns
+    -------
+    frozenset
+        A frozenset of group names
+    """
+    group_names = getattr(user_obj, GROUP_NAMES_CACHE_NAME, None)
+    if group_names is None:
+        queryset = user_obj.groups.values_list("name", flat=True)
+        group_names = frozenset([x async for x in queryset])
+        setattr(user_obj, GROUP_NAMES_CACHE_NAME, group_names)
+    return group_names
+
+
+def clear_permission_cache(user_obj):
+    """
+    Clear the permission decision cache of the user
+
+    Use this in long running processes (e.g. batch jobs) which reuse the same
+    user instance to keep the memory flat or to reflect the changes of the
+    objects. The group names of the user and the ``has_module_perms`` cache
+    of the user in the registered permission handlers are cleared as well.
+
+    Parameters
+    ----------
+    user_obj : django user model instance
+        A django user model instance
+    """
+    cache = getattr(user_obj, CACHE_NAME, None)
+    if cache is not None:
+        cache.clear()
+    if hasattr(user_obj, GROUP_NAMES_CACHE_NAME):
+        delattr(user_obj, GROUP_NAMES_CACHE_NAME)
+    clear_module_perms_cache(user_obj.pk)
+
+
+def clear_module_perms_cache(user_pk=None):
+    """
+    Clear the ``has_module_perms`` cache of the registered permission handlers
+
+    Parameters
+    ----------
+    user_pk : any
+        A primary key of django user model instance to clear the cache of.
+        ``None`` for clearing the cache of all users.
+    """
+    from permission.utils.handlers import registry
+
+    for handler in registry.get_handlers():
+        handler.clear_module_perms_cache(user_pk)
+
+
+def clear_permission_cache_on_m2m_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Clear the permission cache of users whose groups or permissions changed
+
+    A signal receiver of ``m2m_changed`` for ``user.groups`` and
+    ``user.user_permissions``.
+    """
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        # e.g. user.groups.add(group)
+        clear_permission_cache(instance)
+    elif pk_set is None:
+        # e.g. group.user_set.clear()
+        clear_module_perms_cache()
+    else:
+        # e.g. group.user_set.add(user)
+        for pk in pk_set:
+            clear_module_perms_cache(pk)
+
+
+def _is_shared_cache_related(model):
+    from django.contrib.auth import get_user_model
+
+    if getattr(model, "_permission_logics", None):
+        return True
+    return issubclass(model, get_user_model())
+
+
+def invalidate_shared_permission_cache_on_save(sender, instance, **kwargs):
+    """
+    Invalidate the shared permission decisions of the saved or deleted
+    instance
+
+    A signal receiver of ``post_save`` and ``post_delete`` for the models
+    with permission logics and django user model. The decisions of all
+    users are invalidated when a group is changed.
+    """
+    cache = get_shared_cache()
+    if cache is None:
+        return
+    from django.contrib.auth.models import Group
+
+    if issubclass(sender, Group):
+        # e.g. group name read by GroupInPermissionLogic
+        invalidate_shared_permission_cache()
+    elif _is_shared_cache_related(sender):
+        _invalidate_shared_permission_cache(cache, sender, [instance.pk])
+
+
+def invalidate_shared_permission_cache_on_m2m_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """
+    Invalidate the shared permission decisions of the instances whose
+    many-to-many relations changed
+
+    A signal receiver of ``m2m_changed`` (e.g. ``article.collaborators`` or
+    ``user.groups``).
+    """
+    if not action.startswith("post_"):
+        return
+    cache = get_shared_cache()
+    if cache is None:
+        return
+    if _is_shared_cache_related(instance.__class__):
+        _invalidate_shared_permission_cache(cache, instance.__class__, [instance.pk])
+    if pk_set and _is_shared_cache_related(model):
+        _invalidate_shared_permission_cache(cache, model, pk_set)
@@ -2,6 +2,12 @@
 
 from collections.abc import Iterable
 
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.exceptions import FieldDoesNotExist
+
+_accessors = {}
+
 
 def field_lookup(obj, field_path):
     """
@@ -9,7 +15,8 @@ def field_lookup(obj, field_path):
 
     Args:
         obj (instance): Django Model instance
-        field_path (str): '__' separated field path
+        field_path (str or tuple): '__' separated field path or a tuple of
+            field names
 
     Example:
         >>> from django.db import model
@@ -34,7 +41,231 @@ def field_lookup(obj, field_path):
     elif isinstance(obj, Iterable):
         return (field_lookup(x, field_path) for x in iter(obj))
     # split the path
-    field_path = field_path.split("__", 1)
+    if isinstance(field_path, str):
+        field_path = field_path.split("__")
     if len(field_path) == 1:
         return getattr(obj, field_path[0], None)
-    return field_lookup(field_lookup(obj, field_path[0]), field_path[1])
+    return field_lookup(field_lookup(obj, field_path[:1]), field_path[1:])
+
+
+def get_field_path_accessor(model, field_path):
+    """
+    Get a compiled accessor of the field path of the model
+
+    The accessor is compiled once per ``(model, field_path)`` and cached.
+
+    Parameters
+    ----------
+    model : django model class
+        A django model class the field path start from
+    field_path : string or tuple
+        '__' separated field path or a tuple of field names
+
+    Returns
+    -------
+    FieldPathAccessor
+        A compiled accessor of the field path
+    """
+    if isinstance(field_path, str):
+        field_path = tuple(field_path.split("__"))
+    key = (model, tuple(field_path))
+    accessor = _accessors.get(key)
+    if accessor is None:
+        accessor = FieldPathAccessor(model, field_path)
+        _accessors[key] = accessor
+    return accessor
+
+
+class FieldPathAccessor:
+    """
+    A field path of django model compiled against ``_meta``
+
+    Calling the instance with a model instance lookup the field path in the
+    same way as :func:`field_lookup`, without splitting the path and
+    recursing on every call.
+
+    Attributes
+    ----------
+    model : django model class
+        A django model class the field path start from
+    field_path : tuple
+        A tuple of field names
+    lookup : string
+        '__' separated field path which can be used in ORM lookups
+    fields : tuple or None
+        A tuple of django model fields of each hop, or ``None`` if the field
+        path could not be resolved against ``_meta``. Unresolved field path
+        is looked up with :func:`field_lookup`.
+    fan_out : int or None
+        The index of the first hop which fan out through a multi-valued
+        relation (many to many or reverse foreign key) in Python, or
+        ``None``.
+    multi_valued : boolean
+        True if any hop is a multi-valued relation thus ORM lookups may
+        return duplicated rows.
+    attname : string or None
+        The attname (e.g. ``author_id``) of the last hop if all hops are
+        forward foreign keys to primary keys, or ``None``.
+    """
+
+    def __init__(self, model, field_path):
+        if isinstance(field_path, str):
+            field_path = field_path.split("__")
+        self.model = model
+        self.field_path = tuple(field_path)
+        self.lookup = "__".join(self.field_path)
+        self.fields = _resolve_fields(model, self.field_path)
+        self.fan_out = None
+        self.multi_valued = False
+        self.attname = None
+        self._fan_outs = ()
+        if self.fields is None:
+            return
+        multi_valued = [x.many_to_many or x.one_to_many for x in self.fields]
+        self.multi_valued = any(multi_valued)
+        # the last hop does not fan out, it returns the related manager
+        self._fan_outs = tuple(i for i, x in enumerate(multi_valued[:-1]) if x)
+        if self._fan_outs:
+            self.fan_out = self._fan_outs[0]
+        elif all(_is_forward_foreign_key(x) for x in self.fields):
+            self.attname = self.fields[-1].attname
+
+    def __call__(self, obj):
+        """
+        Lookup the field path of the object
+
+        Parameters
+        ----------
+        obj : django model instance
+            A django model instance of :attr:`model`
+
+        Returns
+        -------
+        any
+            The value of the field path. A list of values is returned when
+            the field path fan out through multi-valued relations.
+        """
+        if self.fields is None:
+            return field_lookup(obj, self.field_path)
+        return self._lookup(obj, 0)
+
+    def _lookup(self, obj, start):
+        for index in range(start, len(self.field_path)):
+            if obj is None:
+                return None
+            obj = getattr(obj, self.field_path[index], None)
+            if obj is not None and index in self._fan_outs:
+                values = [self._lookup(x, index + 1) for x in obj.all()]
+                if index != self._fan_outs[-1]:
+                    # flatten the values of the following fan out
+                    values = [x for value in values for x in value]
+                return values
+        return obj
+
+    def get_related_pk(self, obj):
+        """
+        Get the primary key of the related object at the end of the field path
+
+        If :attr:`attname` is available, the relations cached in the object
+        are walked and the attname of the last hop is returned without
+        fetching the related object. If a relation is not cached, only the
+        primary key is fetched in a single query from the related object of
+        the foreign key held in memory (e.g. ``single_bridge_id``).
+
+        Parameters
+        ----------
+        obj : django model instance
+            A django model instance of :attr:`model`
+
+        Returns
+        -------
+        any
+            The primary key of the related object or ``None``
+        """
+        if self.attname is None:
+            return getattr(self(obj), "pk", None)
+        current = obj
+        for index, field in enumerate(self.fields[:-1]):
+            if not field.is_cached(current):
+                queryset = self._get_related_queryset(current, index)
+                if queryset is None:
+                    return None
+                # fetch only the primary key in a single query
+                return queryset.first()
+            current = getattr(current, field.name)
+            if current is None:
+                return None
+        return getattr(current, self.attname)
+
+    async def aget_related_pk(self, obj):
+        """
+        Async version of :meth:`get_related_pk`
+
+        The primary key is fetched with the async ORM interface. Field paths
+        without :attr:`attname` are looked up in a thread.
+        """
+        if self.attname is None:
+            return await sync_to_async(self.get_related_pk)(obj)
+        current = obj
+        for index, field in enumerate(self.fields[:-1]):
+            if not field.is_cached(current):
+                queryset = self._get_related_queryset(current, index)
+                if queryset is None:
+                    return None
+                return await queryset.afirst()
+            current = getattr(current, field.name)
+            if current is None:
+                return None
+        return getattr(current, self.attname)
+
+    def _get_related_queryset(self, obj, index):
+        # follow the foreign key held in memory instead of the stored row
+        field = self.fields[index]
+        value = getattr(obj, field.attname)
+        if value is None:
+            return None
+        queryset = field.related_model._base_manager.filter(pk=value)
+        return queryset.values_list("__".join(self.field_path[index + 1 :]), flat=True)
+
+
+def has_user_field(name):
+    """
+    Check if the user model have the field
+
+    Custom user models built on ``AbstractBaseUser`` may not have the fields
+    of django user model (e.g. ``is_active`` is a class attribute, not a
+    field), thus ``Q`` objects of the user model cannot filter them.
+
+    Parameters
+    ----------
+    name : string
+        A name of the field (or the relation) of the user model
+
+    Returns
+    -------
+    boolean
+        Whether the user model have the field
+    """
+    try:
+        get_user_model()._meta.get_field(name)
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+def _resolve_fields(model, field_path):
+    fields = []
+    for name in field_path:
+        if model is None:
+            return None
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        fields.append(field)
+        model = field.related_model if field.is_relation else None
+    return tuple(fields)
+
+
+def _is_forward_foreign_key(field):
+    return field.concrete and (field.many_to_one or field.one_to_one) and field.target_field.primary_key
@@ -3,7 +3,9 @@ A utilities of permission handler
 """
 
 import inspect
+import threading
 
+from asgiref.sync import sync_to_async
 from django.core.exceptions import ImproperlyConfigured
 
 from permission.compat import import_string, isstr
@@ -17,6 +19,16 @@ class PermissionHandlerRegistry:
 
     def __init__(self):
         self._registry = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._index = None
+
+    @property
+    def generation(self):
+        """
+        A counter which is incremented every time the registry is changed
+        """
+        return self._generation
 
     def register(self, model, handler=None):
         """
@@ -54,7 +66,9 @@ class PermissionHandlerRegistry:
 
         # Instantiate the handler to save in the registry
         instance = handler(model)
-        self._registry[model] = instance
+        with self._lock:
+            self._registry[model] = instance
+            self._invalidate()
 
     def unregister(self, model):
         """
@@ -73,7 +87,9 @@ class PermissionHandlerRegistry:
         if model not in self._registry:
             raise KeyError(f"A permission handler class have not been registered for '{model}' yet")
         # remove from registry
-        del self._registry[model]
+        with self._lock:
+            del self._registry[model]
+            self._invalidate()
 
     def get_handlers(self):
         """
@@ -86,6 +102,134 @@ class PermissionHandlerRegistry:
         """
         return tuple(self._registry.values())
 
+    def get_handlers_for_perm(self, perm):
+        """
+        Get registered handler instances which can treat the permission
+
+        Parameters
+        ----------
+        perm : string
+            `app_label.codename` formatted permission string
+
+        Returns
+        -------
+        tuple
+            permission handler tuple
+        """
+        return self._get_index()[0].get(perm, ())
+
+    def get_handlers_for_app_label(self, app_label):
+        """
+        Get registered handler instances which can treat the app label
+
+        Parameters
+        ----------
+        app_label : string
+            Django application name
+
+        Returns
+        -------
+        tuple
+            permission handler tuple
+        """
+        return self._get_index()[1].get(app_label, ())
+
+    async def aget_handlers_for_perm(self, perm):
+        """
+        Async version of :meth:`get_handlers_for_perm`
+
+        The index is built in a thread only when it is not built yet.
+        """
+        if self._index is None:
+            return await sync_to_async(self.get_handlers_for_perm)(perm)
+        return self.get_handlers_for_perm(perm)
+
+    async def aget_handlers_for_app_label(self, app_label):
+        """
+        Async version of :meth:`get_handlers_for_app_label`
+
+        The index is built in a thread only when it is not built yet.
+        """
+        if self._index is None:
+            return await sync_to_async(self.get_handlers_for_app_label)(app_label)
+        return self.get_handlers_for_app_label(app_label)
+
+    def warmup(self):
+        """
+        Load the supported permissions of all registered handlers at once
+
+        All permissions are loaded in a single query and stored in the
+        handlers as if ``_get_model_perms``/``_get_app_perms`` were called,
+        then the perm and app label index is built.
+        Call this method from gunicorn ``post_fork`` hook or set
+        ``PERMISSION_WARMUP_ON_READY`` to ``True`` in settings to call it
+        when the application is ready.
+
+        Examples
+        --------
+        >>> # gunicorn.conf.py
+        >>> def post_fork(server, worker):
+        ...     from permission.utils.handlers import registry
+        ...     registry.warmup()
+        """
+        from django.contrib.auth.models import Permission
+
+        app_perms = {}
+        model_perms = {}
+        qs = Permission.objects.values_list("content_type__app_label", "content_type__model", "codename")
+        for app_label, model_name, codename in qs.iterator():
+            perm = f"{app_label}.{codename}"
+            app_perms.setdefault(app_label, set()).add(perm)
+            model_perms.setdefault((app_label, model_name), set()).add(perm)
+
+        for handler in self.get_handlers():
+            handler._app_perms_cache = set(app_perms.get(handler.app_label, ()))
+            if handler.model is not None:
+                model_name = handler.model._meta.object_name.lower()
+                handler._model_perms_cache = set(model_perms.get((handler.app_label, model_name), ()))
+            # clear cache
+            for cache_name in ("_perms_cache", "_app_labels_cache"):
+                if hasattr(handler, cache_name):
+                    delattr(handler, cache_name)
+        self.invalidate()
+        self._get_index()
+
+    def invalidate(self):
+        """
+        Invalidate the perm and app label index of the registered handlers
+
+        The index is rebuilt on the next lookup. Call this method when the
+        supported permissions of the registered handlers are changed.
+        """
+        with self._lock:
+            self._invalidate()
+
+    def _invalidate(self):
+        self._index = None
+        self._generation += 1
+
+    def _get_index(self):
+        index = self._index
+        if index is None:
+            generation = self._generation
+            perm_index = {}
+            app_label_index = {}
+            for handler in self.get_handlers():
+                for perm in handler.get_supported_permissions():
+                    perm_index.setdefault(perm, []).append(handler)
+                for app_label in handler.get_supported_app_labels():
+                    app_label_index.setdefault(app_label, []).append(handler)
+            index = (
+                {perm: tuple(handlers) for perm, handlers in perm_index.items()},
+                {app_label: tuple(handlers) for app_label, handlers in app_label_index.items()},
+            )
+            with self._lock:
+                # do not store the index built from handlers which have been
+                # changed while building
+                if self._generation == generation:
+                    self._index = index
+        return index
+
 
 # Permission handler registry instance
 registry = PermissionHandlerRegistry()
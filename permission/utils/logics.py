@@ -9,6 +9,9 @@ def add_permission_logic(model, permission_logic):
     """
     Add permission logic to the model
 
+    The permission logics of the model are kept in ascending order of their
+    ``cost`` thus cheap logics are evaluated first.
+
     Parameters
     ----------
     model : django model class
@@ -29,15 +32,22 @@ def add_permission_logic(model, permission_logic):
     if not isinstance(permission_logic, PermissionLogic):
         raise AttributeError("`permission_logic` must be an instance of PermissionLogic")
     if not hasattr(model, "_permission_logics"):
-        model._permission_logics = set()
+        model._permission_logics = []
+    elif not isinstance(model._permission_logics, list):
+        # e.g. reset to a set or a tuple by the user code
+        model._permission_logics = list(model._permission_logics)
     if not hasattr(model, "_permission_handler"):
         from permission.utils.handlers import registry
 
         # register default permission handler
         registry.register(model, handler=None)
-    model._permission_logics.add(permission_logic)
-    # store target model to the permission_logic instance
-    permission_logic.model = model
+    if permission_logic not in model._permission_logics:
+        model._permission_logics.append(permission_logic)
+        # evaluate cheap permission logics first (the sort is stable thus
+        # logics of the same cost keep the order they were added)
+        model._permission_logics.sort(key=lambda x: x.cost)
+    # bind target model to the permission_logic instance
+    permission_logic.bind(model)
 
 
 def remove_permission_logic(model, permission_logic, fail_silently=True):
@@ -67,17 +77,12 @@ def remove_permission_logic(model, permission_logic, fail_silently=True):
     >>> remove_permission_logic(Mock, logic)
     """
     if not hasattr(model, "_permission_logics"):
-        model._permission_logics = set()
+        model._permission_logics = []
     if not isinstance(permission_logic, PermissionLogic):
         # remove all permission logic of related
-        remove_set = set()
-        for _permission_logic in model._permission_logics:
-            if _permission_logic.__class__ == permission_logic:
-                remove_set.add(_permission_logic)
-        # difference
-        model._permission_logics = model._permission_logics.difference(remove_set)
-    else:
-        if fail_silently and permission_logic not in model._permission_logics:
-            pass
-        else:
-            model._permission_logics.remove(permission_logic)
+        model._permission_logics = [x for x in model._permission_logics if x.__class__ != permission_logic]
+    elif permission_logic in model._permission_logics:
+        model._permission_logics = list(model._permission_logics)
+        model._permission_logics.remove(permission_logic)
+    elif not fail_silently:
+        raise KeyError(permission_logic)
@@ -5,6 +5,11 @@ In this module, term *perm* indicate the identifier string permission written
 in 'app_label.codename' format.
 """
 
+from asgiref.sync import sync_to_async
+
+# A frozenset of all perms, loaded lazily by ``get_all_perms``
+_all_perms = None
+
 
 def get_perm_codename(perm, fail_silently=True):
     """
@@ -138,3 +143,92 @@ def get_model_perms(model):
     qs = Permission.objects.filter(content_type__app_label=app_label, content_type__model=model_name)
     perms = (f"{app_label}.{p.codename}" for p in qs.iterator())
     return set(perms)
+
+
+def get_all_perms():
+    """
+    Get permission-string set of all permissions in the database.
+
+    The permissions are loaded in a single query on the first call and kept
+    in memory until :func:`reset_all_perms` is called. It is called on
+    ``post_migrate`` and on ``post_save``/``post_delete`` of ``Permission``
+    thus the set is rebuilt on the next call after permissions are changed.
+
+    Returns
+    -------
+    frozenset
+        A frozenset of all perms.
+
+    Examples
+    --------
+    >>> 'auth.add_user' in get_all_perms()
+    True
+    """
+    global _all_perms
+    if _all_perms is None:
+        from django.contrib.auth.models import Permission
+
+        qs = Permission.objects.values_list("content_type__app_label", "codename")
+        _all_perms = frozenset(f"{app_label}.{codename}" for app_label, codename in qs.iterator())
+    return _all_perms
+
+
+async def aget_all_perms():
+    """
+    Async version of :func:`get_all_perms`
+
+    The permissions are loaded in a thread only on the first call.
+
+    Returns
+    -------
+    frozenset
+        A frozenset of all perms.
+    """
+    if _all_perms is None:
+        return await sync_to_async(get_all_perms)()
+    return _all_perms
+
+
+def perm_exists(perm):
+    """
+    Check if the permission-string exists in the database.
+
+    The permission is checked against :func:`get_all_perms`. The set is
+    reloaded once when the permission is missing, thus permissions created
+    by other processes (e.g. ``migrate`` while workers are up) are found as
+    well.
+
+    Parameters
+    ----------
+    perm : string
+        `app_label.codename` formatted permission string
+
+    Returns
+    -------
+    boolean
+        Whether the permission exists.
+    """
+    if perm in get_all_perms():
+        return True
+    reset_all_perms()
+    return perm in get_all_perms()
+
+
+async def aperm_exists(perm):
+    """
+    Async version of :func:`perm_exists`
+    """
+    if perm in await aget_all_perms():
+        return True
+    reset_all_perms()
+    return perm in await aget_all_perms()
+
+
+def reset_all_perms(**kwargs):
+    """
+    Reset the permission-string set loaded by :func:`get_all_perms`.
+
+    It can be used as a signal receiver.
+    """
+    global _all_perms
+    _all_perms = None
@@ -0,0 +1,201 @@
+"""
+Queryset utilities for permission
+"""
+
+from django.db.models import Exists, Expression, OuterRef, Value
+
+from permission.conf import settings
+
+ANNOTATION_PREFIX = "_perm_"
+"""Prefix of the names of the permission annotations"""
+
+ANNOTATION_USER_NAME = "_perm_user_pk"
+"""Name of the annotation which store the primary key of the annotated user"""
+
+
+class PermittedPrimaryKeys(Expression):
+    """
+    An expression of the primary keys of the objects which the permission
+    logics grant in Python (e.g. ``pk__in=PermittedPrimaryKeys(...)``)
+
+    The objects are fetched in chunks of ``PERMISSION_FILTER_CHUNK_SIZE`` and
+    checked with ``has_perm`` of the permission logics when the queryset is
+    compiled to SQL, not when it is filtered. The primary keys are computed
+    once and shared by the clones of the queryset (e.g. ``count()`` and the
+    following slice of a paginator).
+    Integer primary keys are written into the SQL as literals thus they do
+    not count against the query parameter limit of the database.
+    """
+
+    def __init__(self, queryset, user_obj, perm, permission_logics):
+        super().__init__()
+        self.queryset = queryset
+        self.user_obj = user_obj
+        self.perm = perm
+        self.permission_logics = tuple(permission_logics)
+        # shared by the copies of this expression
+        self._result = {}
+
+    def get_pks(self):
+        """
+        Get the primary keys of the objects which the permission logics grant
+
+        Returns
+        -------
+        list
+            A list of primary keys
+        """
+        if "pks" not in self._result:
+            objs = self.queryset.iterator(chunk_size=settings.PERMISSION_FILTER_CHUNK_SIZE)
+            self._result["pks"] = [
+                obj.pk
+                for obj in objs
+                if any(logic.has_perm(self.user_obj, self.perm, obj) for logic in self.permission_logics)
+            ]
+        return self._result["pks"]
+
+    def as_sql(self, compiler, connection):
+        pks = self.get_pks()
+        if not pks:
+            return "NULL", []
+        if all(type(pk) is int for pk in pks):
+            return ", ".join(str(pk) for pk in pks), []
+        return ", ".join(["%s"] * len(pks)), pks
+
+
+def with_permission_relations(queryset, perm):
+    """
+    Apply ``select_related`` and ``prefetch_related`` which the permission
+    logics require to check the permission of the objects in the queryset
+
+    The relations are taken from
+    :meth:`permission.handlers.LogicalPermissionHandler.required_relations`
+    of the permission handler of the model thus the following ``has_perm``
+    calls on the objects do not query the relations one by one.
+    The queryset is returned unchanged if the permission handler of the
+    model does not provide the relations.
+
+    Parameters
+    ----------
+    queryset : django queryset
+        A queryset of the model
+    perm : string
+        `app_label.codename` formatted permission string
+
+    Returns
+    -------
+    django queryset
+        A queryset with the relations required to check the permission
+
+    Examples
+    --------
+    >>> articles = with_permission_relations(Article.objects.all(), "blog.change_article")
+    >>> [x for x in articles if user.has_perm("blog.change_article", x)]
+    """
+    handler = getattr(queryset.model, "_permission_handler", None)
+    if handler is None or not hasattr(handler, "required_relations"):
+        return queryset
+    select_related, prefetch_related = handler.required_relations(perm)
+    if select_related:
+        queryset = queryset.select_related(*sorted(select_related))
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*sorted(prefetch_related))
+    return queryset
+
+
+def get_annotation_name(perm):
+    """
+    Get the name of the annotation of the permission
+
+    Parameters
+    ----------
+    perm : string
+        `app_label.codename` formatted permission string
+
+    Returns
+    -------
+    string
+        An annotation name like ``_perm_change_article``
+    """
+    return ANNOTATION_PREFIX + perm.split(".", 1)[-1]
+
+
+def annotate_permissions(queryset, user_obj, perms):
+    """
+    Annotate whether the user have the permissions of each object in the
+    queryset
+
+    Each permission is annotated as a boolean ``Exists`` expression compiled
+    from the permission logics of the model (see
+    :meth:`permission.handlers.LogicalPermissionHandler.get_q`) thus the
+    objects come back with the permissions in a single SQL query, e.g.
+    ``obj._perm_change_article``. Following ``has_perm`` calls of the user
+    on the objects use the annotations instead of calling permission logics.
+
+    Permissions which are not supported by the permission handler of the
+    model, or cannot be expressed as a ``Q`` object, are not annotated.
+
+    Parameters
+    ----------
+    queryset : django queryset
+        A queryset of the model
+    user_obj : django user model instance
+        A django user model instance which be checked
+    perms : iterable
+        An iterable of `app_label.codename` formatted permission strings
+
+    Returns
+    -------
+    django queryset
+        A queryset annotated with the permissions
+
+    Examples
+    --------
+    >>> articles = annotate_permissions(Article.objects.all(), user, ["blog.change_article"])
+    >>> [x._perm_change_article for x in articles]
+    """
+    model = queryset.model
+    handler = getattr(model, "_permission_handler", None)
+    if handler is None or not hasattr(handler, "get_q"):
+        return queryset
+    annotations = {}
+    for perm in perms:
+        if perm not in handler.get_supported_permissions():
+            continue
+        q = handler.get_q(user_obj, perm)
+        if q is None:
+            continue
+        # use subquery to prevent duplicated rows from multi-valued relations
+        subquery = model._base_manager.filter(q, pk=OuterRef("pk"))
+        annotations[get_annotation_name(perm)] = Exists(subquery)
+    if not annotations:
+        return queryset
+    if user_obj.pk is not None:
+        annotations[ANNOTATION_USER_NAME] = Value(user_obj.pk)
+    return queryset.annotate(**annotations)
+
+
+def get_annotated_permission(user_obj, perm, obj):
+    """
+    Get the permission annotated by :func:`annotate_permissions`
+
+    Parameters
+    ----------
+    user_obj : django user model instance
+        A django user model instance which be checked
+    perm : string
+        `app_label.codename` formatted permission string
+    obj : None or django model instance
+        None or django model instance for object permission
+
+    Returns
+    -------
+    boolean or None
+        The annotated permission, or ``None`` if the object was not annotated
+        with the permission for the user.
+    """
+    if obj is None or user_obj.pk is None:
+        return None
+    if getattr(obj, ANNOTATION_USER_NAME, None) != user_obj.pk:
+        return None
+    return getattr(obj, get_annotation_name(perm), None)
@@ -24,6 +24,7 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     "tests.appconfig.apps.AppConfigConfig",
     "permission",
+    "permission.materialized",
     "tests",
 ]
 
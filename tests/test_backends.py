@@ -1,3 +1,5 @@
+from unittest.mock import AsyncMock
+
 from django.core.exceptions import ObjectDoesNotExist
 from django.test import TestCase, override_settings
 
@@ -21,9 +23,11 @@ class PermissionPermissionBackendTestCase(TestCase):
         self.perm3 = "permission.delete_article"
         self.article = create_article("test")
         self.original_get_handlers = registry.get_handlers
+        registry.invalidate()
 
     def tearDown(self):
         registry.get_handlers = self.original_get_handlers
+        registry.invalidate()
 
     def test_constructor(self):
         PermissionBackend()
@@ -170,6 +174,46 @@ class PermissionPermissionBackendTestCase(TestCase):
     def test_has_perm_with_nil_permission_raise_with_user(self):
         self.assertRaises(ObjectDoesNotExist, self.user.has_perm, "permissions.nil_permission")
 
+    @override_settings(
+        PERMISSION_CHECK_PERMISSION_PRESENCE=True,
+    )
+    def test_has_perm_permission_presence_without_query(self):
+        registry.get_handlers = MagicMock(return_value=[])
+
+        backend = PermissionBackend()
+        backend.has_perm(None, self.perm1)
+        with self.assertNumQueries(0):
+            self.assertFalse(backend.has_perm(None, self.perm1))
+
+    def test_has_perm_many(self):
+        perms = [
+            "permission.add_article",
+            "permission.change_article",
+            "permission.delete_article",
+        ]
+        article2 = create_article("test2")
+        registry.get_handlers = MagicMock(
+            return_value=[
+                MagicMock(
+                    get_supported_permissions=MagicMock(return_value=perms),
+                    has_perm_many=MagicMock(return_value={self.article.pk: True, article2.pk: False}),
+                ),
+                MagicMock(
+                    get_supported_permissions=MagicMock(return_value=perms),
+                    has_perm_many=MagicMock(return_value={article2.pk: False}),
+                ),
+            ]
+        )
+
+        backend = PermissionBackend()
+        results = backend.has_perm_many(self.user, self.perm1, [self.article, article2])
+        self.assertEqual(results, {self.article.pk: True, article2.pk: False})
+        registry.get_handlers()[0].has_perm_many.assert_called_once_with(
+            self.user, self.perm1, [self.article, article2]
+        )
+        # granted objects are not passed to the following handlers
+        registry.get_handlers()[1].has_perm_many.assert_called_once_with(self.user, self.perm1, [article2])
+
     def test_has_module_perms(self):
         app_labels = ["permission"]
         registry.get_handlers = MagicMock(
@@ -199,3 +243,52 @@ class PermissionPermissionBackendTestCase(TestCase):
         self.assertTrue(registry.get_handlers()[1].get_supported_app_labels.called)
         self.assertTrue(registry.get_handlers()[0].has_module_perms.called)
         self.assertTrue(registry.get_handlers()[1].has_module_perms.called)
+
+    async def test_ahas_perm(self):
+        perms = [
+            "permission.add_article",
+            "permission.change_article",
+            "permission.delete_article",
+        ]
+        registry.get_handlers = MagicMock(
+            return_value=[
+                MagicMock(
+                    get_supported_permissions=MagicMock(return_value=perms),
+                    ahas_perm=AsyncMock(return_value=False),
+                ),
+                MagicMock(
+                    get_supported_permissions=MagicMock(return_value=perms),
+                    ahas_perm=AsyncMock(return_value=True),
+                ),
+            ]
+        )
+
+        backend = PermissionBackend()
+        self.assertTrue(await backend.ahas_perm(self.user, self.perm1, self.article))
+        registry.get_handlers()[0].ahas_perm.assert_awaited_once_with(self.user, self.perm1, obj=self.article)
+        registry.get_handlers()[1].ahas_perm.assert_awaited_once_with(self.user, self.perm1, obj=self.article)
+
+    @override_settings(
+        PERMISSION_CHECK_PERMISSION_PRESENCE=True,
+    )
+    async def test_ahas_perm_with_nil_permission_raise(self):
+        registry.get_handlers = MagicMock(return_value=[])
+
+        backend = PermissionBackend()
+        with self.assertRaises(ObjectDoesNotExist):
+            await backend.ahas_perm(None, "permissions.nil_permission")
+
+    async def test_ahas_module_perms(self):
+        app_labels = ["permission"]
+        registry.get_handlers = MagicMock(
+            return_value=[
+                MagicMock(
+                    get_supported_app_labels=MagicMock(return_value=app_labels),
+                    ahas_module_perms=AsyncMock(return_value=True),
+                ),
+            ]
+        )
+
+        backend = PermissionBackend()
+        self.assertTrue(await backend.ahas_module_perms(self.user, "permission"))
+        self.assertFalse(await backend.ahas_module_perms(self.user, "unknown"))
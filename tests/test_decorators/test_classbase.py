@@ -1,3 +1,6 @@
+from unittest.mock import AsyncMock
+
+from asgiref.sync import iscoroutinefunction
 from django.core.exceptions import PermissionDenied
 from django.test import TestCase
 
@@ -6,6 +9,7 @@ from permission.utils.handlers import registry
 from tests.compat import MagicMock
 
 from .utils import (
+    create_mock_async_view_func,
     create_mock_handler,
     create_mock_model,
     create_mock_queryset,
@@ -187,3 +191,73 @@ class PermissionClassDecoratorsTestCase(TestCase):
             obj=self.model_instance,
         )
         self.assertTrue(self.view_func.called)
+
+
+class PermissionAsyncClassDecoratorsTestCase(TestCase):
+    def setUp(self):
+        self.handler = create_mock_handler()
+        self.request = create_mock_request(self.handler)
+        self.model = create_mock_model()
+        self.model_instance = self.model()
+        self.queryset = create_mock_queryset(self.model_instance)
+
+        self.view_func = create_mock_async_view_func()
+        self.view_class = permission_required("permission.add_article")(create_mock_view_class(self.view_func))
+        self.view_class_exc = permission_required("permission.add_article", raise_exception=True)(
+            create_mock_view_class(self.view_func)
+        )
+
+    def test_dispatch_is_coroutine_function(self):
+        self.assertTrue(iscoroutinefunction(self.view_class.dispatch))
+
+    async def test_with_object(self):
+        self.view_class.object = self.model_instance
+        self.view_class_exc.object = self.model_instance
+
+        self.handler.has_perm.return_value = False
+        await self.view_class.as_view()(self.request, pk=1)
+        self.request.user.ahas_perm.assert_awaited_with(
+            "permission.add_article",
+            obj=self.model_instance,
+        )
+        self.request.user.has_perm.assert_not_called()
+        self.view_func.assert_not_awaited()
+
+        with self.assertRaises(PermissionDenied):
+            await self.view_class_exc.as_view()(self.request, pk=1)
+        self.view_func.assert_not_awaited()
+
+        self.handler.has_perm.return_value = True
+        await self.view_class.as_view()(self.request, pk=1)
+        self.assertEqual(self.view_func.await_count, 1)
+
+    async def test_with_aget_object(self):
+        self.view_class.aget_object = AsyncMock(return_value=self.model_instance)
+        self.view_class.get_object = MagicMock(return_value=self.model_instance)
+
+        self.handler.has_perm.return_value = True
+        await self.view_class.as_view()(self.request, pk=1)
+        self.view_class.aget_object.assert_awaited_once_with(None)
+        self.view_class.get_object.assert_not_called()
+        self.request.user.ahas_perm.assert_awaited_with(
+            "permission.add_article",
+            obj=self.model_instance,
+        )
+        self.assertEqual(self.view_func.await_count, 1)
+
+    async def test_with_async_handlers(self):
+        from django.views.generic import View
+
+        response = MagicMock()
+
+        class MockView(View):
+            async def get(self, request, *args, **kwargs):
+                return response
+
+        view_class = permission_required("permission.add_article")(MockView)
+        self.assertTrue(iscoroutinefunction(view_class.dispatch))
+
+        self.request.method = "GET"
+        self.handler.has_perm.return_value = True
+        self.assertIs(await view_class.as_view()(self.request), response)
+        self.request.user.ahas_perm.assert_awaited_with("permission.add_article", obj=None)
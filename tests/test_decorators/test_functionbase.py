@@ -1,10 +1,15 @@
+from unittest.mock import AsyncMock
+
+from asgiref.sync import iscoroutinefunction
 from django.core.exceptions import PermissionDenied
+from django.http import Http404
 from django.test import TestCase
 
 from permission.decorators.functionbase import permission_required
 from permission.utils.handlers import registry
 
 from .utils import (
+    create_mock_async_view_func,
     create_mock_handler,
     create_mock_model,
     create_mock_queryset,
@@ -203,3 +208,81 @@ class PermissionFunctionDecoratorsTestCase(TestCase):
             obj=self.model_instance,
         )
         self.assertTrue(self.view_func.called)
+
+
+class PermissionAsyncFunctionDecoratorsTestCase(TestCase):
+    def setUp(self):
+        self.handler = create_mock_handler()
+        self.request = create_mock_request(self.handler)
+        self.model = create_mock_model()
+        self.model_instance = self.model()
+        self.queryset = create_mock_queryset(self.model_instance)
+        self.view_func = create_mock_async_view_func()
+        self.decorated = permission_required("permission.add_article")(self.view_func)
+        self.decorated_exc = permission_required("permission.add_article", raise_exception=True)(self.view_func)
+
+    def test_decorated_is_coroutine_function(self):
+        self.assertTrue(iscoroutinefunction(self.decorated))
+
+    async def test_list_detail_object_id(self):
+        self.handler.has_perm.return_value = False
+        await self.decorated(self.request, queryset=self.queryset, object_id=1)
+        self.queryset.aget.assert_awaited_with(pk=1)
+        self.queryset.get.assert_not_called()
+        self.request.user.ahas_perm.assert_awaited_with(
+            "permission.add_article",
+            obj=self.model_instance,
+        )
+        self.request.user.has_perm.assert_not_called()
+        self.view_func.assert_not_awaited()
+
+        with self.assertRaises(PermissionDenied):
+            await self.decorated_exc(self.request, queryset=self.queryset, object_id=1)
+        self.view_func.assert_not_awaited()
+
+        self.handler.has_perm.return_value = True
+        await self.decorated(self.request, queryset=self.queryset, object_id=1)
+        self.view_func.assert_awaited_once_with(self.request, queryset=self.queryset, object_id=1)
+
+    async def test_date_based_slug(self):
+        self.handler.has_perm.return_value = True
+        await self.decorated(
+            self.request,
+            queryset=self.queryset,
+            year="2000",
+            month="1",
+            day="1",
+            date_field="created_at",
+            month_format="%m",
+            slug="permission_test_article1",
+            slug_field="title",
+        )
+        self.request.user.ahas_perm.assert_awaited_with(
+            "permission.add_article",
+            obj=self.model_instance,
+        )
+        self.assertTrue(self.view_func.await_count)
+
+    async def test_without_object(self):
+        self.handler.has_perm.return_value = True
+        await self.decorated(self.request)
+        self.request.user.ahas_perm.assert_awaited_with("permission.add_article", obj=None)
+        self.view_func.assert_awaited_once_with(self.request)
+
+    async def test_object_does_not_exist(self):
+        from django.contrib.auth.models import User
+
+        queryset = User.objects.all()
+        with self.assertRaises(Http404):
+            await self.decorated(self.request, queryset=queryset, object_id=-1)
+        self.view_func.assert_not_awaited()
+
+    async def test_with_auser(self):
+        user = self.request.user
+        self.request.user = None
+        self.request.auser = AsyncMock(return_value=user)
+        self.handler.has_perm.return_value = True
+        await self.decorated(self.request)
+        self.request.auser.assert_awaited_once_with()
+        user.ahas_perm.assert_awaited_with("permission.add_article", obj=None)
+        self.view_func.assert_awaited_once_with(self.request)
@@ -1,3 +1,4 @@
+from asgiref.sync import iscoroutinefunction
 from django.core.exceptions import PermissionDenied
 from django.test import TestCase
 
@@ -6,6 +7,7 @@ from permission.utils.handlers import registry
 from tests.compat import MagicMock
 
 from .utils import (
+    create_mock_async_view_func,
     create_mock_handler,
     create_mock_model,
     create_mock_queryset,
@@ -190,3 +192,56 @@ class PermissionClassDecoratorsTestCase(TestCase):
             obj=self.model_instance,
         )
         self.assertTrue(self.view_func.called)
+
+
+class PermissionAsyncMethodDecoratorsTestCase(TestCase):
+    def setUp(self):
+        self.handler = create_mock_handler()
+        self.request = create_mock_request(self.handler)
+        self.model = create_mock_model()
+        self.model_instance = self.model()
+        self.queryset = create_mock_queryset(self.model_instance)
+
+        self.view_func = create_mock_async_view_func()
+        self.decorated = permission_required("permission.add_article")(self.view_func)
+        self.view_class = create_mock_view_class(self.decorated)
+        self.view_class_exc = create_mock_view_class(
+            permission_required(
+                "permission.add_article",
+                raise_exception=True,
+            )(self.view_func)
+        )
+
+    def test_decorated_is_coroutine_function(self):
+        self.assertTrue(iscoroutinefunction(self.decorated))
+
+    async def test_with_object(self):
+        self.view_class.object = self.model_instance
+        self.view_class_exc.object = self.model_instance
+
+        self.handler.has_perm.return_value = False
+        await self.view_class.as_view()(self.request, pk=1)
+        self.request.user.ahas_perm.assert_awaited_with(
+            "permission.add_article",
+            obj=self.model_instance,
+        )
+        self.request.user.has_perm.assert_not_called()
+        self.view_func.assert_not_awaited()
+
+        with self.assertRaises(PermissionDenied):
+            await self.view_class_exc.as_view()(self.request, pk=1)
+        self.view_func.assert_not_awaited()
+
+        self.handler.has_perm.return_value = True
+        await self.view_class.as_view()(self.request, pk=1)
+        self.assertEqual(self.view_func.await_count, 1)
+
+    async def test_function_view(self):
+        self.handler.has_perm.return_value = True
+        await self.decorated(self.request, queryset=self.queryset, object_id=1)
+        self.queryset.aget.assert_awaited_with(pk=1)
+        self.request.user.ahas_perm.assert_awaited_with(
+            "permission.add_article",
+            obj=self.model_instance,
+        )
+        self.assertEqual(self.view_func.await_count, 1)
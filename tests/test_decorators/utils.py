@@ -1,3 +1,5 @@
+from unittest.mock import AsyncMock
+
 from django.http import HttpRequest, HttpResponse
 
 from permission.handlers import PermissionHandler
@@ -36,6 +38,7 @@ def create_mock_request(mock_permission_handler):
             "has_perm.side_effect": mock_permission_handler.has_perm,
         }
     )
+    request.user.ahas_perm = AsyncMock(side_effect=mock_permission_handler.has_perm)
     return request
 
 
@@ -45,6 +48,12 @@ def create_mock_view_func():
     return function
 
 
+def create_mock_async_view_func():
+    response = MagicMock(spec=HttpResponse)
+    function = AsyncMock(return_value=response)
+    return function
+
+
 def create_mock_view_class(view_func):
     from django.views.generic import View
 
@@ -85,6 +94,7 @@ def create_mock_queryset(obj):
             "get.side_effect": get_side_effect,
         },
     )
+    queryset.aget.side_effect = get_side_effect
     queryset.model = MagicMock()
     queryset.model.DoesNotEixst = ObjectDoesNotExist
     queryset.model._meta = MagicMock(object_name="MockQuerysetModel")
@@ -1,9 +1,10 @@
 from django.test import TestCase, override_settings
 
 from permission.handlers import LogicalPermissionHandler, PermissionHandler
+from permission.utils.cache import get_cache_key, get_permission_cache
 from tests.compat import MagicMock
 from tests.models import Article
-from tests.utils import create_article, create_user
+from tests.utils import AuthorCollaboratorsTestCase, PermissionLogicsTestCase, create_article, create_user
 
 
 @override_settings(PERMISSION_DEFAULT_PERMISSION_HANDLER=PermissionHandler)
@@ -281,6 +282,49 @@ class PermissionPermissionHandlersTestCase(TestCase):
         self.assertTrue(instance.has_module_perms(user, "permission"))
         self.assertTrue(user.has_perm.called)
 
+    def test_has_module_perms_cache(self):
+        instance = self.handler(Article)
+        user = MagicMock(pk=1)
+        user.has_perm.return_value = True
+        self.assertTrue(instance.has_module_perms(user, "permission"))
+        call_count = user.has_perm.call_count
+        self.assertTrue(instance.has_module_perms(user, "permission"))
+        self.assertEqual(user.has_perm.call_count, call_count)
+        instance.clear_module_perms_cache(1)
+        self.assertTrue(instance.has_module_perms(user, "permission"))
+        self.assertEqual(user.has_perm.call_count, call_count * 2)
+
+    @override_settings(PERMISSION_MODULE_PERMS_CACHE_MAXSIZE=1)
+    def test_has_module_perms_cache_maxsize(self):
+        instance = self.handler(Article)
+        user1 = MagicMock(pk=1)
+        user2 = MagicMock(pk=2)
+        instance.has_module_perms(user1, "permission")
+        instance.has_module_perms(user2, "permission")
+        self.assertEqual(len(instance._module_perms_cache), 1)
+
+    def test_has_module_perms_cache_cleared_on_groups_changed(self):
+        from unittest.mock import patch
+
+        from permission.utils.handlers import registry
+        from tests.utils import create_group
+
+        instance = self.handler(Article)
+        self.user.has_perm = MagicMock(return_value=False)
+        patcher = patch.object(registry, "get_handlers", return_value=(instance,))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        instance.has_module_perms(self.user, "permission")
+        self.assertTrue(self.user.pk in instance._module_perms_cache)
+        create_group("editors", self.user)
+        self.assertFalse(self.user.pk in instance._module_perms_cache)
+
+        instance.has_module_perms(self.user, "permission")
+        self.assertTrue(self.user.pk in instance._module_perms_cache)
+        group = create_group("writers")
+        group.user_set.add(self.user)
+        self.assertFalse(self.user.pk in instance._module_perms_cache)
+
     def test_has_module_perms_fail(self):
         instance = self.handler(Article)
         user = MagicMock()
@@ -292,10 +336,9 @@ class PermissionPermissionHandlersTestCase(TestCase):
 @override_settings(
     PERMISSION_DEFAULT_PERMISSION_HANDLER=LogicalPermissionHandler,
 )
-class PermissionLogicalPermissionHandlerTestCase(TestCase):
+class PermissionLogicalPermissionHandlerTestCase(PermissionLogicsTestCase):
     def setUp(self):
-        # make sure all caches are removed
-        Article._permission_logics = set()
+        super().setUp()
         self.handler = LogicalPermissionHandler
         self.user = create_user("john")
         self.perm1 = "permission.add_article"
@@ -306,10 +349,12 @@ class PermissionLogicalPermissionHandlerTestCase(TestCase):
         from permission import add_permission_logic
         from permission.logics import PermissionLogic
 
-        self.mock_logic1 = MagicMock(spec=PermissionLogic)
+        self.mock_logic1 = MagicMock(spec=PermissionLogic, cost=PermissionLogic.cost)
         self.mock_logic1.has_perm = MagicMock(return_value=False)
-        self.mock_logic2 = MagicMock(spec=PermissionLogic)
+        self.mock_logic1.get_grantable_permissions = MagicMock(return_value=None)
+        self.mock_logic2 = MagicMock(spec=PermissionLogic, cost=PermissionLogic.cost)
         self.mock_logic2.has_perm = MagicMock(return_value=False)
+        self.mock_logic2.get_grantable_permissions = MagicMock(return_value=None)
         add_permission_logic(Article, self.mock_logic1)
         add_permission_logic(Article, self.mock_logic2)
 
@@ -349,3 +394,374 @@ class PermissionLogicalPermissionHandlerTestCase(TestCase):
         self.assertFalse(instance.has_perm(self.user, "permission.add_article"))
         self.assertEqual(self.mock_logic1.has_perm.call_count, 1)
         self.assertEqual(self.mock_logic2.has_perm.call_count, 1)
+
+    def test_has_perm_permission_logics_dispatch(self):
+        instance = self.handler(Article)
+        self.mock_logic2.get_grantable_permissions = MagicMock(return_value={"permission.change_article"})
+        self.assertFalse(instance.has_perm(self.user, "permission.add_article"))
+        self.assertEqual(self.mock_logic1.has_perm.call_count, 1)
+        # mock_logic2 cannot grant the permission thus it should not be called
+        self.assertEqual(self.mock_logic2.has_perm.call_count, 0)
+        self.assertFalse(instance.has_perm(self.user, "permission.change_article"))
+        self.assertEqual(self.mock_logic1.has_perm.call_count, 2)
+        self.assertEqual(self.mock_logic2.has_perm.call_count, 1)
+
+    def test_get_permission_logics(self):
+        from permission import add_permission_logic
+        from permission.logics import AuthorPermissionLogic
+
+        instance = self.handler(Article)
+        self.assertEqual(instance.get_permission_logics("permission.add_article"), (self.mock_logic1, self.mock_logic2))
+        logic = AuthorPermissionLogic(any_permission=False, change_permission=True, delete_permission=False)
+        add_permission_logic(Article, logic)
+        # the dispatch table is rebuilt when the permission logics are changed
+        self.assertEqual(instance.get_permission_logics("permission.add_article"), (self.mock_logic1, self.mock_logic2))
+        self.assertEqual(
+            instance.get_permission_logics("permission.change_article"),
+            (self.mock_logic1, self.mock_logic2, logic),
+        )
+
+    def test_get_permission_logics_bind(self):
+        from permission import add_permission_logic
+        from permission.logics import AuthorPermissionLogic
+
+        instance = self.handler(Article)
+        article = create_article("test2", user=self.user)
+        logic = AuthorPermissionLogic(any_permission=False, delete_permission=False)
+        add_permission_logic(Article, logic)
+        self.assertEqual(instance.get_permission_logics(self.perm3), (self.mock_logic1, self.mock_logic2))
+        self.assertFalse(instance.has_perm(create_user("tony"), self.perm3, article))
+        # the dispatch table is rebuilt when the permission logic is bound again
+        logic.delete_permission = True
+        logic.bind(Article)
+        self.assertEqual(instance.get_permission_logics(self.perm3), (self.mock_logic1, self.mock_logic2, logic))
+        self.assertTrue(instance.has_perm(self.user, self.perm3, article))
+
+    def test_has_perm_cache_clear(self):
+        from permission import clear_permission_cache
+
+        instance = self.handler(Article)
+        self.assertFalse(instance.has_perm(self.user, "permission.change_article", self.article))
+        self.assertEqual(self.mock_logic1.has_perm.call_count, 1)
+        clear_permission_cache(self.user)
+        self.assertFalse(instance.has_perm(self.user, "permission.change_article", self.article))
+        self.assertEqual(self.mock_logic1.has_perm.call_count, 2)
+
+    def test_has_perm_unsaved_object(self):
+        instance = self.handler(Article)
+        # unsaved instances are not cached
+        self.assertFalse(instance.has_perm(self.user, "permission.change_article", Article()))
+        self.assertFalse(instance.has_perm(self.user, "permission.change_article", Article()))
+        self.assertEqual(self.mock_logic1.has_perm.call_count, 2)
+
+    @override_settings(PERMISSION_CACHE_MAXSIZE=1)
+    def test_has_perm_cache_maxsize(self):
+        instance = self.handler(Article)
+        article2 = create_article("test2")
+        instance.has_perm(self.user, "permission.change_article", self.article)
+        instance.has_perm(self.user, "permission.change_article", article2)
+        instance.has_perm(self.user, "permission.change_article", self.article)
+        self.assertEqual(self.mock_logic1.has_perm.call_count, 3)
+
+
+@override_settings(
+    PERMISSION_DEFAULT_PERMISSION_HANDLER=LogicalPermissionHandler,
+)
+class PermissionLogicalPermissionHandlerFilterQuerysetTestCase(AuthorCollaboratorsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.handler = LogicalPermissionHandler
+        self.article1 = create_article("test1", user=self.user1)
+        self.article2 = create_article("test2", user=self.user2)
+        self.article3 = create_article("test3", user=self.user2)
+        self.article3.authors.add(self.user1, self.user2)
+
+    def test_filter_queryset(self):
+        instance = self.handler(Article)
+        queryset = instance.filter_queryset(self.user1, "permission.change_article", Article.objects.order_by("pk"))
+        self.assertEqual(list(queryset), [self.article1, self.article3])
+        queryset = instance.filter_queryset(self.user2, "permission.change_article", Article.objects.order_by("pk"))
+        self.assertEqual(list(queryset), [self.article2, self.article3])
+
+    def test_filter_queryset_single_query(self):
+        instance = self.handler(Article)
+        queryset = instance.filter_queryset(self.user1, "permission.change_article", Article.objects.all())
+        with self.assertNumQueries(1):
+            list(queryset)
+
+    def test_filter_queryset_non_related_permission(self):
+        instance = self.handler(Article)
+        queryset = instance.filter_queryset(self.user1, "unknown", Article.objects.all())
+        self.assertEqual(list(queryset), [])
+
+    def test_get_q(self):
+        instance = self.handler(Article)
+        q = instance.get_q(self.user1, "permission.change_article")
+        self.assertEqual(list(Article.objects.filter(q).distinct().order_by("pk")), [self.article1, self.article3])
+        q = instance.get_q(self.user1, "unknown")
+        self.assertEqual(list(Article.objects.filter(q)), [])
+
+    def test_get_q_fallback(self):
+        from permission import add_permission_logic
+        from permission.logics import PermissionLogic
+
+        mock_logic = MagicMock(spec=PermissionLogic, cost=PermissionLogic.cost)
+        mock_logic.get_grantable_permissions = MagicMock(return_value=None)
+        mock_logic.get_q = MagicMock(return_value=None)
+        add_permission_logic(Article, mock_logic)
+
+        instance = self.handler(Article)
+        self.assertEqual(instance.get_q(self.user1, "permission.change_article"), None)
+
+    def test_filter_queryset_fallback(self):
+        from permission import add_permission_logic
+        from permission.logics import PermissionLogic
+
+        mock_logic = MagicMock(spec=PermissionLogic, cost=PermissionLogic.cost)
+        mock_logic.get_grantable_permissions = MagicMock(return_value=None)
+        mock_logic.get_q = MagicMock(return_value=None)
+        mock_logic.has_perm = MagicMock(side_effect=lambda user_obj, perm, obj=None: obj == self.article2)
+        add_permission_logic(Article, mock_logic)
+
+        instance = self.handler(Article)
+        queryset = instance.filter_queryset(self.user1, "permission.change_article", Article.objects.order_by("pk"))
+        self.assertEqual(list(queryset), [self.article1, self.article2, self.article3])
+        # objects which are already selected by the Q objects are not evaluated
+        self.assertEqual(mock_logic.has_perm.call_count, 1)
+
+
+@override_settings(
+    PERMISSION_DEFAULT_PERMISSION_HANDLER=LogicalPermissionHandler,
+)
+class PermissionLogicalPermissionHandlerHasPermManyTestCase(AuthorCollaboratorsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.handler = LogicalPermissionHandler
+        self.article1 = create_article("test1", user=self.user1)
+        self.article2 = create_article("test2", user=self.user2)
+        self.article3 = create_article("test3", user=self.user2)
+        self.article3.authors.add(self.user1)
+
+    def test_has_perm_many(self):
+        instance = self.handler(Article)
+        instance.get_supported_permissions()
+        objs = [self.article1, self.article2, self.article3]
+        # one query for each permission logic
+        with self.assertNumQueries(2):
+            results = instance.has_perm_many(self.user1, "permission.change_article", objs)
+        self.assertEqual(
+            results,
+            {self.article1.pk: True, self.article2.pk: False, self.article3.pk: True},
+        )
+        # the results are cached for following has_perm calls
+        with self.assertNumQueries(0):
+            self.assertTrue(instance.has_perm(self.user1, "permission.change_article", self.article1))
+            self.assertFalse(instance.has_perm(self.user1, "permission.change_article", self.article2))
+            self.assertTrue(instance.has_perm(self.user1, "permission.change_article", self.article3))
+
+    def test_has_perm_many_non_related_permission(self):
+        instance = self.handler(Article)
+        results = instance.has_perm_many(self.user1, "unknown", [self.article1])
+        self.assertEqual(results, {self.article1.pk: False})
+
+    def test_has_perm_many_fallback(self):
+        from permission import add_permission_logic
+        from permission.logics import PermissionLogic
+
+        class CustomPermissionLogic(PermissionLogic):
+            def has_perm(self, user_obj, perm, obj=None):
+                return obj is not None and obj.title == "test2"
+
+        add_permission_logic(Article, CustomPermissionLogic())
+        instance = self.handler(Article)
+        results = instance.has_perm_many(
+            self.user1, "permission.change_article", [self.article1, self.article2, self.article3]
+        )
+        self.assertEqual(
+            results,
+            {self.article1.pk: True, self.article2.pk: True, self.article3.pk: True},
+        )
+
+
+@override_settings(
+    PERMISSION_DEFAULT_PERMISSION_HANDLER=LogicalPermissionHandler,
+)
+class PermissionLogicalPermissionHandlerRequiredRelationsTestCase(PermissionLogicsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.handler = LogicalPermissionHandler
+
+        from permission import add_permission_logic
+        from permission.logics import AuthorPermissionLogic, CollaboratorsPermissionLogic
+
+        add_permission_logic(Article, AuthorPermissionLogic(field_name="single_bridge__author"))
+        add_permission_logic(Article, AuthorPermissionLogic(field_name="author"))
+        add_permission_logic(Article, CollaboratorsPermissionLogic(field_name="authors"))
+        add_permission_logic(
+            Article,
+            CollaboratorsPermissionLogic(
+                field_name="multiple_bridge__editors",
+                change_permission=False,
+                delete_permission=True,
+            ),
+        )
+
+    def test_required_relations(self):
+        instance = self.handler(Article)
+        select_related, prefetch_related = instance.required_relations("permission.change_article")
+        self.assertEqual(select_related, {"single_bridge"})
+        self.assertEqual(prefetch_related, {"authors"})
+        select_related, prefetch_related = instance.required_relations("permission.delete_article")
+        self.assertEqual(select_related, {"single_bridge"})
+        self.assertEqual(prefetch_related, {"multiple_bridge__editors"})
+
+    def test_required_relations_non_related_permission(self):
+        instance = self.handler(Article)
+        self.assertEqual(instance.required_relations("unknown"), (set(), set()))
+
+
+@override_settings(
+    PERMISSION_DEFAULT_PERMISSION_HANDLER=LogicalPermissionHandler,
+)
+class PermissionLogicalPermissionHandlerUsersWithPermTestCase(AuthorCollaboratorsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.handler = LogicalPermissionHandler
+        self.user3 = create_user("peter")
+        self.article = create_article("test", user=self.user1)
+        self.article.authors.add(self.user1, self.user2)
+
+    def test_users_with_perm(self):
+        instance = self.handler(Article)
+        instance.get_supported_permissions()
+        users = instance.users_with_perm("permission.change_article", self.article)
+        with self.assertNumQueries(1):
+            self.assertEqual(list(users.order_by("pk")), [self.user1, self.user2])
+        users = instance.users_with_perm("permission.delete_article", self.article)
+        self.assertEqual(list(users), [self.user1])
+
+    def test_users_with_perm_non_related_permission(self):
+        instance = self.handler(Article)
+        self.assertEqual(list(instance.users_with_perm("unknown", self.article)), [])
+
+    def test_users_with_perm_fallback(self):
+        from permission import add_permission_logic
+        from permission.logics import PermissionLogic
+
+        class CustomPermissionLogic(PermissionLogic):
+            def has_perm(self, user_obj, perm, obj=None):
+                return user_obj.username == "peter"
+
+        add_permission_logic(Article, CustomPermissionLogic())
+        instance = self.handler(Article)
+        users = instance.users_with_perm("permission.change_article", self.article)
+        self.assertEqual(list(users.order_by("pk")), [self.user1, self.user2, self.user3])
+
+
+@override_settings(
+    PERMISSION_DEFAULT_PERMISSION_HANDLER=LogicalPermissionHandler,
+)
+class PermissionLogicalPermissionHandlerAsyncTestCase(AuthorCollaboratorsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.handler = LogicalPermissionHandler
+        self.article1 = create_article("test1", user=self.user1)
+        self.article2 = create_article("test2", user=self.user2)
+        self.article2.authors.add(self.user1)
+
+    async def test_ahas_perm(self):
+        instance = self.handler(Article)
+        self.assertTrue(await instance.ahas_perm(self.user1, "permission.change_article", self.article1))
+        self.assertTrue(await instance.ahas_perm(self.user1, "permission.change_article", self.article2))
+        self.assertFalse(await instance.ahas_perm(self.user2, "permission.change_article", self.article1))
+        self.assertFalse(await instance.ahas_perm(self.user1, "permission.delete_article", self.article2))
+        self.assertFalse(await instance.ahas_perm(self.user1, "unknown", self.article1))
+
+    async def test_ahas_perm_cache(self):
+        instance = self.handler(Article)
+        await instance.aget_supported_permissions()
+        self.assertTrue(await instance.ahas_perm(self.user1, "permission.change_article", self.article2))
+        # the result is cached in the same cache as has_perm
+        cache = get_permission_cache(self.user1)
+        self.assertTrue(cache.get(get_cache_key("permission.change_article", self.article2)))
+
+    async def test_ahas_perm_sync_logic(self):
+        from permission import add_permission_logic
+        from permission.logics import PermissionLogic
+
+        class CustomPermissionLogic(PermissionLogic):
+            def has_perm(self, user_obj, perm, obj=None):
+                return obj is not None and obj.title == "test2"
+
+        add_permission_logic(Article, CustomPermissionLogic())
+        instance = self.handler(Article)
+        self.assertTrue(await instance.ahas_perm(self.user2, "permission.delete_article", self.article2))
+        self.assertFalse(await instance.ahas_perm(self.user2, "permission.delete_article", self.article1))
+
+    async def test_ahas_module_perms(self):
+        instance = self.handler(Article)
+        self.assertTrue(await instance.ahas_module_perms(self.user1, "permission"))
+        self.assertFalse(await instance.ahas_module_perms(self.user1, "unknown"))
+
+
+@override_settings(PERMISSION_SHARED_CACHE="default")
+class PermissionLogicalPermissionHandlerSharedCacheTestCase(PermissionLogicsTestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user1 = create_user("john")
+        self.user2 = create_user("tony")
+        self.article1 = create_article("test1", user=self.user1)
+        self.perm = "permission.change_article"
+
+        from permission import add_permission_logic
+        from permission.logics import CollaboratorsPermissionLogic
+
+        self.logic = CollaboratorsPermissionLogic(field_name="authors")
+        add_permission_logic(Article, self.logic)
+        self.logic.has_perm = MagicMock(wraps=self.logic.has_perm)
+        self.handler = LogicalPermissionHandler(Article)
+        self.handler.get_supported_permissions()
+
+    def fresh_user(self, user):
+        # a user instance of another process without the per-user cache
+        return type(user).objects.get(pk=user.pk)
+
+    def test_has_perm_shared(self):
+        self.assertFalse(self.handler.has_perm(self.user1, self.perm, self.article1))
+        self.assertEqual(self.logic.has_perm.call_count, 1)
+        # the other process use the shared decision
+        self.assertFalse(self.handler.has_perm(self.fresh_user(self.user1), self.perm, self.article1))
+        self.assertEqual(self.logic.has_perm.call_count, 1)
+        # the decision is not shared with the other users
+        self.assertFalse(self.handler.has_perm(self.user2, self.perm, self.article1))
+        self.assertEqual(self.logic.has_perm.call_count, 2)
+
+    def test_has_perm_invalidated_by_signal(self):
+        self.assertFalse(self.handler.has_perm(self.user1, self.perm, self.article1))
+        self.article1.authors.add(self.user1)
+        self.assertTrue(self.handler.has_perm(self.fresh_user(self.user1), self.perm, self.article1))
+        self.assertEqual(self.logic.has_perm.call_count, 2)
+
+    def test_has_perm_not_shared(self):
+        from django.contrib.auth.models import AnonymousUser
+
+        self.assertFalse(self.handler.has_perm(AnonymousUser(), self.perm, self.article1))
+        self.assertFalse(self.handler.has_perm(AnonymousUser(), self.perm, self.article1))
+        self.assertEqual(self.logic.has_perm.call_count, 2)
+        with override_settings(PERMISSION_SHARED_CACHE=None):
+            self.handler.has_perm(self.user1, self.perm, self.article1)
+            self.handler.has_perm(self.fresh_user(self.user1), self.perm, self.article1)
+        self.assertEqual(self.logic.has_perm.call_count, 4)
+
+    async def test_ahas_perm_shared(self):
+        from asgiref.sync import sync_to_async
+
+        self.assertFalse(await sync_to_async(self.handler.has_perm)(self.user1, self.perm, self.article1))
+        user = await type(self.user1).objects.aget(pk=self.user1.pk)
+        self.logic.ahas_perm = MagicMock(wraps=self.logic.ahas_perm)
+        self.assertFalse(await self.handler.ahas_perm(user, self.perm, self.article1))
+        self.logic.ahas_perm.assert_not_called()
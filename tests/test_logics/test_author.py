@@ -1,8 +1,10 @@
+from asgiref.sync import sync_to_async
+from django.db.models import Q
 from django.test import TestCase, override_settings
 
 from permission import add_permission_logic
 from permission.logics import AuthorPermissionLogic
-from tests.utils import create_anonymous, create_article, create_user
+from tests.utils import create_anonymous, create_article, create_bridge, create_user
 
 
 @override_settings(
@@ -188,3 +190,131 @@ class PermissionLogicsAuthorPermissionLogicTestCase(TestCase):
         permission_logic = AuthorPermissionLogic(any_permission=False, delete_permission=False)
         add_permission_logic(self.article.__class__, permission_logic)
         self.assertFalse(permission_logic.has_perm(self.user2, self.perm3, self.article))
+
+    def test_get_q(self):
+        permission_logic = AuthorPermissionLogic()
+        add_permission_logic(self.article.__class__, permission_logic)
+        queryset = self.article.__class__.objects.all()
+        self.assertEqual(list(queryset.filter(permission_logic.get_q(self.user2, self.perm2))), [self.article])
+        self.assertEqual(list(queryset.filter(permission_logic.get_q(self.user1, self.perm2))), [])
+
+    def test_get_q_non_any_no_delete(self):
+        permission_logic = AuthorPermissionLogic(any_permission=False, delete_permission=False)
+        add_permission_logic(self.article.__class__, permission_logic)
+        queryset = self.article.__class__.objects.all()
+        self.assertEqual(list(queryset.filter(permission_logic.get_q(self.user2, self.perm2))), [self.article])
+        self.assertEqual(list(queryset.filter(permission_logic.get_q(self.user2, self.perm3))), [])
+
+    def test_get_q_with_anonymous(self):
+        permission_logic = AuthorPermissionLogic()
+        add_permission_logic(self.article.__class__, permission_logic)
+        queryset = self.article.__class__.objects.all()
+        self.assertEqual(list(queryset.filter(permission_logic.get_q(self.anonymous, self.perm2))), [])
+
+    def test_get_grantable_permissions(self):
+        permission_logic = AuthorPermissionLogic()
+        add_permission_logic(self.article.__class__, permission_logic)
+        self.assertIsNone(permission_logic.get_grantable_permissions())
+
+        permission_logic = AuthorPermissionLogic(any_permission=False, delete_permission=False)
+        add_permission_logic(self.article.__class__, permission_logic)
+        self.assertEqual(permission_logic.get_grantable_permissions(), {self.perm2})
+
+    def test_bind(self):
+        permission_logic = AuthorPermissionLogic(field_name="single_bridge__author", any_permission=False)
+        add_permission_logic(self.article.__class__, permission_logic)
+        self.assertEqual(permission_logic._accessor.field_path, ("single_bridge", "author"))
+        self.assertEqual(permission_logic._accessor.attname, "author_id")
+        self.assertEqual(permission_logic._grantable_permissions, frozenset([self.perm2, self.perm3]))
+
+    def test_has_perm_with_obj_without_query(self):
+        permission_logic = AuthorPermissionLogic()
+        add_permission_logic(self.article.__class__, permission_logic)
+        article = self.article.__class__.objects.get(pk=self.article.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(permission_logic.has_perm(self.user2, self.perm2, article))
+            self.assertFalse(permission_logic.has_perm(self.user1, self.perm2, article))
+
+    def test_has_perm_with_obj_multi_hop(self):
+        permission_logic = AuthorPermissionLogic(field_name="single_bridge__author")
+        add_permission_logic(self.article.__class__, permission_logic)
+        article = create_article("test2", bridge=create_bridge(user=self.user1))
+        article = self.article.__class__.objects.get(pk=article.pk)
+        # the bridge is not fetched, only the id of the author
+        with self.assertNumQueries(1):
+            self.assertTrue(permission_logic.has_perm(self.user1, self.perm2, article))
+        # cached relations are walked without query
+        article = self.article.__class__.objects.select_related("single_bridge").get(pk=article.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(permission_logic.has_perm(self.user1, self.perm2, article))
+            self.assertFalse(permission_logic.has_perm(self.user2, self.perm2, article))
+        # the relation is null
+        with self.assertNumQueries(0):
+            self.assertFalse(permission_logic.has_perm(self.user1, self.perm2, self.article))
+
+    def test_has_perm_with_obj_without_author_unsaved_user(self):
+        from django.contrib.auth.models import User
+
+        permission_logic = AuthorPermissionLogic()
+        add_permission_logic(self.article.__class__, permission_logic)
+        article = create_article("test2")
+        article.author = None
+        # an object without author is not granted to an unsaved user
+        self.assertFalse(permission_logic.has_perm(User(), self.perm2, article))
+        self.assertFalse(permission_logic.has_perm(User(), self.perm2, self.article))
+
+    async def test_ahas_perm_with_obj_without_author_unsaved_user(self):
+        from django.contrib.auth.models import User
+
+        permission_logic = AuthorPermissionLogic()
+        add_permission_logic(self.article.__class__, permission_logic)
+        article = self.article.__class__(title="test2")
+        self.assertFalse(await permission_logic.ahas_perm(User(), self.perm2, article))
+
+    def test_get_required_relations(self):
+        permission_logic = AuthorPermissionLogic()
+        add_permission_logic(self.article.__class__, permission_logic)
+        self.assertEqual(permission_logic.get_required_relations(), set())
+
+        permission_logic = AuthorPermissionLogic(field_name="single_bridge__author")
+        add_permission_logic(self.article.__class__, permission_logic)
+        self.assertEqual(permission_logic.get_required_relations(), {"single_bridge"})
+
+    def test_get_user_q(self):
+        permission_logic = AuthorPermissionLogic(any_permission=False, delete_permission=False)
+        add_permission_logic(self.article.__class__, permission_logic)
+        queryset = self.user1.__class__.objects.all()
+        article = self.article.__class__.objects.get(pk=self.article.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(list(queryset.filter(permission_logic.get_user_q(self.perm2, article))), [self.user2])
+        self.assertEqual(list(queryset.filter(permission_logic.get_user_q(self.perm3, article))), [])
+
+    def test_get_user_q_without_is_active(self):
+        from unittest.mock import patch
+
+        from tests.models import Bridge
+
+        permission_logic = AuthorPermissionLogic()
+        add_permission_logic(self.article.__class__, permission_logic)
+        # a custom user model without the is_active field
+        with patch("permission.utils.field_lookup.get_user_model", return_value=Bridge):
+            q = permission_logic.get_user_q(self.perm2, self.article)
+        self.assertEqual(q, Q(pk=self.user2.pk))
+
+    async def test_ahas_perm(self):
+        permission_logic = AuthorPermissionLogic(any_permission=False, delete_permission=False)
+        add_permission_logic(self.article.__class__, permission_logic)
+        article = await self.article.__class__.objects.aget(pk=self.article.pk)
+        self.assertTrue(await permission_logic.ahas_perm(self.user2, self.perm2, article))
+        self.assertFalse(await permission_logic.ahas_perm(self.user1, self.perm2, article))
+        self.assertFalse(await permission_logic.ahas_perm(self.user2, self.perm3, article))
+        self.assertFalse(await permission_logic.ahas_perm(self.anonymous, self.perm2, article))
+        self.assertTrue(await permission_logic.ahas_perm(self.user1, self.perm2))
+
+        permission_logic = AuthorPermissionLogic(field_name="single_bridge__author")
+        add_permission_logic(self.article.__class__, permission_logic)
+        bridge = await sync_to_async(create_bridge)(user=self.user1)
+        article = await sync_to_async(create_article)("test2", bridge=bridge)
+        article = await self.article.__class__.objects.aget(pk=article.pk)
+        self.assertTrue(await permission_logic.ahas_perm(self.user1, self.perm2, article))
+        self.assertFalse(await permission_logic.ahas_perm(self.user2, self.perm2, article))
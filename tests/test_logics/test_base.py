@@ -57,3 +57,32 @@ class PermissionLogicsPermissionLogicTestCase(TestCase):
             self.perm3,
             self.article,
         )
+
+    def test_get_q(self):
+        permission_logic = PermissionLogic()
+        self.assertIsNone(permission_logic.get_q(self.user, self.perm1))
+
+    def test_has_perm_many(self):
+        permission_logic = PermissionLogic()
+        self.assertRaises(
+            NotImplementedError,
+            permission_logic.has_perm_many,
+            self.user,
+            self.perm1,
+            [self.article],
+        )
+
+    def test_get_grantable_permissions(self):
+        permission_logic = PermissionLogic()
+        self.assertIsNone(permission_logic.get_grantable_permissions())
+
+    def test_bind(self):
+        from tests.models import Article
+
+        permission_logic = PermissionLogic()
+        permission_logic.get_grantable_permissions = lambda: {self.perm2}
+        permission_logic.bind(Article)
+        self.assertEqual(permission_logic.model, Article)
+        self.assertEqual(permission_logic._grantable_permissions, frozenset([self.perm2]))
+        self.assertFalse(permission_logic._is_grantable(self.perm1))
+        self.assertTrue(permission_logic._is_grantable(self.perm2))
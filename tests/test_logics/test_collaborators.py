@@ -1,8 +1,9 @@
+from asgiref.sync import sync_to_async
 from django.test import TestCase, override_settings
 
 from permission import add_permission_logic
 from permission.logics import CollaboratorsPermissionLogic
-from tests.utils import create_anonymous, create_article, create_user
+from tests.utils import create_anonymous, create_article, create_bridge, create_user
 
 
 @override_settings(
@@ -189,3 +190,130 @@ class PermissionLogicsCollaboratorsPermissionLogicTestCase(TestCase):
         permission_logic = CollaboratorsPermissionLogic(any_permission=False, delete_permission=False)
         add_permission_logic(self.article.__class__, permission_logic)
         self.assertFalse(permission_logic.has_perm(self.user2, self.perm3, self.article))
+
+    def test_get_q(self):
+        permission_logic = CollaboratorsPermissionLogic()
+        add_permission_logic(self.article.__class__, permission_logic)
+        queryset = self.article.__class__.objects.all()
+        self.assertEqual(list(queryset.filter(permission_logic.get_q(self.user2, self.perm2))), [self.article])
+        self.assertEqual(list(queryset.filter(permission_logic.get_q(self.user1, self.perm2))), [])
+
+    def test_get_q_non_any_no_delete(self):
+        permission_logic = CollaboratorsPermissionLogic(any_permission=False, delete_permission=False)
+        add_permission_logic(self.article.__class__, permission_logic)
+        queryset = self.article.__class__.objects.all()
+        self.assertEqual(list(queryset.filter(permission_logic.get_q(self.user2, self.perm2))), [self.article])
+        self.assertEqual(list(queryset.filter(permission_logic.get_q(self.user2, self.perm3))), [])
+
+    def test_get_q_with_anonymous(self):
+        permission_logic = CollaboratorsPermissionLogic()
+        add_permission_logic(self.article.__class__, permission_logic)
+        queryset = self.article.__class__.objects.all()
+        self.assertEqual(list(queryset.filter(permission_logic.get_q(self.anonymous, self.perm2))), [])
+
+    def test_has_perm_many(self):
+        permission_logic = CollaboratorsPermissionLogic()
+        add_permission_logic(self.article.__class__, permission_logic)
+        article2 = create_article("test2")
+        with self.assertNumQueries(1):
+            results = permission_logic.has_perm_many(self.user2, self.perm2, [self.article, article2])
+        self.assertEqual(results, {self.article.pk: True, article2.pk: False})
+
+    def test_has_perm_with_obj_single_query(self):
+        permission_logic = CollaboratorsPermissionLogic()
+        add_permission_logic(self.article.__class__, permission_logic)
+        with self.assertNumQueries(1):
+            self.assertTrue(permission_logic.has_perm(self.user2, self.perm2, self.article))
+        with self.assertNumQueries(1):
+            self.assertFalse(permission_logic.has_perm(self.user1, self.perm2, self.article))
+
+    def test_has_perm_with_prefetched_obj(self):
+        permission_logic = CollaboratorsPermissionLogic()
+        add_permission_logic(self.article.__class__, permission_logic)
+        article = self.article.__class__.objects.prefetch_related("authors").get(pk=self.article.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(permission_logic.has_perm(self.user2, self.perm2, article))
+            self.assertFalse(permission_logic.has_perm(self.user1, self.perm2, article))
+
+    def test_get_prefetched_objects(self):
+        from permission.logics.collaborators import _get_prefetched_objects
+        from tests.models import Article, Bridge
+
+        bridge = create_bridge()
+        self.article.single_bridge = bridge
+        self.article.save()
+        self.article.multiple_bridge.add(bridge)
+        # not prefetched
+        self.assertEqual(_get_prefetched_objects(self.article.authors), None)
+        self.assertEqual(_get_prefetched_objects(bridge.permission_test_single_bridge), None)
+
+        article = Article.objects.prefetch_related("authors").get(pk=self.article.pk)
+        bridge = Bridge.objects.prefetch_related(
+            "permission_test_single_bridge",
+            "permission_test_multiple_bridge",
+        ).get(pk=bridge.pk)
+        with self.assertNumQueries(0):
+            # forward many-to-many
+            self.assertEqual(list(_get_prefetched_objects(article.authors)), [self.user2])
+            # reverse foreign key
+            self.assertEqual(list(_get_prefetched_objects(bridge.permission_test_single_bridge)), [self.article])
+            # reverse many-to-many
+            self.assertEqual(list(_get_prefetched_objects(bridge.permission_test_multiple_bridge)), [self.article])
+
+    def test_has_perm_with_multiple_bridge(self):
+        permission_logic = CollaboratorsPermissionLogic(field_name="multiple_bridge__editors")
+        add_permission_logic(self.article.__class__, permission_logic)
+        bridge = create_bridge(editors=[self.user1])
+        self.article.multiple_bridge.add(bridge)
+        self.assertTrue(permission_logic.has_perm(self.user1, self.perm2, self.article))
+        self.assertFalse(permission_logic.has_perm(self.user2, self.perm2, self.article))
+
+    def test_has_perm_with_unsaved_collaborator(self):
+        from django.contrib.auth.models import User
+
+        permission_logic = CollaboratorsPermissionLogic(field_name="editor")
+        add_permission_logic(self.article.__class__, permission_logic)
+        article = self.article.__class__(title="test2", editor=User())
+        # an unsaved collaborator is not an unsaved user
+        self.assertFalse(permission_logic.has_perm(User(), self.perm2, article))
+
+    def test_get_required_relations(self):
+        permission_logic = CollaboratorsPermissionLogic()
+        add_permission_logic(self.article.__class__, permission_logic)
+        self.assertEqual(permission_logic.get_required_relations(), {"authors"})
+
+        permission_logic = CollaboratorsPermissionLogic(field_name="unknown")
+        add_permission_logic(self.article.__class__, permission_logic)
+        self.assertEqual(permission_logic.get_required_relations(), set())
+
+    def test_get_user_q(self):
+        permission_logic = CollaboratorsPermissionLogic()
+        add_permission_logic(self.article.__class__, permission_logic)
+        queryset = self.user1.__class__.objects.all()
+        with self.assertNumQueries(1):
+            self.assertEqual(list(queryset.filter(permission_logic.get_user_q(self.perm2, self.article))), [self.user2])
+
+        permission_logic = CollaboratorsPermissionLogic(field_name="multiple_bridge__editors")
+        add_permission_logic(self.article.__class__, permission_logic)
+        self.article.multiple_bridge.add(create_bridge(editors=[self.user1]))
+        q = permission_logic.get_user_q(self.perm2, self.article)
+        self.assertEqual(list(queryset.filter(q)), [self.user1])
+
+    async def test_ahas_perm(self):
+        permission_logic = CollaboratorsPermissionLogic()
+        add_permission_logic(self.article.__class__, permission_logic)
+        self.assertTrue(await permission_logic.ahas_perm(self.user2, self.perm2, self.article))
+        self.assertFalse(await permission_logic.ahas_perm(self.user1, self.perm2, self.article))
+        self.assertFalse(await permission_logic.ahas_perm(self.anonymous, self.perm2, self.article))
+
+        # prefetched objects are used
+        queryset = self.article.__class__.objects.prefetch_related("authors")
+        article = await queryset.aget(pk=self.article.pk)
+        self.assertTrue(await permission_logic.ahas_perm(self.user2, self.perm2, article))
+
+        permission_logic = CollaboratorsPermissionLogic(field_name="multiple_bridge__editors")
+        add_permission_logic(self.article.__class__, permission_logic)
+        bridge = await sync_to_async(create_bridge)(editors=[self.user1])
+        await self.article.multiple_bridge.aadd(bridge)
+        self.assertTrue(await permission_logic.ahas_perm(self.user1, self.perm2, self.article))
+        self.assertFalse(await permission_logic.ahas_perm(self.user2, self.perm2, self.article))
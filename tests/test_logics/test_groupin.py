@@ -244,3 +244,65 @@ class PermissionLogicsAuthorPermissionLogicTestCase(TestCase):
         self.assertTrue(permission_logic.has_perm(self.user1, self.perm3, self.article))
         self.assertFalse(permission_logic.has_perm(self.user2, self.perm3, self.article))
         self.assertFalse(permission_logic.has_perm(self.user3, self.perm3, self.article))
+
+    def test_get_q(self):
+        permission_logic = GroupInPermissionLogic("admin")
+        add_permission_logic(self.article.__class__, permission_logic)
+        queryset = self.article.__class__.objects.all()
+        self.assertEqual(list(queryset.filter(permission_logic.get_q(self.user1, self.perm2))), [self.article])
+        self.assertEqual(list(queryset.filter(permission_logic.get_q(self.user2, self.perm2))), [])
+        self.assertEqual(list(queryset.filter(permission_logic.get_q(self.anonymous, self.perm2))), [])
+
+    def test_get_q_without_any_permission(self):
+        permission_logic = GroupInPermissionLogic("admin", any_permission=False, delete_permission=False)
+        add_permission_logic(self.article.__class__, permission_logic)
+        queryset = self.article.__class__.objects.all()
+        self.assertEqual(list(queryset.filter(permission_logic.get_q(self.user1, self.perm2))), [self.article])
+        self.assertEqual(list(queryset.filter(permission_logic.get_q(self.user1, self.perm3))), [])
+
+    def test_has_perm_group_names_loaded_once(self):
+        permission_logic1 = GroupInPermissionLogic("admin")
+        permission_logic2 = GroupInPermissionLogic(["staff", "editor"])
+        add_permission_logic(self.article.__class__, permission_logic1)
+        add_permission_logic(self.article.__class__, permission_logic2)
+
+        with self.assertNumQueries(1):
+            for perm in (self.perm1, self.perm2, self.perm3):
+                self.assertTrue(permission_logic1.has_perm(self.user1, perm, self.article))
+                self.assertFalse(permission_logic2.has_perm(self.user1, perm, self.article))
+
+    def test_has_perm_group_names_cleared_on_groups_changed(self):
+        permission_logic = GroupInPermissionLogic("staff")
+        add_permission_logic(self.article.__class__, permission_logic)
+
+        self.assertFalse(permission_logic.has_perm(self.user1, self.perm2, self.article))
+        self.user1.groups.add(self.group2)
+        self.assertTrue(permission_logic.has_perm(self.user1, self.perm2, self.article))
+        self.user1.groups.remove(self.group2)
+        self.assertFalse(permission_logic.has_perm(self.user1, self.perm2, self.article))
+
+    def test_get_user_q(self):
+        permission_logic = GroupInPermissionLogic(["admin", "staff"], any_permission=False, delete_permission=False)
+        add_permission_logic(self.article.__class__, permission_logic)
+        queryset = self.user1.__class__.objects.order_by("pk")
+        q = permission_logic.get_user_q(self.perm2, self.article)
+        self.assertEqual(list(queryset.filter(q)), [self.user1, self.user2])
+        self.assertEqual(list(queryset.filter(permission_logic.get_user_q(self.perm3, self.article))), [])
+
+    def test_get_user_q_without_groups(self):
+        from unittest.mock import patch
+
+        from tests.models import Bridge
+
+        permission_logic = GroupInPermissionLogic("admin")
+        add_permission_logic(self.article.__class__, permission_logic)
+        # a custom user model without groups is evaluated by has_perm
+        with patch("permission.utils.field_lookup.get_user_model", return_value=Bridge):
+            self.assertEqual(permission_logic.get_user_q(self.perm2, self.article), None)
+
+    async def test_ahas_perm(self):
+        permission_logic = GroupInPermissionLogic("admin")
+        add_permission_logic(self.article.__class__, permission_logic)
+        self.assertTrue(await permission_logic.ahas_perm(self.user1, self.perm2, self.article))
+        self.assertFalse(await permission_logic.ahas_perm(self.user2, self.perm2, self.article))
+        self.assertFalse(await permission_logic.ahas_perm(self.anonymous, self.perm2, self.article))
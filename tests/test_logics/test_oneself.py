@@ -164,3 +164,31 @@ class PermissionLogicsOneselfPermissionLogicTestCase(TestCase):
         permission_logic = OneselfPermissionLogic(any_permission=False, delete_permission=False)
         add_permission_logic(self.user1.__class__, permission_logic)
         self.assertFalse(permission_logic.has_perm(self.user1, self.perm3, self.user1))
+
+    def test_get_q(self):
+        permission_logic = OneselfPermissionLogic()
+        add_permission_logic(self.user1.__class__, permission_logic)
+        queryset = self.user1.__class__.objects.all()
+        self.assertEqual(list(queryset.filter(permission_logic.get_q(self.user1, self.perm2))), [self.user1])
+        self.assertEqual(list(queryset.filter(permission_logic.get_q(self.anonymous, self.perm2))), [])
+
+    def test_get_q_without_any_permission(self):
+        permission_logic = OneselfPermissionLogic(any_permission=False, delete_permission=False)
+        add_permission_logic(self.user1.__class__, permission_logic)
+        queryset = self.user1.__class__.objects.all()
+        self.assertEqual(list(queryset.filter(permission_logic.get_q(self.user1, self.perm2))), [self.user1])
+        self.assertEqual(list(queryset.filter(permission_logic.get_q(self.user1, self.perm3))), [])
+
+    def test_get_user_q(self):
+        permission_logic = OneselfPermissionLogic(any_permission=False, delete_permission=False)
+        add_permission_logic(self.user1.__class__, permission_logic)
+        queryset = self.user1.__class__.objects.order_by("pk")
+        self.assertEqual(list(queryset.filter(permission_logic.get_user_q(self.perm2, self.user1))), [self.user1])
+        self.assertEqual(list(queryset.filter(permission_logic.get_user_q(self.perm2))), [self.user1, self.user2])
+        self.assertEqual(list(queryset.filter(permission_logic.get_user_q(self.perm3, self.user1))), [])
+
+    async def test_ahas_perm(self):
+        permission_logic = OneselfPermissionLogic()
+        add_permission_logic(self.user1.__class__, permission_logic)
+        self.assertTrue(await permission_logic.ahas_perm(self.user1, self.perm2, self.user1))
+        self.assertFalse(await permission_logic.ahas_perm(self.user1, self.perm2, self.user2))
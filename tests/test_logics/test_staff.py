@@ -156,3 +156,52 @@ class PermissionLogicsStaffPermissionLogicTestCase(TestCase):
         add_permission_logic(self.article.__class__, permission_logic)
         self.assertTrue(permission_logic.has_perm(self.user1, self.perm3, self.article))
         self.assertFalse(permission_logic.has_perm(self.user2, self.perm3, self.article))
+
+    def test_get_q(self):
+        permission_logic = StaffPermissionLogic()
+        add_permission_logic(self.article.__class__, permission_logic)
+        queryset = self.article.__class__.objects.all()
+        self.assertEqual(list(queryset.filter(permission_logic.get_q(self.user1, self.perm2))), [self.article])
+        self.assertEqual(list(queryset.filter(permission_logic.get_q(self.user2, self.perm2))), [])
+        self.assertEqual(list(queryset.filter(permission_logic.get_q(self.anonymous, self.perm2))), [])
+
+    def test_get_q_without_any_permission(self):
+        permission_logic = StaffPermissionLogic(any_permission=False, delete_permission=False)
+        add_permission_logic(self.article.__class__, permission_logic)
+        queryset = self.article.__class__.objects.all()
+        self.assertEqual(list(queryset.filter(permission_logic.get_q(self.user1, self.perm2))), [self.article])
+        self.assertEqual(list(queryset.filter(permission_logic.get_q(self.user1, self.perm3))), [])
+
+    def test_get_grantable_permissions(self):
+        permission_logic = StaffPermissionLogic()
+        add_permission_logic(self.article.__class__, permission_logic)
+        self.assertIsNone(permission_logic.get_grantable_permissions())
+
+        permission_logic = StaffPermissionLogic(any_permission=False, delete_permission=False)
+        add_permission_logic(self.article.__class__, permission_logic)
+        self.assertEqual(permission_logic.get_grantable_permissions(), {self.perm1, self.perm2})
+
+    def test_get_user_q(self):
+        permission_logic = StaffPermissionLogic(any_permission=False, delete_permission=False)
+        add_permission_logic(self.article.__class__, permission_logic)
+        queryset = self.user1.__class__.objects.all()
+        self.assertEqual(list(queryset.filter(permission_logic.get_user_q(self.perm2, self.article))), [self.user1])
+        self.assertEqual(list(queryset.filter(permission_logic.get_user_q(self.perm2))), [self.user1])
+        self.assertEqual(list(queryset.filter(permission_logic.get_user_q(self.perm3, self.article))), [])
+
+    def test_get_user_q_without_is_staff(self):
+        from unittest.mock import patch
+
+        from tests.models import Bridge
+
+        permission_logic = StaffPermissionLogic()
+        add_permission_logic(self.article.__class__, permission_logic)
+        # a custom user model without the is_staff field is evaluated by has_perm
+        with patch("permission.utils.field_lookup.get_user_model", return_value=Bridge):
+            self.assertEqual(permission_logic.get_user_q(self.perm2, self.article), None)
+
+    async def test_ahas_perm(self):
+        permission_logic = StaffPermissionLogic()
+        add_permission_logic(self.article.__class__, permission_logic)
+        self.assertTrue(await permission_logic.ahas_perm(self.user1, self.perm2, self.article))
+        self.assertFalse(await permission_logic.ahas_perm(self.user2, self.perm2, self.article))
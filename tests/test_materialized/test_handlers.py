@@ -0,0 +1,185 @@
+from permission import add_permission_logic
+from permission.logics import AuthorPermissionLogic, CollaboratorsPermissionLogic, GroupInPermissionLogic
+from permission.materialized.models import PermissionGrant
+from tests.models import Article
+from tests.utils import AuthorCollaboratorsTestCase, create_anonymous, create_article, create_group, create_user
+
+from .utils import use_materialized_handler
+
+
+class PermissionMaterializedPermissionHandlerTestCase(AuthorCollaboratorsTestCase):
+    def setUp(self):
+        self.handler = use_materialized_handler(self)
+        super().setUp()
+        add_permission_logic(Article, GroupInPermissionLogic("editors", any_permission=True))
+
+        self.user3 = create_user("peter")
+        self.article1 = create_article("test1", user=self.user1)
+        self.article2 = create_article("test2", user=self.user2)
+        self.article2.authors.add(self.user1)
+        create_group("editors", self.user3)
+        self.perm = "permission.change_article"
+
+    def test_rebuild_grants(self):
+        PermissionGrant.objects.all().delete()
+        self.handler.rebuild_grants([self.article1, self.article2])
+        grants = PermissionGrant.objects.filter(permission=self.perm)
+        self.assertEqual(
+            sorted(grants.values_list("user__username", "object_id")),
+            sorted(
+                [
+                    ("john", str(self.article1.pk)),
+                    ("john", str(self.article2.pk)),
+                    ("tony", str(self.article2.pk)),
+                    ("peter", str(self.article1.pk)),
+                    ("peter", str(self.article2.pk)),
+                ]
+            ),
+        )
+        # the grants are replaced
+        self.handler.rebuild_grants([self.article1])
+        self.assertEqual(grants.count(), 5)
+
+    def test_rebuild_grants_custom_user_model(self):
+        from unittest.mock import patch
+
+        from tests.models import Bridge
+
+        grants = PermissionGrant.objects.order_by("user_id", "object_id", "permission")
+        expected = list(grants.values_list("user_id", "object_id", "permission"))
+        PermissionGrant.objects.all().delete()
+        # the user model does not have is_active and groups fields
+        with patch("permission.utils.field_lookup.get_user_model", return_value=Bridge):
+            self.handler.rebuild_grants([self.article1, self.article2])
+        self.assertEqual(list(grants.values_list("user_id", "object_id", "permission")), expected)
+
+    def test_rebuild_grants_concurrent(self):
+        from unittest.mock import patch
+
+        # the grants inserted by a concurrent rebuild after the deletion do not collide
+        with patch.object(self.handler, "delete_grants"):
+            self.handler.rebuild_grants([self.article1, self.article2])
+        self.assertEqual(PermissionGrant.objects.filter(permission=self.perm).count(), 5)
+
+    def test_rebuild_grants_single_query(self):
+        Article._permission_logics = []
+        add_permission_logic(Article, AuthorPermissionLogic())
+        add_permission_logic(Article, CollaboratorsPermissionLogic(field_name="authors"))
+        self.handler.get_supported_permissions()
+        objs = [self.article1, self.article2, create_article("test3", user=self.user2)]
+        PermissionGrant.objects.all().delete()
+        # a single query for all objects for each group of permissions (change
+        # and delete are granted by different logics)
+        with self.assertNumQueries(2 + 4):
+            self.handler.rebuild_grants(objs)
+        self.assertEqual(PermissionGrant.objects.filter(permission=self.perm).count(), 4)
+
+    def test_rebuild_grants_union_batch_size(self):
+        from unittest.mock import patch
+
+        expected = sorted(PermissionGrant.objects.values_list("user_id", "object_id", "permission"))
+        PermissionGrant.objects.all().delete()
+        with patch("permission.materialized.handlers.UNION_BATCH_SIZE", 1):
+            self.handler.rebuild_grants([self.article1, self.article2])
+        self.assertEqual(sorted(PermissionGrant.objects.values_list("user_id", "object_id", "permission")), expected)
+
+    def test_rebuild_grants_without_grantable_permissions(self):
+        from permission.logics import PermissionLogic
+
+        class ViewPermissionLogic(PermissionLogic):
+            # it does not declare the grantable permissions
+            def has_perm(self, user_obj, perm, obj=None):
+                return obj is not None and perm == "permission.view_article" and obj.author == user_obj
+
+        Article._permission_logics = []
+        add_permission_logic(Article, ViewPermissionLogic())
+        PermissionGrant.objects.all().delete()
+        self.handler.rebuild_grants([self.article1, self.article2])
+        self.assertEqual(
+            sorted(PermissionGrant.objects.values_list("user__username", "object_id", "permission")),
+            [
+                ("john", str(self.article1.pk), "permission.view_article"),
+                ("tony", str(self.article2.pk), "permission.view_article"),
+            ],
+        )
+        self.assertTrue(self.handler.has_perm(self.user1, "permission.view_article", self.article1))
+        self.assertFalse(self.handler.has_perm(self.user1, "permission.change_article", self.article1))
+        self.assertEqual(list(self.handler.users_with_perm("permission.view_article", self.article1)), [self.user1])
+
+    def test_get_permission_groups(self):
+        self.assertEqual(
+            self.handler.get_permission_groups(),
+            [
+                ["permission.add_article"],
+                ["permission.change_article"],
+                ["permission.delete_article"],
+                ["permission.view_article"],
+            ],
+        )
+        Article._permission_logics = []
+        add_permission_logic(Article, AuthorPermissionLogic())
+        self.assertEqual(
+            self.handler.get_permission_groups(),
+            [["permission.change_article", "permission.delete_article"]],
+        )
+
+    def test_rebuild_user_grants(self):
+        PermissionGrant.objects.all().delete()
+        self.handler.rebuild_user_grants(self.user1)
+        grants = PermissionGrant.objects.filter(permission=self.perm)
+        self.assertEqual(
+            sorted(grants.values_list("user__username", "object_id")),
+            sorted([("john", str(self.article1.pk)), ("john", str(self.article2.pk))]),
+        )
+        # anonymous users do not have the grants
+        self.handler.rebuild_user_grants(create_anonymous())
+
+    def test_has_perm(self):
+        with self.assertNumQueries(1):
+            self.assertTrue(self.handler.has_perm(self.user1, self.perm, self.article2))
+        self.assertFalse(self.handler.has_perm(self.user2, self.perm, self.article1))
+        self.assertTrue(self.handler.has_perm(self.user3, "permission.add_article", self.article1))
+        self.assertFalse(self.handler.has_perm(self.user1, "permission.delete_article", self.article2))
+        self.assertFalse(self.handler.has_perm(self.user1, "unknown", self.article2))
+        # permissions without object and anonymous users are evaluated by permission logics
+        self.assertTrue(self.handler.has_perm(self.user1, self.perm))
+        self.assertFalse(self.handler.has_perm(create_anonymous(), self.perm, self.article1))
+
+    def test_has_perm_stored(self):
+        # the grants are used instead of permission logics
+        PermissionGrant.objects.filter(user=self.user1).delete()
+        self.assertFalse(self.handler.has_perm(self.user1, self.perm, self.article1))
+
+    async def test_ahas_perm(self):
+        self.assertTrue(await self.handler.ahas_perm(self.user1, self.perm, self.article2))
+        self.assertFalse(await self.handler.ahas_perm(self.user2, self.perm, self.article1))
+        self.assertFalse(await self.handler.ahas_perm(create_anonymous(), self.perm, self.article1))
+
+    def test_has_perm_many(self):
+        with self.assertNumQueries(1):
+            results = self.handler.has_perm_many(self.user2, self.perm, [self.article1, self.article2])
+        self.assertEqual(results, {self.article1.pk: False, self.article2.pk: True})
+        self.assertEqual(self.handler.has_perm_many(self.user2, "unknown", [self.article1]), {self.article1.pk: False})
+
+    def test_filter_queryset(self):
+        queryset = Article.objects.order_by("pk")
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                list(self.handler.filter_queryset(self.user1, self.perm, queryset)), [self.article1, self.article2]
+            )
+        self.assertEqual(list(self.handler.filter_queryset(self.user2, self.perm, queryset)), [self.article2])
+        self.assertEqual(list(self.handler.filter_queryset(self.user2, "unknown", queryset)), [])
+        self.assertEqual(list(self.handler.filter_queryset(create_anonymous(), self.perm, queryset)), [])
+
+    def test_users_with_perm(self):
+        with self.assertNumQueries(1):
+            users = list(self.handler.users_with_perm(self.perm, self.article2).order_by("pk"))
+        self.assertEqual(users, [self.user1, self.user2, self.user3])
+        self.assertEqual(list(self.handler.users_with_perm("unknown", self.article2)), [])
+        # permissions without object are evaluated by permission logics
+        self.assertEqual(self.handler.users_with_perm(self.perm).count(), 3)
+
+    def test_delete_grants(self):
+        self.handler.delete_grants([self.article1])
+        self.assertFalse(PermissionGrant.objects.filter(object_id=str(self.article1.pk)).exists())
+        self.assertTrue(PermissionGrant.objects.filter(object_id=str(self.article2.pk)).exists())
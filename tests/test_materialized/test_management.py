@@ -0,0 +1,133 @@
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import CommandError, call_command
+
+from permission import add_permission_logic
+from permission.logics import AuthorPermissionLogic, CollaboratorsPermissionLogic
+from permission.materialized.models import PermissionGrant
+from tests.models import Article
+from tests.utils import PermissionLogicsTestCase, create_article, create_user
+
+from .utils import use_materialized_handler
+
+
+class InlineExecutor:
+    def __init__(self, *args, **kwargs):
+        kwargs["initializer"]()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+class PermissionMaterializedRebuildPermissionsCommandTestCase(PermissionLogicsTestCase):
+    def setUp(self):
+        self.handler = use_materialized_handler(self)
+        super().setUp()
+
+        add_permission_logic(Article, AuthorPermissionLogic())
+        add_permission_logic(Article, CollaboratorsPermissionLogic(field_name="authors", delete_permission=True))
+
+        self.user1 = create_user("john")
+        self.user2 = create_user("tony")
+        self.article1 = create_article("test1", user=self.user1)
+        self.article2 = create_article("test2", user=self.user2)
+        self.article3 = create_article("test3", user=self.user2)
+        self.article2.authors.add(self.user1)
+
+    def get_grants(self):
+        return sorted(PermissionGrant.objects.values_list("user__username", "object_id", "permission"))
+
+    def call_command(self, *args, **kwargs):
+        stdout = StringIO()
+        call_command("rebuild_permissions", *args, stdout=stdout, **kwargs)
+        return stdout.getvalue()
+
+    def test_rebuild_permissions(self):
+        expected = self.get_grants()
+        PermissionGrant.objects.all().delete()
+        output = self.call_command()
+        self.assertEqual(self.get_grants(), expected)
+        self.assertIn("permission.Article: 3/3 objects", output)
+        self.assertIn("Rebuilt the grants of 3 objects of 1 models", output)
+
+    def test_rebuild_permissions_batches_permissions(self):
+        PermissionGrant.objects.all().delete()
+        # change and delete permission are granted by the same logics thus
+        # the users of all objects of the chunk are looked up in a single query
+        with self.assertNumQueries(3 + 1 + 4 + 1):
+            self.call_command(chunk_size=3)
+
+    def test_rebuild_permissions_chunk_size(self):
+        output = self.call_command("permission.Article", chunk_size=2)
+        self.assertIn("permission.Article: 2/3 objects", output)
+        self.assertIn("permission.Article: 3/3 objects", output)
+
+    def test_rebuild_permissions_delete_stale_grants(self):
+        content_type = self.handler.get_content_type()
+        PermissionGrant.objects.create(
+            user=self.user1,
+            content_type=content_type,
+            object_id="0",
+            permission="permission.change_article",
+        )
+        PermissionGrant.objects.create(
+            user=self.user1,
+            content_type=content_type,
+            object_id=str(self.article1.pk),
+            permission="permission.add_article",
+        )
+        output = self.call_command()
+        # the grants of the rebuilt objects are replaced
+        self.assertIn("permission.Article: deleted 1 stale grants", output)
+        self.assertFalse(PermissionGrant.objects.filter(object_id="0").exists())
+        self.assertFalse(PermissionGrant.objects.filter(permission="permission.add_article").exists())
+
+    def test_rebuild_permissions_processes(self):
+        expected = self.get_grants()
+        PermissionGrant.objects.all().delete()
+        with patch(
+            "permission.materialized.management.commands.rebuild_permissions.ProcessPoolExecutor",
+            InlineExecutor,
+        ):
+            output = self.call_command(processes=2, chunk_size=1)
+        self.assertEqual(self.get_grants(), expected)
+        self.assertIn("permission.Article: 3/3 objects", output)
+
+    def test_map_bounded(self):
+        from permission.materialized.management.commands.rebuild_permissions import _map_bounded
+
+        consumed = []
+
+        def tasks():
+            for i in range(10):
+                consumed.append(i)
+                yield -i
+
+        # the tasks are submitted to real worker processes only a few at a time
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(2, mp_context=context) as executor:
+            results = _map_bounded(executor, abs, tasks(), 4)
+            first = next(results)
+            self.assertEqual(len(consumed), 4)
+            self.assertEqual(sorted([first, *results]), list(range(10)))
+
+    def test_rebuild_permissions_invalid_arguments(self):
+        with self.assertRaises(CommandError):
+            self.call_command(chunk_size=0)
+        with self.assertRaises(CommandError):
+            self.call_command(processes=0)
+        with self.assertRaises(CommandError):
+            self.call_command("permission.Unknown")
+        with self.assertRaises(CommandError):
+            self.call_command("permission.Bridge")
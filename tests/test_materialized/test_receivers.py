@@ -0,0 +1,172 @@
+from asgiref.sync import sync_to_async
+
+from permission import add_permission_logic
+from permission.logics import AuthorPermissionLogic, CollaboratorsPermissionLogic, GroupInPermissionLogic
+from permission.materialized.models import PermissionGrant
+from tests.models import Article
+from tests.utils import AuthorCollaboratorsTestCase, create_article, create_group, create_user
+
+from .utils import use_materialized_handler
+
+
+class PermissionMaterializedReceiversTestCase(AuthorCollaboratorsTestCase):
+    def setUp(self):
+        self.handler = use_materialized_handler(self)
+        super().setUp()
+        add_permission_logic(Article, GroupInPermissionLogic("editors"))
+        self.article = create_article("test", user=self.user1)
+        self.perm = "permission.change_article"
+
+    def has_grant(self, user_obj, perm=None):
+        grants = PermissionGrant.objects.filter(user=user_obj, object_id=str(self.article.pk))
+        return grants.filter(permission=perm or self.perm).exists()
+
+    def test_save(self):
+        self.assertTrue(self.has_grant(self.user1))
+        self.article.author = self.user2
+        self.article.save()
+        self.assertFalse(self.has_grant(self.user1))
+        self.assertTrue(self.has_grant(self.user2))
+
+    def test_delete(self):
+        pk = self.article.pk
+        self.article.delete()
+        self.assertFalse(PermissionGrant.objects.filter(object_id=str(pk)).exists())
+
+    def test_m2m_changed(self):
+        self.article.authors.add(self.user2)
+        self.assertTrue(self.has_grant(self.user2))
+        self.article.authors.remove(self.user2)
+        self.assertFalse(self.has_grant(self.user2))
+        # reverse relation
+        self.user2.permission_test_articles_authors.add(self.article)
+        self.assertTrue(self.has_grant(self.user2))
+        self.user2.permission_test_articles_authors.clear()
+        self.assertFalse(self.has_grant(self.user2))
+
+    def test_groups_changed(self):
+        group = create_group("editors")
+        self.user2.groups.add(group)
+        self.assertTrue(self.has_grant(self.user2))
+        self.user2.groups.remove(group)
+        self.assertFalse(self.has_grant(self.user2))
+        # reverse relation
+        group.user_set.add(self.user2)
+        self.assertTrue(self.has_grant(self.user2))
+        group.user_set.clear()
+        self.assertFalse(self.has_grant(self.user2))
+
+    def test_group_changed(self):
+        group = create_group("writers", self.user2)
+        self.assertFalse(self.has_grant(self.user2))
+        group.name = "editors"
+        group.save()
+        self.assertTrue(self.has_grant(self.user2))
+        group.delete()
+        self.assertFalse(self.has_grant(self.user2))
+
+    def test_user_changed(self):
+        self.user1.is_active = False
+        self.user1.save()
+        self.assertFalse(self.has_grant(self.user1))
+        self.user1.is_active = True
+        self.user1.save()
+        self.assertTrue(self.has_grant(self.user1))
+
+    def test_m2m_changed_rebuild_changed_side(self):
+        from unittest.mock import patch
+
+        from permission.materialized.handlers import MaterializedPermissionHandler
+
+        group = create_group("writers")
+        for i in range(5):
+            group.user_set.add(create_user(f"member{i}"))
+        with patch.object(MaterializedPermissionHandler, "rebuild_user_grants") as rebuild_user_grants:
+            with patch.object(MaterializedPermissionHandler, "rebuild_grants") as rebuild_grants:
+                # only the user is rebuilt, not the members of the group
+                self.user2.groups.add(group)
+                rebuild_user_grants.assert_called_once_with(self.user2)
+                rebuild_grants.assert_not_called()
+                rebuild_user_grants.reset_mock()
+                # only the article is rebuilt, not the user
+                self.article.authors.add(self.user2)
+                rebuild_user_grants.assert_not_called()
+                rebuild_grants.assert_called_once_with([self.article])
+                rebuild_grants.reset_mock()
+                # only the added users are rebuilt
+                group.user_set.add(self.user1)
+                rebuild_user_grants.assert_called_once_with(self.user1)
+
+    def test_related_object_changed(self):
+        from tests.models import Bridge
+        from tests.utils import create_bridge
+
+        Article._permission_logics = []
+        add_permission_logic(Article, AuthorPermissionLogic(field_name="single_bridge__author"))
+        add_permission_logic(Article, CollaboratorsPermissionLogic(field_name="multiple_bridge__editors"))
+        self.assertEqual(
+            self.handler.get_related_lookups(),
+            {Bridge: {"single_bridge", "multiple_bridge"}},
+        )
+        bridge = create_bridge(user=self.user1)
+        self.article.single_bridge = bridge
+        self.article.save()
+        self.assertTrue(self.has_grant(self.user1))
+        # the author of the bridge is changed
+        bridge.author = self.user2
+        bridge.save()
+        self.assertFalse(self.has_grant(self.user1))
+        self.assertTrue(self.has_grant(self.user2))
+        # the editors of the bridge are changed
+        editors = create_bridge()
+        self.article.multiple_bridge.add(editors)
+        editors.editors.add(self.user1)
+        self.assertTrue(self.has_grant(self.user1))
+        self.user1.permission_test_bridge_editors.clear()
+        self.assertFalse(self.has_grant(self.user1))
+        self.user1.permission_test_bridge_editors.add(editors)
+        self.assertTrue(self.has_grant(self.user1))
+        # the bridge is deleted
+        editors.delete()
+        self.assertFalse(self.has_grant(self.user1))
+
+    def test_materialized_related_object_changed(self):
+        from permission.materialized.handlers import MaterializedPermissionHandler
+        from permission.utils.handlers import registry
+        from tests.models import Bridge
+        from tests.utils import create_bridge
+
+        if hasattr(Bridge, "_permission_handler"):
+            self.addCleanup(setattr, Bridge, "_permission_handler", Bridge._permission_handler)
+        else:
+            self.addCleanup(delattr, Bridge, "_permission_handler")
+        # the related model is materialized as well
+        registry.register(Bridge, MaterializedPermissionHandler)
+        Article._permission_logics = []
+        add_permission_logic(Article, AuthorPermissionLogic(field_name="single_bridge__author"))
+        add_permission_logic(Article, CollaboratorsPermissionLogic(field_name="multiple_bridge__editors"))
+        user3 = create_user("peter")
+        bridge = create_bridge(user=self.user1)
+        self.article.single_bridge = bridge
+        self.article.save()
+        self.assertTrue(self.has_grant(self.user1))
+        # the author of the bridge is changed
+        bridge.author = self.user2
+        bridge.save()
+        self.assertFalse(self.has_grant(self.user1))
+        self.assertTrue(self.has_grant(self.user2))
+        # the relation is changed from the side of the bridge
+        editors = create_bridge(editors=[user3])
+        editors.permission_test_multiple_bridge.add(self.article)
+        self.assertTrue(self.has_grant(user3))
+        editors.permission_test_multiple_bridge.clear()
+        self.assertFalse(self.has_grant(user3))
+        # the bridge is deleted
+        editors.permission_test_multiple_bridge.add(self.article)
+        self.assertTrue(self.has_grant(user3))
+        editors.delete()
+        self.assertFalse(self.has_grant(user3))
+
+    async def test_ahas_perm_after_change(self):
+        await sync_to_async(self.article.authors.add)(self.user2)
+        self.assertTrue(await self.handler.ahas_perm(self.user2, self.perm, self.article))
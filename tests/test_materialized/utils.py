@@ -0,0 +1,20 @@
+from permission.materialized.handlers import MaterializedPermissionHandler
+from permission.utils.handlers import registry
+from tests.models import Article
+
+
+def use_materialized_handler(testcase):
+    original_registry = registry._registry
+
+    def restore():
+        registry._registry = original_registry
+        registry.invalidate()
+        if Article in original_registry:
+            Article._permission_handler = original_registry[Article]
+        elif hasattr(Article, "_permission_handler"):
+            del Article._permission_handler
+
+    testcase.addCleanup(restore)
+    registry._registry = {}
+    registry.register(Article, MaterializedPermissionHandler)
+    return Article._permission_handler
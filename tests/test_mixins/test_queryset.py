@@ -0,0 +1,90 @@
+from django.db import models
+from django.test import override_settings
+
+from permission import add_permission_logic
+from permission.handlers import LogicalPermissionHandler, PermissionHandler
+from permission.logics import AuthorPermissionLogic, PermissionLogic
+from permission.mixins.queryset import (
+    PermissionManager,
+    PermissionQuerySet,
+    PermissionQuerySetMixin,
+    permission_manager_factory,
+)
+from tests.compat import MagicMock
+from tests.models import Article
+from tests.utils import PermissionLogicsTestCase, create_article, create_user
+
+
+@override_settings(
+    PERMISSION_DEFAULT_PERMISSION_HANDLER=LogicalPermissionHandler,
+)
+class PermissionQuerySetMixinTestCase(PermissionLogicsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user1 = create_user("john")
+        self.user2 = create_user("tony")
+        self.article1 = create_article("test1", user=self.user1)
+        self.article2 = create_article("test2", user=self.user2)
+        self.article3 = create_article("test3", user=self.user1)
+        self.perm = "permission.change_article"
+        self.handler = LogicalPermissionHandler(Article)
+        add_permission_logic(Article, AuthorPermissionLogic())
+        self.queryset = PermissionQuerySet(Article).order_by("pk")
+
+    def test_for_user(self):
+        self.handler.get_supported_permissions()
+        queryset = self.queryset.for_user(self.user1, self.perm)
+        # count() runs in a single query
+        with self.assertNumQueries(1):
+            self.assertEqual(queryset.count(), 2)
+        self.assertEqual(list(queryset), [self.article1, self.article3])
+        self.assertEqual(list(self.queryset.for_user(self.user2, self.perm)), [self.article2])
+
+    def test_for_user_superuser(self):
+        superuser = create_user("peter", is_superuser=True)
+        queryset = self.queryset.for_user(superuser, self.perm)
+        self.assertEqual(list(queryset), [self.article1, self.article2, self.article3])
+
+    @override_settings(PERMISSION_FILTER_CHUNK_SIZE=1)
+    def test_for_user_fallback(self):
+        class CustomPermissionLogic(PermissionLogic):
+            def has_perm(self, user_obj, perm, obj=None):
+                return obj is not None and obj.title == "test2"
+
+        add_permission_logic(Article, CustomPermissionLogic())
+        self.handler.get_supported_permissions()
+        # the logics without Q objects are not evaluated until the queryset is
+        with self.assertNumQueries(0):
+            queryset = self.queryset.for_user(self.user1, self.perm)
+        # the objects are evaluated once for count() and the following slice
+        with self.assertNumQueries(2):
+            self.assertEqual(queryset.count(), 3)
+        with self.assertNumQueries(1):
+            self.assertEqual(list(queryset[:2]), [self.article1, self.article2])
+        self.assertEqual(list(queryset), [self.article1, self.article2, self.article3])
+
+    def test_permitted_primary_keys_parameters(self):
+        from permission.utils.queryset import PermittedPrimaryKeys
+
+        # values which are not integers are passed as query parameters
+        expression = PermittedPrimaryKeys(Article.objects.none(), self.user1, self.perm, [])
+        expression._result["pks"] = ["test1", "test3"]
+        queryset = Article.objects.order_by("pk").values_list("title", flat=True)
+        self.assertEqual(list(queryset.filter(title__in=expression)), ["test1", "test3"])
+        expression._result["pks"] = []
+        self.assertEqual(list(queryset.filter(title__in=expression)), [])
+
+    def test_for_user_without_handler(self):
+        self.addCleanup(setattr, Article, "_permission_handler", self.handler)
+        Article._permission_handler = MagicMock(spec=PermissionHandler)
+        self.assertEqual(list(self.queryset.for_user(self.user1, self.perm)), [])
+
+    def test_permission_manager_factory(self):
+        manager_class = permission_manager_factory()
+        self.assertTrue(issubclass(manager_class, models.Manager))
+        self.assertTrue(issubclass(manager_class._queryset_class, PermissionQuerySetMixin))
+        self.assertTrue(hasattr(manager_class, "for_user"))
+
+        manager_class = permission_manager_factory(queryset_class=PermissionQuerySet)
+        self.assertTrue(manager_class._queryset_class is PermissionQuerySet)
+        self.assertTrue(hasattr(PermissionManager, "for_user"))
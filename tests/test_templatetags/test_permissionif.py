@@ -3,6 +3,7 @@ from django.test import TestCase, override_settings
 
 from permission.templatetags.permissionif import replace_builtin_if
 from permission.utils.handlers import registry
+from tests.compat import MagicMock
 from tests.utils import create_article, create_permission, create_user
 
 
@@ -155,6 +156,46 @@ class PermissionTemplateTagsTestCase(TestCase):
 
         self.assertEqual(out, "Success")
 
+    def test_permissionif_tag_compiled(self):
+        template = Template(
+            "{% load permissionif %}"
+            "{% permission user has 'permission.add_article' %}"
+            "{% elpermission user has 'permission.change_article' of art1 %}"
+            "{% elpermission user has perm %}"
+            "{% elpermission user has 'permission.delete_article'|lower %}"
+            "{% endpermission %}"
+        )
+        conditions = [x for x, _ in template.nodelist[-1].conditions_nodelists]
+        self.assertEqual(conditions[0].perm, "permission.add_article")
+        self.assertEqual(conditions[0].obj, None)
+        self.assertEqual(conditions[1].perm, "permission.change_article")
+        self.assertEqual(conditions[1].obj.text, "art1")
+        # variables and filters are resolved on render
+        self.assertEqual(conditions[2].perm, None)
+        self.assertEqual(conditions[3].perm, None)
+
+    def test_permissionif_tag_compiled_render(self):
+        from tests.models import Article
+
+        user = create_user("permission_templatetag_test_user1")
+        user.has_perm = MagicMock(return_value=True)
+        art1 = create_article("permission_templatetag_test_article1")
+        template = Template(
+            "{% load permissionif %}"
+            "{% permission user has 'permission.change_article' of art1 %}"
+            "Success"
+            "{% endpermission %}"
+        )
+        self.assertEqual(template.render(Context({"user": user, "art1": art1})), "Success")
+        user.has_perm.assert_called_once_with("permission.change_article", art1)
+        # unresolved object
+        user.has_perm.reset_mock()
+        template.render(Context({"user": user}))
+        user.has_perm.assert_called_once_with("permission.change_article", None)
+        # exceptions are not raised on render
+        user.has_perm.side_effect = Article.DoesNotExist
+        self.assertEqual(template.render(Context({"user": user, "art1": art1})), "")
+
     def test_permissionif_tag_and(self):
         user = create_user("permission_templatetag_test_user1")
         perm1 = create_permission("permission_templatetag_test_perm1")
@@ -598,3 +639,111 @@ class PermissionTemplateTagsWithBuiltinTestCase(TestCase):
         ).render(context)
 
         self.assertEqual(out, "Success")
+
+
+@override_settings(
+    AUTHENTICATION_BACKENDS=(
+        "django.contrib.auth.backends.ModelBackend",
+        "permission.backends.PermissionBackend",
+    ),
+    PERMISSION_REPLACE_BUILTIN_IF=False,
+)
+class PrefetchPermissionsTemplateTagTestCase(TestCase):
+    def setUp(self):
+        from permission import add_permission_logic
+        from permission.logics import AuthorPermissionLogic, CollaboratorsPermissionLogic
+        from tests.models import Article
+
+        # store original registry
+        self._original_registry = registry._registry
+        self._original_handler = getattr(Article, "_permission_handler", None)
+        registry._registry = {}
+        replace_builtin_if(False)
+        Article._permission_logics = []
+        registry.register(Article, "permission.handlers.LogicalPermissionHandler")
+        add_permission_logic(Article, AuthorPermissionLogic())
+        add_permission_logic(Article, CollaboratorsPermissionLogic(field_name="authors"))
+
+        self.user = create_user("permission_templatetag_test_user1")
+        other = create_user("permission_templatetag_test_user2")
+        create_article("permission_templatetag_test_article1", user=self.user)
+        create_article("permission_templatetag_test_article2", user=other)
+        art3 = create_article("permission_templatetag_test_article3", user=other)
+        art3.authors.add(self.user)
+
+    def tearDown(self):
+        from tests.models import Article
+
+        # restore original registry
+        registry._registry = self._original_registry
+        registry.invalidate()
+        Article._permission_handler = self._original_handler
+        Article._permission_logics = []
+
+    def test_prefetch_permissions_tag(self):
+        from tests.models import Article
+
+        context = Context(
+            {
+                "user": self.user,
+                "object_list": Article.objects.order_by("title"),
+            }
+        )
+        template = Template(
+            "{% load permissionif %}"
+            "{% prefetch_permissions user 'permission.change_article' 'permission.delete_article' for object_list %}"
+            "{% for object in object_list %}"
+            "{% permission user has 'permission.change_article' of object %}C{% else %}-{% endpermission %}"
+            "{% permission user has 'permission.delete_article' of object %}D{% else %}-{% endpermission %}"
+            "{% endfor %}"
+        )
+        Article._permission_handler.get_supported_permissions()
+        # one query for the objects and one query for each permission logic
+        # of each permission, nothing in the loop
+        with self.assertNumQueries(4):
+            out = template.render(context)
+        self.assertEqual(out, "CD--C-")
+
+    def test_prefetch_permissions_tag_empty(self):
+        from tests.models import Article
+
+        context = Context(
+            {
+                "user": self.user,
+                "object_list": Article.objects.none(),
+            }
+        )
+        out = Template(
+            "{% load permissionif %}{% prefetch_permissions user 'permission.change_article' for object_list %}"
+        ).render(context)
+        self.assertEqual(out, "")
+
+    @override_settings(PERMISSION_CHECK_PERMISSION_PRESENCE=True)
+    def test_prefetch_permissions_tag_unknown_permission(self):
+        from tests.models import Article
+
+        context = Context(
+            {
+                "user": self.user,
+                "object_list": Article.objects.order_by("title"),
+            }
+        )
+        out = Template(
+            "{% load permissionif %}"
+            "{% prefetch_permissions user 'permission.unknown' for object_list %}"
+            "{% for object in object_list %}"
+            "{% permission user has 'permission.unknown' of object %}Fail{% else %}-{% endpermission %}"
+            "{% endfor %}"
+        ).render(context)
+        self.assertEqual(out, "---")
+
+    def test_prefetch_permissions_tag_syntax_error(self):
+        from django.template import TemplateSyntaxError
+
+        for source in (
+            "{% prefetch_permissions user for object_list %}",
+            "{% prefetch_permissions user 'permission.change_article' object_list %}",
+            "{% prefetch_permissions user 'permission.change_article' for %}",
+        ):
+            with self.assertRaises(TemplateSyntaxError):
+                Template("{% load permissionif %}" + source)
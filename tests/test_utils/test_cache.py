@@ -0,0 +1,256 @@
+from unittest.mock import patch
+
+from django.core.cache import cache as default_cache
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from permission import add_permission_logic
+from permission.logics import CollaboratorsPermissionLogic
+from permission.utils.cache import (
+    LRUCache,
+    aget_shared_cache_key,
+    clear_permission_cache,
+    get_cache_key,
+    get_group_names,
+    get_permission_cache,
+    get_shared_cache,
+    get_shared_cache_key,
+    invalidate_shared_permission_cache,
+    prefetch_permissions,
+)
+from permission.utils.handlers import registry
+from tests.models import Article, Bridge
+from tests.utils import create_article, create_bridge, create_group, create_user
+
+
+class PermissionUtilsCacheTestCase(TestCase):
+    def setUp(self):
+        self.user = create_user("john")
+        self.article = create_article("test")
+        self.bridge = create_bridge()
+
+    def test_lru_cache(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", True)
+        cache.set("b", False)
+        self.assertEqual(cache.get("a"), True)
+        # "b" is the least recently used entry
+        cache.set("c", True)
+        self.assertTrue("a" in cache)
+        self.assertFalse("b" in cache)
+        self.assertTrue("c" in cache)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("b"), None)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_lru_cache_timeout(self):
+        cache = LRUCache(timeout=10)
+        with patch("permission.utils.cache.time.monotonic", return_value=100):
+            cache.set("a", True)
+        with patch("permission.utils.cache.time.monotonic", return_value=105):
+            self.assertEqual(cache.get("a"), True)
+        with patch("permission.utils.cache.time.monotonic", return_value=110):
+            self.assertEqual(cache.get("a"), None)
+            self.assertFalse("a" in cache)
+
+    def test_lru_cache_delete(self):
+        cache = LRUCache()
+        cache.set("a", True)
+        cache.delete("a")
+        self.assertFalse("a" in cache)
+        # it should not raise exception for missing key
+        cache.delete("a")
+
+    def test_lru_cache_threads(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        cache = LRUCache(maxsize=10)
+
+        def work(n):
+            for i in range(2000):
+                key = (n + i) % 20
+                cache.set(key, True)
+                cache.get(key)
+                cache.delete((key + 1) % 20)
+
+        with ThreadPoolExecutor(4) as executor:
+            # it should not raise KeyError on concurrent get/set/delete
+            list(executor.map(work, range(4)))
+        self.assertTrue(len(cache) <= 10)
+
+    def test_lru_cache_pickle(self):
+        import pickle
+
+        cache = LRUCache(maxsize=2)
+        cache.set("a", True)
+        restored = pickle.loads(pickle.dumps(cache))
+        self.assertEqual(restored.get("a"), True)
+        restored.set("b", False)
+        self.assertEqual(len(restored), 2)
+
+    def test_get_cache_key(self):
+        perm = "permission.change_article"
+        self.assertEqual(get_cache_key(perm), (None, None, perm))
+        self.assertEqual(get_cache_key(perm, self.article), ("permission.article", self.article.pk, perm))
+        # objects of different models with the same pk have different keys
+        self.assertEqual(self.article.pk, self.bridge.pk)
+        self.assertNotEqual(get_cache_key(perm, self.article), get_cache_key(perm, self.bridge))
+        # unsaved instances cannot be cached
+        self.assertEqual(get_cache_key(perm, Article()), None)
+        self.assertEqual(get_cache_key(perm, Bridge()), None)
+
+    @override_settings(PERMISSION_CACHE_MAXSIZE=3)
+    def test_get_permission_cache(self):
+        cache = get_permission_cache(self.user)
+        self.assertTrue(isinstance(cache, LRUCache))
+        self.assertEqual(cache.maxsize, 3)
+        self.assertTrue(get_permission_cache(self.user) is cache)
+
+    def test_get_group_names(self):
+        create_group("admin", self.user)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_group_names(self.user), frozenset(["admin"]))
+            self.assertEqual(get_group_names(self.user), frozenset(["admin"]))
+        clear_permission_cache(self.user)
+        with self.assertNumQueries(1):
+            get_group_names(self.user)
+
+    def test_clear_permission_cache(self):
+        cache = get_permission_cache(self.user)
+        cache.set(get_cache_key("permission.change_article"), True)
+        clear_permission_cache(self.user)
+        self.assertEqual(len(cache), 0)
+        # it should not raise exception without cache
+        clear_permission_cache(create_user("tony"))
+
+    @override_settings(
+        AUTHENTICATION_BACKENDS=(
+            "django.contrib.auth.backends.ModelBackend",
+            "permission.backends.PermissionBackend",
+        ),
+    )
+    def test_prefetch_permissions(self):
+        original_registry = registry._registry
+        original_handler = getattr(Article, "_permission_handler", None)
+
+        def restore():
+            registry._registry = original_registry
+            registry.invalidate()
+            Article._permission_handler = original_handler
+            Article._permission_logics = []
+
+        self.addCleanup(restore)
+        registry._registry = {}
+        Article._permission_logics = []
+        registry.register(Article, "permission.handlers.LogicalPermissionHandler")
+        add_permission_logic(Article, CollaboratorsPermissionLogic(field_name="authors"))
+        article = create_article("collaborated")
+        article.authors.add(self.user)
+        perm = "permission.change_article"
+        results = prefetch_permissions(self.user, [perm], [self.article, article, Article()])
+        self.assertEqual(results, {perm: {self.article.pk: False, article.pk: True}})
+        cache = get_permission_cache(self.user)
+        self.assertEqual(cache.get(get_cache_key(perm, self.article)), False)
+        self.assertEqual(cache.get(get_cache_key(perm, article)), True)
+        with self.assertNumQueries(0):
+            self.assertFalse(self.user.has_perm(perm, self.article))
+            self.assertTrue(self.user.has_perm(perm, article))
+
+
+@override_settings(PERMISSION_SHARED_CACHE="default")
+class PermissionUtilsSharedCacheTestCase(TestCase):
+    def setUp(self):
+        default_cache.clear()
+        self.addCleanup(default_cache.clear)
+        Article._permission_logics = []
+        add_permission_logic(Article, CollaboratorsPermissionLogic(field_name="editors"))
+        self.user = create_user("john")
+        self.article = create_article("test")
+        self.bridge = create_bridge()
+        self.perm = "permission.change_article"
+
+    def get_key(self, obj=None):
+        return get_shared_cache_key(default_cache, self.user, self.perm, obj)
+
+    def test_get_shared_cache(self):
+        self.assertTrue(get_shared_cache() is caches["default"])
+        with override_settings(PERMISSION_SHARED_CACHE=None):
+            self.assertEqual(get_shared_cache(), None)
+
+    def test_get_shared_cache_key(self):
+        key = self.get_key(self.article)
+        self.assertTrue(key.startswith(f"permission:{self.perm}:auth.user:{self.user.pk}:"))
+        # the key is stable until the versions are changed
+        self.assertEqual(self.get_key(self.article), key)
+        self.assertNotEqual(self.get_key(), key)
+        # objects of different models with the same pk have different keys
+        self.assertEqual(self.article.pk, self.bridge.pk)
+        self.assertNotEqual(self.get_key(self.bridge), key)
+
+    def test_get_shared_cache_key_unsupported(self):
+        from django.contrib.auth.models import AnonymousUser
+
+        self.assertEqual(get_shared_cache_key(default_cache, AnonymousUser(), self.perm), None)
+        self.assertEqual(self.get_key(Article()), None)
+
+    async def test_aget_shared_cache_key(self):
+        key = await aget_shared_cache_key(default_cache, self.user, self.perm, self.article)
+        self.assertEqual(self.get_key(self.article), key)
+
+    def test_invalidate_shared_permission_cache(self):
+        key = self.get_key(self.article)
+        other_user_key = get_shared_cache_key(default_cache, create_user("tony"), self.perm, self.article)
+
+        invalidate_shared_permission_cache(self.user)
+        self.assertNotEqual(self.get_key(self.article), key)
+        key = self.get_key(self.article)
+
+        invalidate_shared_permission_cache(self.article)
+        self.assertNotEqual(self.get_key(self.article), key)
+        key = self.get_key(self.article)
+
+        invalidate_shared_permission_cache()
+        self.assertNotEqual(self.get_key(self.article), key)
+        self.assertNotEqual(
+            get_shared_cache_key(default_cache, create_user("tony2"), self.perm, self.article),
+            other_user_key,
+        )
+
+    def test_evicted_version(self):
+        key = self.get_key(self.article)
+        default_cache.delete(f"permission:version:permission.article:{self.article.pk}")
+        self.assertNotEqual(self.get_key(self.article), key)
+
+    def test_invalidate_on_save(self):
+        key = self.get_key(self.article)
+        self.article.save()
+        self.assertNotEqual(self.get_key(self.article), key)
+        key = self.get_key(self.article)
+        self.user.save()
+        self.assertNotEqual(self.get_key(self.article), key)
+
+    def test_invalidate_on_save_unrelated(self):
+        # bridge does not have permission logics
+        key = self.get_key(self.bridge)
+        self.bridge.save()
+        self.assertEqual(self.get_key(self.bridge), key)
+
+    def test_invalidate_on_m2m_changed(self):
+        key = self.get_key(self.article)
+        self.article.editors.add(create_user("tony"))
+        self.assertNotEqual(self.get_key(self.article), key)
+
+        key = self.get_key(self.article)
+        group = create_group("admin")
+        self.assertNotEqual(self.get_key(self.article), key)
+
+        key = self.get_key(self.article)
+        group.user_set.add(self.user)
+        self.assertNotEqual(self.get_key(self.article), key)
+
+    @override_settings(PERMISSION_SHARED_CACHE=None)
+    def test_invalidate_disabled(self):
+        invalidate_shared_permission_cache()
+        self.article.save()
+        self.assertEqual(default_cache.get("permission:version"), None)
@@ -1,6 +1,7 @@
 from django.test import TestCase
 
-from permission.utils.field_lookup import field_lookup
+from permission.utils.field_lookup import FieldPathAccessor, field_lookup, get_field_path_accessor, has_user_field
+from tests.models import Article
 from tests.utils import create_article, create_bridge, create_user
 
 
@@ -85,3 +86,109 @@ class PermissionUtilsFieldLookupTestCase(TestCase):
         expected_value2 = [x.username for x in self.bridge3.editors.iterator()]
         expected_value = [expected_value1, expected_value2]
         self.assertEqual(field_value, expected_value)
+
+
+class PermissionUtilsFieldPathAccessorTestCase(TestCase):
+    def setUp(self):
+        self.author = create_user("permission_test_articles_author")
+        self.editor1 = create_user("permission_test_articles_editor1")
+        self.editor2 = create_user("permission_test_articles_editor2")
+        self.bridge1 = create_bridge(editors=[self.editor1])
+        self.bridge2 = create_bridge(editors=[self.editor1, self.editor2])
+        self.model = create_article("permission_test_article", self.author, self.bridge1)
+        self.model.editors.add(self.editor1)
+        self.model.multiple_bridge.add(self.bridge1)
+        self.model.multiple_bridge.add(self.bridge2)
+
+    def test_get_field_path_accessor(self):
+        accessor = get_field_path_accessor(Article, "single_bridge__author")
+        self.assertTrue(isinstance(accessor, FieldPathAccessor))
+        self.assertTrue(get_field_path_accessor(Article, ("single_bridge", "author")) is accessor)
+        self.assertEqual(accessor.field_path, ("single_bridge", "author"))
+        self.assertEqual(accessor.lookup, "single_bridge__author")
+
+    def test_metadata(self):
+        accessor = get_field_path_accessor(Article, "author")
+        self.assertEqual(accessor.attname, "author_id")
+        self.assertEqual(accessor.fan_out, None)
+        self.assertFalse(accessor.multi_valued)
+
+        accessor = get_field_path_accessor(Article, "editors")
+        self.assertEqual(accessor.attname, None)
+        self.assertEqual(accessor.fan_out, None)
+        self.assertTrue(accessor.multi_valued)
+
+        accessor = get_field_path_accessor(Article, "multiple_bridge__editors__username")
+        self.assertEqual(accessor.attname, None)
+        self.assertEqual(accessor.fan_out, 0)
+        self.assertTrue(accessor.multi_valued)
+
+        accessor = get_field_path_accessor(Article, "unknown__field")
+        self.assertEqual(accessor.fields, None)
+
+    def test_call(self):
+        accessor = get_field_path_accessor(Article, "single_bridge__author__username")
+        self.assertEqual(accessor(self.model), self.bridge1.author.username)
+
+        accessor = get_field_path_accessor(Article, "editors")
+        self.assertEqual(list(accessor(self.model).all()), [self.editor1])
+
+        accessor = get_field_path_accessor(Article, "multiple_bridge__author")
+        self.assertEqual(accessor(self.model), [self.bridge1.author, self.bridge2.author])
+
+        accessor = get_field_path_accessor(Article, "multiple_bridge__editors__username")
+        self.assertEqual(
+            accessor(self.model),
+            [self.editor1.username, self.editor1.username, self.editor2.username],
+        )
+
+        accessor = get_field_path_accessor(Article, "unknown")
+        self.assertEqual(accessor(self.model), None)
+
+    def test_get_related_pk(self):
+        accessor = get_field_path_accessor(Article, "author")
+        model = Article.objects.get(pk=self.model.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(accessor.get_related_pk(model), self.author.pk)
+
+        accessor = get_field_path_accessor(Article, "single_bridge__author")
+        with self.assertNumQueries(1):
+            self.assertEqual(accessor.get_related_pk(model), self.bridge1.author.pk)
+        model = Article.objects.select_related("single_bridge").get(pk=self.model.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(accessor.get_related_pk(model), self.bridge1.author.pk)
+
+    def test_get_related_pk_unsaved_foreign_key(self):
+        accessor = get_field_path_accessor(Article, "single_bridge__author")
+        model = Article.objects.get(pk=self.model.pk)
+        # the foreign key held in memory is followed instead of the stored row
+        model.single_bridge_id = self.bridge2.pk
+        with self.assertNumQueries(1):
+            self.assertEqual(accessor.get_related_pk(model), self.bridge2.author.pk)
+        model.single_bridge_id = None
+        with self.assertNumQueries(0):
+            self.assertEqual(accessor.get_related_pk(model), None)
+        # unsaved objects
+        model = Article(title="unsaved", single_bridge_id=self.bridge1.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(accessor.get_related_pk(model), self.bridge1.author.pk)
+
+    async def test_aget_related_pk_unsaved_foreign_key(self):
+        accessor = get_field_path_accessor(Article, "single_bridge__author")
+        model = await Article.objects.aget(pk=self.model.pk)
+        model.single_bridge_id = self.bridge2.pk
+        self.assertEqual(await accessor.aget_related_pk(model), self.bridge2.author_id)
+        model.single_bridge_id = None
+        self.assertEqual(await accessor.aget_related_pk(model), None)
+
+    def test_has_user_field(self):
+        from unittest.mock import patch
+
+        from tests.models import Bridge
+
+        self.assertTrue(has_user_field("is_active"))
+        self.assertTrue(has_user_field("groups"))
+        self.assertFalse(has_user_field("unknown"))
+        # a custom user model without the fields of django user model
+        with patch("permission.utils.field_lookup.get_user_model", return_value=Bridge):
+            self.assertFalse(has_user_field("is_active"))
@@ -61,3 +61,80 @@ class PermissionUtilsHandlersTestCase(TestCase):
         self.assertTrue(isinstance(results, tuple))
         self.assertTrue(len(results) == 1)
         self.assertTrue(isinstance(results[0], PermissionHandler))
+
+    def test_get_handlers_for_perm(self):
+        class ArticlePermissionHandler(PermissionHandler):
+            includes = ["permission.add_article", "permission.change_article"]
+
+        self.model._meta.app_label = "permission"
+        self.assertEqual(self.registry.get_handlers_for_perm("permission.add_article"), ())
+
+        self.registry.register(self.model, ArticlePermissionHandler)
+        handlers = self.registry.get_handlers_for_perm("permission.add_article")
+        self.assertTrue(isinstance(handlers, tuple))
+        self.assertEqual(handlers, (self.registry._registry[self.model],))
+        self.assertEqual(self.registry.get_handlers_for_perm("permission.delete_article"), ())
+        self.assertEqual(self.registry.get_handlers_for_app_label("permission"), handlers)
+        self.assertEqual(self.registry.get_handlers_for_app_label("unknown"), ())
+
+        self.registry.unregister(self.model)
+        self.assertEqual(self.registry.get_handlers_for_perm("permission.add_article"), ())
+        self.assertEqual(self.registry.get_handlers_for_app_label("permission"), ())
+
+    def test_generation(self):
+        generation = self.registry.generation
+        self.registry.register(self.model, self.handler)
+        self.assertEqual(self.registry.generation, generation + 1)
+        self.registry.unregister(self.model)
+        self.assertEqual(self.registry.generation, generation + 2)
+        self.registry.invalidate()
+        self.assertEqual(self.registry.generation, generation + 3)
+
+    def test_get_handlers_for_perm_changed_while_building(self):
+        registry = self.registry
+
+        class ArticlePermissionHandler(PermissionHandler):
+            includes = ["permission.add_article"]
+
+            def get_supported_permissions(self):
+                # the registry is changed by another thread while building
+                registry.invalidate()
+                return super().get_supported_permissions()
+
+        self.model._meta.app_label = "permission"
+        self.registry.register(self.model, ArticlePermissionHandler)
+        handlers = self.registry.get_handlers_for_perm("permission.add_article")
+        self.assertEqual(handlers, (self.registry._registry[self.model],))
+        # the stale index is not stored
+        self.assertEqual(self.registry._index, None)
+
+    def test_warmup(self):
+        from tests.models import Article, Bridge
+
+        class ArticlePermissionHandler(PermissionHandler):
+            pass
+
+        for model in (Article, Bridge):
+            if hasattr(model, "_permission_handler"):
+                self.addCleanup(setattr, model, "_permission_handler", model._permission_handler)
+            else:
+                self.addCleanup(delattr, model, "_permission_handler")
+        self.registry.register(Article, ArticlePermissionHandler)
+        self.registry.register(Bridge, ArticlePermissionHandler)
+        with self.assertNumQueries(1):
+            self.registry.warmup()
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.registry.get_handlers_for_perm("permission.change_article"),
+                (self.registry._registry[Article],),
+            )
+            self.assertEqual(
+                self.registry._registry[Bridge].get_supported_permissions(),
+                {
+                    "permission.add_bridge",
+                    "permission.change_bridge",
+                    "permission.delete_bridge",
+                    "permission.view_bridge",
+                },
+            )
+            self.assertTrue("permission.add_bridge" in self.registry._registry[Article]._get_app_perms())
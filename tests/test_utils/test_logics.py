@@ -10,8 +10,8 @@ from tests.models import Article
 
 class PermissionUtilsLogicsTestCase(TestCase):
     def setUp(self):
-        self.mock_logic = MagicMock(spec=PermissionLogic)
-        self.mock_logic2 = MagicMock(spec=PermissionLogic)
+        self.mock_logic = MagicMock(spec=PermissionLogic, cost=PermissionLogic.cost)
+        self.mock_logic2 = MagicMock(spec=PermissionLogic, cost=PermissionLogic.cost)
         # clear registry
         self.registry_backup = registry._registry
         registry._registry = {}
@@ -23,6 +23,7 @@ class PermissionUtilsLogicsTestCase(TestCase):
 
     def tearDown(self):
         registry._registry = self.registry_backup
+        registry.invalidate()
 
     def test_add_permission_logic_private_attributes(self):
         m = self.mock_logic
@@ -41,7 +42,7 @@ class PermissionUtilsLogicsTestCase(TestCase):
         self.assertEqual(registry._registry, {})
         # but after add permission logic, they will be appeared
         add_permission_logic(Article, m)
-        self.assertEqual(Article._permission_logics, set([m]))
+        self.assertEqual(Article._permission_logics, [m])
         self.assertTrue(isinstance(registry._registry[Article], LogicalPermissionHandler))
 
     def test_remove_permission_logic_private_attributes(self):
@@ -58,13 +59,13 @@ class PermissionUtilsLogicsTestCase(TestCase):
     def test_remove_permission_logic_registry(self):
         m = self.mock_logic
         add_permission_logic(Article, m)
-        self.assertEqual(Article._permission_logics, set([m]))
+        self.assertEqual(Article._permission_logics, [m])
         self.assertTrue(isinstance(registry._registry[Article], LogicalPermissionHandler))
 
         # permission_logics should be changed but registry
         # should not be changed
         remove_permission_logic(Article, m)
-        self.assertEqual(Article._permission_logics, set())
+        self.assertEqual(Article._permission_logics, [])
         self.assertTrue(isinstance(registry._registry[Article], LogicalPermissionHandler))
 
     def test_remove_permission_logic_registry_with_class(self):
@@ -72,13 +73,13 @@ class PermissionUtilsLogicsTestCase(TestCase):
         m2 = self.mock_logic2
         add_permission_logic(Article, m)
         add_permission_logic(Article, m2)
-        self.assertEqual(Article._permission_logics, set([m, m2]))
+        self.assertEqual(Article._permission_logics, [m, m2])
         self.assertTrue(isinstance(registry._registry[Article], LogicalPermissionHandler))
 
         # permission_logics should be changed but registry
         # should not be changed
         remove_permission_logic(Article, PermissionLogic)
-        self.assertEqual(Article._permission_logics, set())
+        self.assertEqual(Article._permission_logics, [])
         self.assertTrue(isinstance(registry._registry[Article], LogicalPermissionHandler))
 
     def test_remove_permission_logic_exception(self):
@@ -89,3 +90,43 @@ class PermissionUtilsLogicsTestCase(TestCase):
         remove_permission_logic(Article, m)
         # it should raise exception if fail_silently is False
         self.assertRaises(KeyError, remove_permission_logic, Article, m, fail_silently=False)
+
+    def test_add_permission_logic_duplicate(self):
+        m = self.mock_logic
+        add_permission_logic(Article, m)
+        add_permission_logic(Article, m)
+        self.assertEqual(Article._permission_logics, [m])
+
+    def test_add_permission_logic_set(self):
+        m = self.mock_logic
+        m2 = self.mock_logic2
+        # reset to a set as older code did
+        Article._permission_logics = set()
+        add_permission_logic(Article, m)
+        self.assertEqual(Article._permission_logics, [m])
+        Article._permission_logics = (m,)
+        add_permission_logic(Article, m2)
+        self.assertEqual(Article._permission_logics, [m, m2])
+        Article._permission_logics = (m, m2)
+        remove_permission_logic(Article, m)
+        self.assertEqual(Article._permission_logics, [m2])
+
+    def test_add_permission_logic_order(self):
+        from permission.logics import (
+            AuthorPermissionLogic,
+            CollaboratorsPermissionLogic,
+            StaffPermissionLogic,
+        )
+
+        m = self.mock_logic
+        m2 = self.mock_logic2
+        author = AuthorPermissionLogic()
+        collaborators = CollaboratorsPermissionLogic()
+        staff = StaffPermissionLogic()
+        add_permission_logic(Article, collaborators)
+        add_permission_logic(Article, m)
+        add_permission_logic(Article, author)
+        add_permission_logic(Article, staff)
+        add_permission_logic(Article, m2)
+        # cheap logics first, the order is kept for logics of the same cost
+        self.assertEqual(Article._permission_logics, [staff, m, author, m2, collaborators])
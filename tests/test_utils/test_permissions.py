@@ -1 +1,58 @@
 # To run doctest
+from django.test import TestCase
+
+from permission.utils.permissions import aperm_exists, get_all_perms, perm_exists, reset_all_perms
+from tests.utils import create_permission
+
+
+class PermissionUtilsPermissionsTestCase(TestCase):
+    def setUp(self):
+        reset_all_perms()
+
+    def tearDown(self):
+        reset_all_perms()
+
+    def test_get_all_perms(self):
+        perms = get_all_perms()
+        self.assertTrue(isinstance(perms, frozenset))
+        self.assertTrue("auth.add_user" in perms)
+        self.assertTrue("permission.change_article" in perms)
+        # perms are cached
+        with self.assertNumQueries(0):
+            self.assertTrue(get_all_perms() is perms)
+
+    def test_get_all_perms_rebuilt_on_permission_save(self):
+        self.assertFalse("permission.permission_test_perm" in get_all_perms())
+        permission = create_permission("permission_test_perm")
+        self.assertTrue("permission.permission_test_perm" in get_all_perms())
+        permission.delete()
+        self.assertFalse("permission.permission_test_perm" in get_all_perms())
+
+    def _create_permission_without_signals(self, codename):
+        # e.g. created by ``migrate`` in another process
+        from django.contrib.auth.models import Permission
+        from django.contrib.contenttypes.models import ContentType
+
+        from tests.models import Article
+
+        content_type = ContentType.objects.get_for_model(Article)
+        Permission.objects.bulk_create([Permission(name=codename, codename=codename, content_type=content_type)])
+
+    def test_perm_exists(self):
+        self.assertTrue(perm_exists("auth.add_user"))
+        self.assertFalse(perm_exists("permission.permission_test_perm"))
+        self._create_permission_without_signals("permission_test_perm")
+        self.assertFalse("permission.permission_test_perm" in get_all_perms())
+        # the perms are reloaded on the miss
+        self.assertTrue(perm_exists("permission.permission_test_perm"))
+        # no query on the hit
+        with self.assertNumQueries(0):
+            self.assertTrue(perm_exists("permission.permission_test_perm"))
+
+    async def test_aperm_exists(self):
+        from asgiref.sync import sync_to_async
+
+        self.assertTrue(await aperm_exists("auth.add_user"))
+        await sync_to_async(self._create_permission_without_signals)("permission_test_perm")
+        self.assertTrue(await aperm_exists("permission.permission_test_perm"))
+        self.assertFalse(await aperm_exists("permission.unknown"))
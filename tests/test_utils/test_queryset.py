@@ -0,0 +1,69 @@
+from django.test import override_settings
+
+from permission import add_permission_logic
+from permission.handlers import LogicalPermissionHandler, PermissionHandler
+from permission.logics import AuthorPermissionLogic, CollaboratorsPermissionLogic, PermissionLogic
+from permission.utils.queryset import annotate_permissions, get_annotated_permission, with_permission_relations
+from tests.compat import MagicMock
+from tests.models import Article
+from tests.utils import PermissionLogicsTestCase, create_article, create_bridge, create_user
+
+
+@override_settings(
+    PERMISSION_DEFAULT_PERMISSION_HANDLER=LogicalPermissionHandler,
+)
+class PermissionUtilsQuerysetTestCase(PermissionLogicsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user1 = create_user("john")
+        self.user2 = create_user("tony")
+        self.article1 = create_article("test1", bridge=create_bridge(user=self.user1))
+        self.article2 = create_article("test2", bridge=create_bridge(user=self.user2))
+        self.article2.authors.add(self.user1)
+        self.perm = "permission.change_article"
+
+        self.handler = LogicalPermissionHandler(Article)
+        self.handler.get_supported_permissions()
+        add_permission_logic(Article, AuthorPermissionLogic(field_name="single_bridge__author"))
+        add_permission_logic(Article, CollaboratorsPermissionLogic(field_name="authors"))
+
+    def test_with_permission_relations(self):
+        queryset = with_permission_relations(Article.objects.order_by("pk"), self.perm)
+        # one query for the articles and one query for the prefetched authors
+        with self.assertNumQueries(2):
+            articles = list(queryset)
+            results = [self.handler._has_perm(self.user2, self.perm, x) for x in articles]
+        self.assertEqual(results, [False, True])
+
+    def test_with_permission_relations_without_handler(self):
+        self.addCleanup(setattr, Article, "_permission_handler", self.handler)
+        Article._permission_handler = MagicMock(spec=PermissionHandler)
+        queryset = Article.objects.all()
+        self.assertTrue(with_permission_relations(queryset, self.perm) is queryset)
+
+    def test_annotate_permissions(self):
+        perms = [self.perm, "permission.delete_article", "unknown"]
+        queryset = annotate_permissions(Article.objects.order_by("pk"), self.user1, perms)
+        with self.assertNumQueries(1):
+            articles = list(queryset)
+        self.assertEqual([x._perm_change_article for x in articles], [True, True])
+        # the collaborators do not have delete permission
+        self.assertEqual([x._perm_delete_article for x in articles], [True, False])
+        self.assertFalse(hasattr(articles[0], "_perm_unknown"))
+
+        # has_perm use the annotations
+        with self.assertNumQueries(0):
+            self.assertTrue(self.handler.has_perm(self.user1, self.perm, articles[1]))
+            self.assertFalse(self.handler.has_perm(self.user1, "permission.delete_article", articles[1]))
+        # annotations of the other user are not used
+        self.assertEqual(get_annotated_permission(self.user2, self.perm, articles[1]), None)
+        self.assertFalse(self.handler.has_perm(self.user2, self.perm, articles[0]))
+
+    def test_annotate_permissions_fallback(self):
+        class CustomPermissionLogic(PermissionLogic):
+            def has_perm(self, user_obj, perm, obj=None):
+                return False
+
+        add_permission_logic(Article, CustomPermissionLogic())
+        queryset = annotate_permissions(Article.objects.all(), self.user1, [self.perm])
+        self.assertFalse(hasattr(queryset.first(), "_perm_change_article"))
@@ -1,3 +1,62 @@
+from django.test import TestCase
+
+_missing = object()
+
+
+def _restore_attribute(obj, name, value):
+    if value is not _missing:
+        setattr(obj, name, value)
+    elif name in obj.__dict__:
+        delattr(obj, name)
+
+
+def _restore_registry(registry, value):
+    registry._registry = value
+    registry.invalidate()
+
+
+class PermissionLogicsTestCase(TestCase):
+    """
+    Test case which start with a registered handler and without permission
+    logics of the article model, and restore the permission logics, the
+    permission handler, and the registry after the test
+    """
+
+    def setUp(self):
+        from permission.utils.handlers import registry
+        from tests.models import Article
+
+        super().setUp()
+        self.addCleanup(_restore_registry, registry, dict(registry._registry))
+        for name in ("_permission_logics", "_permission_handler"):
+            self.addCleanup(_restore_attribute, Article, name, Article.__dict__.get(name, _missing))
+        if Article not in registry._registry:
+            # the handler of the article model may be left unregistered by
+            # other tests
+            registry.register(Article)
+        # make sure all caches are removed
+        Article._permission_logics = []
+
+
+class AuthorCollaboratorsTestCase(PermissionLogicsTestCase):
+    """
+    Test case with the users john (``user1``) and tony (``user2``), and the
+    author and collaborators (``authors``) permission logics of the article
+    model
+    """
+
+    def setUp(self):
+        from permission import add_permission_logic
+        from permission.logics import AuthorPermissionLogic, CollaboratorsPermissionLogic
+        from tests.models import Article
+
+        super().setUp()
+        add_permission_logic(Article, AuthorPermissionLogic())
+        add_permission_logic(Article, CollaboratorsPermissionLogic(field_name="authors"))
+        self.user1 = create_user("john")
+        self.user2 = create_user("tony")
+
+
 def create_user(username, **kwargs):
     from django.contrib.auth.models import User
 